@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+bench_examples.py
+Load-test the example chains offline against the fake LLM
+
+Usage:
+    python benchmarks/bench_examples.py --concurrency 1 8 --requests 50
+    python benchmarks/bench_examples.py --save baseline
+    python benchmarks/bench_examples.py --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from harness import (load_results, print_regressions, print_table, run_load,
+                     save_results, compare_results)
+
+SAMPLE_TEXTS = [
+    "This movie was absolutely amazing!",
+    "I hate waiting in long lines.",
+    "The book was published in 2020.",
+]
+
+SAMPLE_REVIEWS = [
+    "This laptop is amazing! Super fast, great battery life, and the display is gorgeous. Highly recommend!",
+    "Terrible product. Broke after 2 days. Waste of money. Customer service was unhelpful.",
+    "It's okay, does what it says. Nothing special but gets the job done. Fair price.",
+]
+
+SAMPLE_QUESTIONS = [
+    "What is LangChain?",
+    "How do RAG systems work?",
+    "What are LangChain agents?",
+    "Tell me about prompt engineering techniques",
+]
+
+
+def build_scenarios():
+    """Return {name: (fn, inputs)} for every benchmarked example path"""
+    from common.llm import get_llm
+    from common.loader import load_example
+
+    # Building the chains prints demo banners (and simple_chain runs once)
+    with contextlib.redirect_stdout(io.StringIO()):
+        prompts = load_example("01-basics/02_prompts.py")
+        chains = load_example("01-basics/03_chains.py")
+        parsers = load_example("01-basics/04_output_parsers.py")
+        rag_module = load_example("03-advanced/02_rag_system.py")
+
+        story_chain = chains.simple_chain()
+        few_shot_chain = prompts.few_shot_prompting() | get_llm(temperature=0.3)
+        recipe_chain = parsers.json_output_parser_example()
+        review_chain = parsers.review_analysis_parser()
+        quote_chain = parsers.string_manipulation_parser()
+
+        store = rag_module.SimpleVectorStore()
+        store.add_documents(rag_module.KNOWLEDGE_BASE)
+        rag = rag_module.SimpleRAG(get_llm(temperature=0.3), store)
+
+    story_input = {"adjective": "mysterious", "subject": "a lost cat", "word_count": "50"}
+    return {
+        "simple_chain": (story_chain.invoke, [story_input]),
+        "few_shot_classifier": (lambda text: few_shot_chain.invoke({"text": text}), SAMPLE_TEXTS),
+        "recipe_parser_chain": (recipe_chain.invoke, [{"dish": "spaghetti carbonara"}]),
+        "review_parser_chain": (lambda r: review_chain.invoke({"review_text": r}), SAMPLE_REVIEWS),
+        "quote_parser_chain": (quote_chain.invoke, [{"topic": "success"}, {"topic": "learning"}]),
+        "rag_query": (rag.query, SAMPLE_QUESTIONS),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--scenarios", nargs="+", help="only run these scenarios")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake LLM median first-token latency")
+    parser.add_argument("--distribution", default="lognormal", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--tokens-per-sec", type=float, default=500.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME", help="save results to benchmarks/results/NAME.json")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved results file")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    # The examples pick these up through common.llm.get_llm()
+    os.environ.update({
+        "FAKE_LLM": "1",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_DISTRIBUTION": args.distribution,
+        "FAKE_LLM_JITTER": str(args.jitter),
+        "FAKE_LLM_TOKENS_PER_SEC": str(args.tokens_per_sec),
+        "FAKE_LLM_SEED": str(args.seed),
+    })
+
+    print("⏱️  Example chain benchmark (fake LLM)")
+    print("=" * 40)
+    scenarios = build_scenarios()
+
+    results = {}
+    for name, (fn, samples) in scenarios.items():
+        if args.scenarios and name not in args.scenarios:
+            continue
+        inputs = [samples[i % len(samples)] for i in range(args.requests)]
+        for concurrency in args.concurrency:
+            results[f"{name}@c{concurrency}"] = run_load(fn, inputs, concurrency, warmup=1)
+
+    print_table(results, ["p50_ms", "p95_ms", "p99_ms", "throughput_rps", "errors"])
+
+    if args.save:
+        print(f"\n💾 Saved {save_results(args.save, results)}")
+
+    if args.compare:
+        ok = print_regressions(compare_results(results, load_results(args.compare), args.tolerance),
+                               args.tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
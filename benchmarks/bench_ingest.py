@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+bench_ingest.py
+Scaling of the clean -> split -> index ingestion pipeline with worker count
+
+Builds a synthetic HTML corpus and ingests it into a fresh SimpleVectorStore
+with ParallelIngestor at each worker count. Speedup is relative to the
+in-process (1 worker) run, and every run is checked to produce the same
+chunks and index as the serial one.
+
+Usage:
+    python benchmarks/bench_ingest.py --docs 20000 --workers 1 2 4 8
+    python benchmarks/bench_ingest.py --save ingest
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+from harness import compare_results, load_results, print_regressions, print_table, save_results
+
+WORDS = ("language model chain prompt agent memory vector store retrieval embedding token "
+         "context answer question document index search python framework tool parser").split()
+
+
+def make_corpus(count, words_per_doc, seed=0):
+    """HTML documents with a title, a few paragraphs and some script noise"""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        paragraphs = []
+        remaining = rng.randint(words_per_doc // 2, words_per_doc * 3 // 2)
+        while remaining > 0:
+            size = min(remaining, rng.randint(20, 80))
+            paragraphs.append("<p>" + " ".join(rng.choice(WORDS) for _ in range(size)) + "</p>")
+            remaining -= size
+        body = "\n".join(paragraphs)
+        docs.append({
+            "id": f"doc{i}",
+            "title": " ".join(rng.choice(WORDS) for _ in range(3)).title(),
+            "content": f"<html><head><script>var n = {i};</script></head>"
+                       f"<body><h1>Doc {i}</h1>{body}<p>&copy; 2024</p></body></html>",
+        })
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=300, help="average words per document")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-words", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=2, help="runs per worker count (best is kept)")
+    parser.add_argument("--save", metavar="NAME")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    from common.loader import load_example
+    from common.pipeline import ParallelIngestor
+
+    rag_module = load_example("03-advanced/02_rag_system.py")
+    docs = make_corpus(args.docs, args.words)
+    megabytes = sum(len(doc['content']) for doc in docs) / 1e6
+
+    print(f"⏱️  Ingestion scaling: {args.docs} docs, {megabytes:.1f} MB of HTML, {os.cpu_count()} CPUs")
+    print("=" * 40)
+
+    results = {}
+    reference = None
+    for workers in args.workers:
+        best = None
+        with ParallelIngestor(workers=workers, chunk_words=args.chunk_words, min_parallel_docs=0) as ingestor:
+            for _ in range(args.repeat):
+                store = rag_module.SimpleVectorStore()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    stats = ingestor.ingest(store, docs)
+                    stats["wall_s"] = time.perf_counter() - start
+                if best is None or stats["wall_s"] < best["wall_s"]:
+                    best = stats
+
+        # Same chunks and the same index as the serial run, or the speedup means nothing
+        signature = (len(store.documents), store.documents[-1]["id"],
+                     [(d["id"], s) for d, s in store.similarity_search_with_score("vector store retrieval", 5)])
+        if reference is None:
+            reference = signature
+        elif signature != reference:
+            print(f"❌ {workers} workers produced a different store than the first run")
+            sys.exit(1)
+
+        best["mb_per_s"] = megabytes / best["wall_s"]
+        results[f"workers={workers}"] = best
+
+    base = results[f"workers={args.workers[0]}"]["wall_s"]
+    for stats in results.values():
+        stats["speedup"] = base / stats["wall_s"]
+
+    print_table(results, ["chunks", "wall_s", "merge_s", "docs_per_s", "mb_per_s", "speedup"])
+
+    if args.save:
+        print(f"\n💾 Saved {save_results(args.save, results)}")
+
+    if args.compare:
+        ok = print_regressions(compare_results(results, load_results(args.compare), args.tolerance),
+                               args.tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
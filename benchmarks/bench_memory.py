@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+bench_memory.py
+Memory per document: list of dicts vs. ColumnarDocStore (in memory and memory-mapped)
+
+Heap usage is measured with tracemalloc around building each layout from
+the same document stream, so the numbers are Python-heap bytes actually
+allocated. The memory-mapped store's text lives in the page cache, so its
+file size is reported separately.
+
+Usage:
+    python benchmarks/bench_memory.py --docs 100000
+    python benchmarks/bench_memory.py --docs 1000000 --words 30 --save memory
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from harness import (compare_results, iter_documents, load_results, make_queries, print_regressions,
+                     print_table, save_results)
+
+
+def heap_bytes(build):
+    """(object returned by build(), Python heap bytes it holds, seconds to build)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        value = build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    return value, tracemalloc.get_traced_memory()[0] - before, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=60, help="words per document")
+    parser.add_argument("--save", metavar="NAME")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    from common.docstore import ColumnarDocStore
+    from common.loader import load_example
+
+    rag_module = load_example("03-advanced/02_rag_system.py")
+    docs = lambda: iter_documents(args.docs, args.words)
+    text_bytes = sum(len(doc["id"]) + len(doc["title"]) + len(doc["content"]) for doc in docs())
+
+    print(f"🧮 Memory per document: {args.docs} docs, {text_bytes / args.docs:.0f} bytes of text each")
+    print("=" * 40)
+
+    tracemalloc.start()
+    results = {}
+
+    def record(name, value_bytes, seconds, **extra):
+        results[name] = dict(extra, per_doc_bytes=value_bytes / args.docs, total_mb=value_bytes / 1e6,
+                             build_s=seconds)
+
+    # Documents only
+    dicts, size, seconds = heap_bytes(lambda: list(docs()))
+    record("docs:dicts", size, seconds)
+    del dicts
+
+    columnar, size, seconds = heap_bytes(lambda: _fill(ColumnarDocStore(), docs()))
+    record("docs:columnar", size, seconds)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = columnar.save(os.path.join(workdir, "docs.cds"))
+        file_bytes = os.path.getsize(path)
+        del columnar
+        mapped, size, seconds = heap_bytes(lambda: ColumnarDocStore.open(path))
+        record("docs:mmap", size, seconds, file_mb=file_bytes / 1e6)
+
+        # Whole store: documents plus the keyword index
+        store, size, seconds = heap_bytes(lambda: _store(rag_module.SimpleVectorStore(), docs()))
+        record("store:dicts", size, seconds)
+        queries = make_queries(200)
+        expected = [[(d["id"], s) for d, s in store.similarity_search_with_score(q, 5)] for q in queries]
+        del store
+
+        store, size, seconds = heap_bytes(lambda: rag_module.SimpleVectorStore(ColumnarDocStore.open(path)))
+        record("store:mmap", size, seconds)
+        # Views decode lazily but must return the same hits as the dict-backed store
+        got = [[(d["id"], s) for d, s in store.similarity_search_with_score(q, 5)] for q in queries]
+        if got != expected:
+            print("❌ The memory-mapped store returned different results")
+            sys.exit(1)
+        del store
+        mapped.close()
+
+    tracemalloc.stop()
+
+    # Relative to the dict layout of the same kind (documents only / whole store)
+    for name, stats in results.items():
+        baseline = results[name.split(":")[0] + ":dicts"]["per_doc_bytes"]
+        stats["vs_dicts"] = stats["per_doc_bytes"] / baseline
+
+    print_table(results, ["per_doc_bytes", "total_mb", "file_mb", "build_s", "vs_dicts"])
+
+    if args.save:
+        print(f"\n💾 Saved {save_results(args.save, results)}")
+
+    if args.compare:
+        ok = print_regressions(compare_results(results, load_results(args.compare), args.tolerance),
+                               args.tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+def _fill(columnar, docs):
+    columnar.extend(docs)
+    return columnar
+
+
+def _store(store, docs):
+    store.add_documents(list(docs))
+    return store
+
+
+if __name__ == "__main__":
+    main()
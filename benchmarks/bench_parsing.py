@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+bench_parsing.py
+Micro-benchmark: JsonOutputParser vs. FastJsonOutputParser on canned completions
+
+Completions mimic what models actually return for the ProductReview
+prompt: clean JSON, JSON in code fences or after prose, trailing commas,
+single quotes, Python literals and truncated output.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from harness import compare_results, load_results, print_regressions, save_results
+
+SENTIMENTS = [("Positive", 5, "Yes"), ("Negative", 1, "No"), ("Neutral", 3, "Maybe")]
+POINTS = ["fast", "great battery life", "broke after 2 days", "fair price",
+          "gorgeous display", "unhelpful support", "does the job"]
+
+
+def make_completion(rng, style):
+    sentiment, rating, recommend = rng.choice(SENTIMENTS)
+    review = {"sentiment": sentiment, "rating": rating,
+              "key_points": rng.sample(POINTS, 3), "recommendation": recommend}
+    clean = json.dumps(review, indent=2)
+
+    if style == "clean":
+        return clean
+    if style == "fenced":
+        return f"Here is the analysis:\n```json\n{clean}\n```"
+    if style == "prose":
+        return f"Sure! Based on the review, {clean}\nLet me know if you need more."
+    if style == "trailing_comma":
+        return clean.replace('"\n  ]', '",\n  ]').replace(f'"{recommend}"\n}}', f'"{recommend}",\n}}')
+    if style == "single_quotes":
+        return clean.replace('"', "'")
+    if style == "python_literals":
+        return clean.replace('"rating": ', '"verified": True, "rating": ')
+    if style == "truncated":
+        return clean[:int(len(clean) * 0.85)]
+    raise ValueError(style)
+
+
+STYLES = ["clean", "fenced", "prose", "trailing_comma", "single_quotes", "python_literals", "truncated"]
+
+
+def bench(parser, completions):
+    ok = 0
+    start = time.perf_counter()
+    for text in completions:
+        try:
+            parser.parse(text)
+            ok += 1
+        except Exception:
+            pass
+    seconds = time.perf_counter() - start
+    return {"parsed": ok, "failed": len(completions) - ok,
+            "us_per_parse": 1e6 * seconds / len(completions),
+            "parses_per_s": len(completions) / seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output parser micro-benchmark")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved results file")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    from langchain_core.output_parsers import JsonOutputParser
+    from common.fast_parse import FastJsonOutputParser
+    from common.loader import load_example
+    ProductReview = load_example("01-basics/04_output_parsers.py").ProductReview
+
+    rng = random.Random(args.seed)
+    results = {}
+    candidates = {
+        "langchain_json": JsonOutputParser(),
+        "fast_json": FastJsonOutputParser(),
+        "fast_json_validated": FastJsonOutputParser(pydantic_object=ProductReview),
+    }
+
+    for style in STYLES + ["mixed"]:
+        if style == "mixed":
+            completions = [make_completion(rng, rng.choice(STYLES)) for _ in range(args.count)]
+        else:
+            completions = [make_completion(rng, style) for _ in range(args.count // len(STYLES))]
+        for name, candidate in candidates.items():
+            results[f"{style}/{name}"] = bench(candidate, completions)
+
+    print(f"{'style/parser':<40}{'ok':>7}{'failed':>8}{'us/parse':>10}")
+    for key, r in results.items():
+        print(f"{key:<40}{r['parsed']:>7}{r['failed']:>8}{r['us_per_parse']:>10.1f}")
+
+    if args.save:
+        print(f"💾 Saved {save_results(args.save, results)}")
+
+    if args.compare:
+        ok = print_regressions(compare_results(results, load_results(args.compare), args.tolerance),
+                               args.tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+bench_rate_limit.py
+Exercise LLMScheduler against the local 429-injecting stub server
+
+Runs the same batch of completions twice through a real OpenAI client
+pointed at the stub: once with plain concurrent calls (a 429 drops the
+item, as the examples used to) and once through LLMScheduler.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harness import save_results
+from stub_server import start_server
+
+
+def run_naive(llm, prompts, concurrency):
+    def call(prompt):
+        try:
+            return llm.invoke(prompt)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(call, prompts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLMScheduler vs. naive calls against a 429 stub")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--server-rpm", type=int, default=1200, help="stub's hard requests/minute limit")
+    parser.add_argument("--client-rpm", type=int, default=1000, help="scheduler's requests/minute limit")
+    parser.add_argument("--error-rate", type=float, default=0.15, help="fraction of random 429s")
+    parser.add_argument("--save", metavar="NAME")
+    args = parser.parse_args()
+
+    from langchain_openai import OpenAI
+    from common.rate_limit import LLMScheduler
+
+    prompts = [f"Say hello number {i}" for i in range(args.requests)]
+    results = {}
+
+    for mode in ("naive", "scheduled"):
+        # Fresh server per mode so both start with an empty rate window
+        server, state = start_server(rpm=args.server_rpm, error_rate=args.error_rate, seed=1)
+        llm = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                     api_key="stub", max_retries=0, max_tokens=16)
+
+        start = time.perf_counter()
+        if mode == "naive":
+            outputs = run_naive(llm, prompts, args.concurrency)
+            extra = {}
+        else:
+            scheduler = LLMScheduler(requests_per_minute=args.client_rpm,
+                                     max_concurrency=args.concurrency, base_delay=0.1, max_delay=2.0)
+            outputs = scheduler.map(llm.invoke, prompts)
+            extra = scheduler.stats()
+        wall = time.perf_counter() - start
+        server.shutdown()
+
+        completed = sum(not isinstance(o, Exception) for o in outputs)
+        results[mode] = dict(extra, completed=completed, dropped=len(prompts) - completed,
+                             server_429s=state.rejected, wall_s=wall)
+
+    for mode, r in results.items():
+        print(f"{mode:>10}: {r['completed']}/{args.requests} completed, {r['dropped']} dropped, "
+              f"{r['server_429s']} x 429 from server, {r['wall_s']:.2f}s"
+              + (f", {r['retries']} retries, final concurrency {r['concurrency_limit']}"
+                 if "retries" in r else ""))
+
+    if args.save:
+        print(f"💾 Saved {save_results(args.save, results)}")
+
+
+if __name__ == "__main__":
+    main()
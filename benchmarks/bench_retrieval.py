@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+bench_retrieval.py
+Retrieval regression suite: build time, memory, latency and quality per retriever mode
+
+Synthetic corpora (harness.iter_documents) come with labeled queries: each
+query is built from one target document - a title word plus a few of the
+document's rarer content words - so recall@k (target in the top k) and MRR
+(mean 1/rank of the target) measure ranking quality without an LLM.
+
+Modes:
+    single     SimpleVectorStore over a list of dicts
+    sharded    ShardedVectorStore, 4 in-process shards
+    processes  ShardedVectorStore, 4 worker processes (opt-in; memory not measured)
+    columnar   SimpleVectorStore over a ColumnarDocStore
+    mmap       SimpleVectorStore over a memory-mapped ColumnarDocStore
+    rerank     single + IDF Reranker over k x 5 first-stage candidates
+
+Every mode is queried through SimpleRAG.retrieve, the path the RAG
+pipeline uses. memory_mb is the Python heap held by documents plus index
+(tracemalloc); for mmap the text lives in the file (file_mb) instead.
+build_s is timed under tracemalloc unless --no-memory is given.
+
+Usage:
+    python benchmarks/bench_retrieval.py                         # 1k and 100k, all modes
+    python benchmarks/bench_retrieval.py --check                 # ...and compare with the baseline
+    python benchmarks/bench_retrieval.py --sizes 1m --words 30 --modes single mmap
+    python benchmarks/bench_retrieval.py --update-baseline       # after an intended change
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from harness import (BASELINES_DIR, compare_results, iter_documents, load_results, print_regressions,
+                     print_table, save_results, summarize_latencies)
+
+MODES = ["single", "sharded", "processes", "columnar", "mmap", "rerank"]
+DEFAULT_MODES = ["single", "sharded", "columnar", "mmap", "rerank"]
+QUALITY_METRICS = ("recall_at_k", "mrr")
+BASELINE = os.path.join(BASELINES_DIR, "retrieval.json")
+
+
+def parse_size(text):
+    """'1k' -> 1000, '100k' -> 100000, '1m' -> 1000000"""
+    text = text.lower()
+    for suffix, scale in (("k", 1000), ("m", 1000000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * scale)
+    return int(text)
+
+
+def rarity(word):
+    """Vocabulary rank of a harness term (term0 is the most common)"""
+    return int(word[4:])
+
+
+def make_labeled_queries(docs, count, seed=2):
+    """
+    [(query, target id)] built from random target documents.
+
+    A query is one title word and 2 of the 8 rarest content words of its
+    target plus one common word the target need not contain, so ties and
+    noise make the ranking matter. Targets are sampled without replacement.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for position in rng.sample(range(len(docs)), min(count, len(docs))):
+        doc = docs[position]
+        rare = sorted(set(doc["content"].split()), key=rarity, reverse=True)[:8]
+        words = rng.sample(rare, min(2, len(rare))) + [rng.choice(doc["title"].split()),
+                                                       f"term{rng.randint(0, 200)}"]
+        rng.shuffle(words)
+        queries.append((" ".join(words), doc["id"]))
+    return queries
+
+
+def measure(build, memory=True):
+    """
+    (value, seconds, heap MB) for build() -> value.
+
+    The heap is what the value holds after build() (tracemalloc), or None
+    with memory=False; tracing slows the build, so time it without for
+    exact build_s.
+    """
+    gc.collect()
+    if memory:
+        tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            value = build()
+            seconds = time.perf_counter() - start
+        size = None
+        if memory:
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0] / 1e6
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return value, seconds, size
+
+
+def columnar(docs):
+    from common.docstore import ColumnarDocStore
+
+    store = ColumnarDocStore()
+    store.extend(docs)
+    return store
+
+
+def builder(mode, docs, path, rag_module):
+    """Zero-argument function building mode's store; docs is the shared list of dicts"""
+    from common.docstore import ColumnarDocStore
+    from common.sharding import ShardedVectorStore
+
+    def add(store):
+        store.add_documents(docs)
+        return store
+
+    if mode in ("single", "rerank"):
+        return lambda: add(rag_module.SimpleVectorStore())
+    if mode in ("sharded", "processes"):
+        return lambda: add(ShardedVectorStore(num_shards=4, processes=mode == "processes"))
+    if mode == "columnar":
+        return lambda: rag_module.SimpleVectorStore(columnar(docs))
+    return lambda: rag_module.SimpleVectorStore(ColumnarDocStore.open(path))
+
+
+def evaluate(retriever, queries):
+    """Latency percentiles plus recall@k and MRR of retriever.retrieve over labeled queries"""
+    latencies = []
+    found = 0
+    reciprocal_ranks = 0.0
+    start = time.perf_counter()
+    for query, target in queries:
+        began = time.perf_counter()
+        hits = retriever.retrieve(query)
+        latencies.append(time.perf_counter() - began)
+        for rank, (doc, score) in enumerate(hits, 1):
+            if doc["id"] == target:
+                found += 1
+                reciprocal_ranks += 1 / rank
+                break
+    wall = time.perf_counter() - start
+
+    summary = summarize_latencies(latencies, wall)
+    return {
+        "p50_ms": summary["p50_ms"],
+        "p95_ms": summary["p95_ms"],
+        "p99_ms": summary["p99_ms"],
+        "throughput_rps": summary["throughput_rps"],
+        "recall_at_k": found / len(queries),
+        "mrr": reciprocal_ranks / len(queries),
+    }
+
+
+def run_mode(mode, docs, docs_mb, queries, args, workdir, rag_module):
+    from common.rerank import Reranker, idf_scorer
+
+    stats = {}
+    path = os.path.join(workdir, "docs.cds")
+    if mode == "mmap":
+        # The file is written outside the measurement; building = open + index
+        columnar(docs).save(path)
+        stats["file_mb"] = os.path.getsize(path) / 1e6
+
+    # Worker processes hold their shards; the parent's heap says nothing useful
+    memory = not args.no_memory and mode != "processes"
+    store, seconds, heap = measure(builder(mode, docs, path, rag_module), memory)
+    stats["build_s"] = seconds
+    if heap is not None:
+        # These stores reference the shared document dicts: count them too
+        stats["memory_mb"] = heap + (docs_mb if mode in ("single", "sharded", "rerank") else 0)
+
+    try:
+        reranker = Reranker(scorer=idf_scorer(store.index)) if mode == "rerank" else None
+        retriever = rag_module.SimpleRAG(None, store, k=args.k, reranker=reranker, candidates=args.k * 5)
+        stats.update(evaluate(retriever, queries))
+        if reranker is not None:
+            # Share of candidates the second stage scored; the rest were cut off
+            rerank = reranker.stats()
+            stats["rerank_scored"] = rerank["scored"] / (rerank["scored"] + rerank["skipped"])
+    finally:
+        if mode in ("sharded", "processes"):
+            store.close()
+        if mode == "mmap":
+            store.documents.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], help="corpus sizes, e.g. 1k 100k 1m")
+    parser.add_argument("--modes", nargs="+", default=DEFAULT_MODES, choices=MODES)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--words", type=int, default=60, help="words per document")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, exact build_s)")
+    parser.add_argument("--save", metavar="NAME", help="save results to benchmarks/results/NAME.json")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved results file")
+    parser.add_argument("--check", action="store_true", help=f"compare against {os.path.relpath(BASELINE)}")
+    parser.add_argument("--quality-only", action="store_true",
+                        help="compare recall@k and MRR only, exactly (timings vary by machine)")
+    parser.add_argument("--update-baseline", action="store_true", help=f"overwrite {os.path.relpath(BASELINE)}")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    from common.loader import load_example
+
+    # Loaded up front so module import is not counted as store memory
+    rag_module = load_example("03-advanced/02_rag_system.py")
+
+    print(f"🔎 Retrieval suite: sizes {' '.join(args.sizes)}, modes {' '.join(args.modes)}, "
+          f"{args.queries} labeled queries, k={args.k}")
+    print("=" * 40)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for label in args.sizes:
+            size = parse_size(label)
+            docs, _, docs_mb = measure(lambda: list(iter_documents(size, args.words)), not args.no_memory)
+            queries = make_labeled_queries(docs, args.queries)
+            for mode in args.modes:
+                results[f"{label}/{mode}"] = run_mode(mode, docs, docs_mb, queries, args, workdir, rag_module)
+                print(f"✅ {label}/{mode}")
+            del docs
+
+    print()
+    print_table(results, ["build_s", "memory_mb", "file_mb", "p50_ms", "p95_ms", "recall_at_k", "mrr", "rerank_scored"])
+
+    if args.save:
+        print(f"\n💾 Saved {save_results(args.save, results)}")
+    if args.update_baseline:
+        print(f"\n💾 Baseline updated: {save_results('retrieval', results, directory=BASELINES_DIR)}")
+
+    baseline_path = BASELINE if args.check else args.compare
+    if baseline_path:
+        current, tolerance = results, args.tolerance
+        if args.quality_only:
+            current = {scenario: {metric: stats[metric] for metric in QUALITY_METRICS}
+                       for scenario, stats in results.items()}
+            tolerance = 0.0
+        ok = print_regressions(compare_results(current, load_results(baseline_path), tolerance), tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
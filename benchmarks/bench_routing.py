@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+bench_routing.py
+Model routing policies on a mixed workload: latency, cost and escalations
+
+Runs the same mix of sentiment, review, recipe and story requests under
+three ModelRouter policies, all on the offline FakeLLM tiers:
+
+    single     every route on the strong tier (what the examples did before)
+    routed     DEFAULT_ROUTES: cheap tier first, escalate on invalid output
+    fast_only  every route on the fast tier, no escalation
+
+Cost comes from UsageAccountant at each tier's real model prices;
+cost_1k_usd is dollars per 1000 requests.
+
+Usage:
+    python benchmarks/bench_routing.py --requests 200 --concurrency 8
+    python benchmarks/bench_routing.py --invalid-rate 0.4 --save routing
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from harness import compare_results, load_results, print_regressions, print_table, run_load, save_results
+
+REVIEWS = [
+    "This laptop is amazing! Super fast, great battery life, and the display is gorgeous. Highly recommend!",
+    "Terrible product. Broke after 2 days. Waste of money. Customer service was unhelpful.",
+    "It's okay, does what it says. Nothing special but gets the job done. Fair price.",
+]
+TEXTS = ["This movie was absolutely amazing!", "I hate waiting in long lines.",
+         "The book was published in 2020."]
+DISHES = ["spaghetti carbonara", "pad thai", "shakshuka"]
+TOPICS = ["a lighthouse keeper", "a lost robot", "a time-travelling cat"]
+
+
+def build_workload(router, accountant):
+    """[(route, fn(inputs), sample inputs)] for each route in the mix"""
+    from langchain_core.prompts import PromptTemplate
+    from common.loader import load_example
+
+    prompts_module = load_example("01-basics/02_prompts.py")
+    parsers_module = load_example("01-basics/04_output_parsers.py")
+    with contextlib.redirect_stdout(io.StringIO()):
+        review_chain = parsers_module.review_analysis_parser(router)
+        recipe_chain = parsers_module.json_output_parser_example(router)
+    sentiment_chain = (PromptTemplate.from_template(prompts_module.FEW_SHOT_PREFIX + prompts_module.FEW_SHOT_SUFFIX)
+                       | router.llm_for("sentiment", temperature=0.3))
+    story_chain = (PromptTemplate.from_template("Write a short story about {topic}.")
+                   | router.llm_for("story", temperature=0.8))
+
+    def runner(route, chain):
+        return lambda inputs: chain.invoke(inputs, config=accountant.config(route))
+
+    return [
+        ("sentiment", runner("sentiment", sentiment_chain), [{"text": t} for t in TEXTS]),
+        ("review", runner("review", review_chain), [{"review_text": r} for r in REVIEWS]),
+        ("recipe", runner("recipe", recipe_chain), [{"dish": d} for d in DISHES]),
+        ("story", runner("story", story_chain), [{"topic": t} for t in TOPICS]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--requests", type=int, default=60, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="strong tier median first-token latency")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0, help="strong tier output speed")
+    parser.add_argument("--invalid-rate", type=float, default=0.2,
+                        help="fraction of structured answers the fast tier gets wrong")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    # The router builds its FakeLLM tiers from these
+    os.environ.update({
+        "FAKE_LLM": "1",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_TOKENS_PER_SEC": str(args.tokens_per_sec),
+        "FAKE_LLM_SEED": str(args.seed),
+    })
+
+    from common.routing import DEFAULT_ROUTES, DEFAULT_TIERS, ModelRouter, ModelTier
+    from common.usage import UsageAccountant
+
+    fast = DEFAULT_TIERS["fast"]
+    tiers = dict(DEFAULT_TIERS, fast=ModelTier(fast.model_name, fast.fake_latency_scale,
+                                              fast.fake_speed_scale, args.invalid_rate))
+    policies = {
+        "single": {"routes": {}, "default_route": ("strong",)},
+        "routed": {"routes": DEFAULT_ROUTES, "default_route": ("strong",)},
+        "fast_only": {"routes": {}, "default_route": ("fast",)},
+    }
+
+    print(f"🧭 Routing policies: {args.requests} requests per route, concurrency {args.concurrency}, "
+          f"fast tier invalid rate {args.invalid_rate:.0%}")
+    print("=" * 40)
+
+    results = {}
+    for policy, config in policies.items():
+        router = ModelRouter(tiers=tiers, **config)
+        accountant = UsageAccountant()
+        totals = {"requests": 0, "errors": 0, "latency_sum": 0.0}
+        workload = build_workload(router, accountant)
+        for route, fn, samples in workload:
+            inputs = [samples[i % len(samples)] for i in range(args.requests)]
+            stats = run_load(fn, inputs, args.concurrency)
+            usage = accountant.summary().get(route, {})
+            routing = router.stats().get(route, {})
+            results[f"{policy}/{route}"] = {
+                "p50_ms": stats["p50_ms"],
+                "p95_ms": stats["p95_ms"],
+                "errors": stats["errors"],
+                "escalation_rate": routing.get("escalation_rate", 0.0),
+                "cost_1k_usd": 1000 * usage.get("cost_usd", 0.0) / args.requests,
+            }
+            totals["requests"] += stats["requests"]
+            totals["errors"] += stats["errors"]
+            totals["latency_sum"] += stats["mean_ms"] * stats["requests"]
+
+        cost = sum(s["cost_usd"] for s in accountant.summary().values())
+        results[f"{policy}/all"] = {
+            "mean_ms": totals["latency_sum"] / totals["requests"] if totals["requests"] else 0.0,
+            "errors": totals["errors"],
+            "cost_1k_usd": 1000 * cost / (len(workload) * args.requests),
+        }
+
+    print_table(results, ["p50_ms", "p95_ms", "mean_ms", "errors", "escalation_rate", "cost_1k_usd"])
+
+    single, routed = results["single/all"], results["routed/all"]
+    if single["cost_1k_usd"]:
+        print(f"\n💰 routed vs single: {1 - routed['cost_1k_usd'] / single['cost_1k_usd']:.0%} "
+              f"cheaper, {1 - routed['mean_ms'] / single['mean_ms']:.0%} lower mean latency, "
+              f"{routed['errors']} errors")
+
+    if args.save:
+        print(f"\n💾 Saved {save_results(args.save, results)}")
+
+    if args.compare:
+        ok = print_regressions(compare_results(results, load_results(args.compare), args.tolerance),
+                               args.tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+bench_sharding.py
+SimpleVectorStore vs. ShardedVectorStore: build time and query throughput
+
+Every sharded configuration is checked to return exactly the same top-k
+as the single store before its numbers are reported.
+
+Usage:
+    python benchmarks/bench_sharding.py --docs 100000 --shards 2 4 8
+    python benchmarks/bench_sharding.py --save sharding
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from harness import (compare_results, load_results, make_documents, make_queries, print_regressions,
+                     print_table, save_results)
+
+
+def measure(store, docs, queries, k, batch):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        store.add_documents(docs)
+        build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if batch:
+        # ShardedVectorStore only
+        results = store.batch_search_with_score(queries, k)
+    else:
+        results = [store.similarity_search_with_score(query, k) for query in queries]
+    seconds = time.perf_counter() - start
+    ranked = [[(doc["id"], score) for doc, score in hits] for hits in results]
+    return {"build_s": build, "query_ms": 1000 * seconds / len(queries),
+            "throughput_rps": len(queries) / seconds}, ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--save", metavar="NAME")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    from common.loader import load_example
+    from common.sharding import ShardedVectorStore
+
+    rag_module = load_example("03-advanced/02_rag_system.py")
+    docs = make_documents(args.docs)
+    queries = make_queries(args.queries)
+
+    print(f"⏱️  Sharded store: {args.docs} docs, {args.queries} queries, k={args.k}")
+    print("=" * 40)
+
+    results = {}
+    results["single"], expected = measure(rag_module.SimpleVectorStore(), docs, queries, args.k, batch=False)
+
+    # Batched queries only matter for worker processes (one round trip per shard)
+    configs = [(shards, processes, batch) for shards in args.shards
+               for processes, batch in ((False, False), (True, False), (True, True))]
+    for shards, processes, batch in configs:
+        name = f"{'process' if processes else 'local'}x{shards}" + ("/batch" if batch else "")
+        with ShardedVectorStore(num_shards=shards, processes=processes) as store:
+            stats, ranked = measure(store, docs, queries, args.k, batch)
+        if ranked != expected:
+            print(f"❌ {name} returned different results than the single store")
+            sys.exit(1)
+        results[name] = stats
+
+    print_table(results, ["build_s", "query_ms", "throughput_rps"])
+
+    if args.save:
+        print(f"\n💾 Saved {save_results(args.save, results)}")
+
+    if args.compare:
+        ok = print_regressions(compare_results(results, load_results(args.compare), args.tolerance),
+                               args.tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
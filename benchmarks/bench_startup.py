@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py
+Startup time of the entry points, each measured in a fresh interpreter
+
+Every scenario runs as a new process with no API key set, so the examples
+exit at their key check: what is measured is interpreter start + module
+imports + argument handling, which is what a CLI call or a short-lived
+worker pays before doing any work.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --save startup
+    python benchmarks/bench_startup.py --compare benchmarks/results/startup.json
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import (BENCH_DIR, compare_results, load_results, print_regressions, print_table,
+                     save_results, summarize_latencies)
+
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+EXAMPLE_SCRIPTS = [
+    "01-basics/01_hello_langchain.py",
+    "01-basics/02_prompts.py",
+    "01-basics/03_chains.py",
+    "01-basics/04_output_parsers.py",
+    "02-intermediate/01_memory.py",
+    "03-advanced/02_rag_system.py",
+]
+
+
+def build_scenarios(workdir):
+    """Return {name: argv} for every measured command"""
+    start_py = os.path.join(REPO_DIR, "start.py")
+    scenarios = {
+        "python_baseline": [sys.executable, "-c", "pass"],
+        # check_setup() alone, with the key coming from the .env below; the demo would need the network
+        "start_check_setup": [sys.executable, "-c",
+                              "import os, runpy; os.environ.pop('OPENAI_API_KEY'); "
+                              f"runpy.run_path({start_py!r}, run_name='bench')['check_setup']()"],
+        "start_help": [sys.executable, start_py, "--help"],
+        "review_job_no_key": [sys.executable, os.path.join(REPO_DIR, "examples", "04-performance", "01_review_job.py"),
+                              "--input", "reviews.csv", "--output", "out.jsonl"],
+        # Reference point: what importing the OpenAI integration costs on its own
+        "import_langchain_openai": [sys.executable, "-c", "import langchain_openai"],
+    }
+    for script in EXAMPLE_SCRIPTS:
+        name = os.path.splitext(os.path.basename(script))[0].lstrip("0123456789_")
+        scenarios[f"{name}_no_key"] = [sys.executable, os.path.join(REPO_DIR, "examples", script)]
+
+    # start.py looks for .env in the working directory
+    with open(os.path.join(workdir, ".env"), "w") as f:
+        f.write("OPENAI_API_KEY=sk-bench-000000000000\n")
+    return scenarios
+
+
+def time_command(argv, runs, cwd, env):
+    """Wall time of `runs` fresh-process runs (after one warmup run to fill the OS cache)"""
+    latencies = []
+    errors = 0
+    for i in range(runs + 1):
+        start = time.perf_counter()
+        proc = subprocess.run(argv, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        if i == 0:
+            continue
+        if proc.returncode != 0:
+            errors += 1
+        latencies.append(elapsed)
+    return summarize_latencies(latencies, errors=errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--runs", type=int, default=5, help="measured runs per scenario")
+    parser.add_argument("--scenarios", nargs="+", help="only run these scenarios")
+    parser.add_argument("--save", metavar="NAME", help="save results to benchmarks/results/NAME.json")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved results file")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    # No key and no fake LLM, so every example stops at its key check
+    env = dict(os.environ, OPENAI_API_KEY="", FAKE_LLM="")
+
+    print("⏱️  Startup benchmark (fresh interpreter per run)")
+    print("=" * 40)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, argv in build_scenarios(workdir).items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            results[name] = time_command(argv, args.runs, workdir, env)
+
+    print_table(results, ["p50_ms", "p95_ms", "max_ms", "errors"])
+
+    if args.save:
+        print(f"\n💾 Saved {save_results(args.save, results)}")
+
+    if args.compare:
+        ok = print_regressions(compare_results(results, load_results(args.compare), args.tolerance),
+                               args.tolerance)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
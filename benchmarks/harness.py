@@ -0,0 +1,182 @@
+"""
+harness.py
+Shared benchmark plumbing - load generation, latency percentiles and result files
+"""
+
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINES_DIR = os.path.join(BENCH_DIR, "baselines")
+
+# Make examples/common importable from benchmark scripts
+sys.path.append(os.path.join(os.path.dirname(BENCH_DIR), "examples"))
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_latencies(latencies, wall_seconds=None, errors=0):
+    """Summary statistics for a list of per-request latencies in seconds"""
+    count = len(latencies)
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "mean_ms": 1000 * statistics.mean(latencies) if latencies else 0.0,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "max_ms": 1000 * max(latencies) if latencies else 0.0,
+    }
+    if wall_seconds:
+        summary["wall_s"] = wall_seconds
+        summary["throughput_rps"] = count / wall_seconds
+    return summary
+
+
+def iter_documents(count, words_per_doc=60, vocabulary=20000, seed=0):
+    """Yield plain-text documents over a Zipf-like vocabulary (a few common words, a long tail)"""
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(vocabulary)]
+    # Cumulative weights computed once; choices() would redo it on every call
+    cumulative = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary)))
+    for i in range(count):
+        yield {
+            "id": f"doc{i}",
+            "title": " ".join(rng.choices(words, cum_weights=cumulative, k=4)),
+            "content": " ".join(rng.choices(words, cum_weights=cumulative, k=words_per_doc)),
+        }
+
+
+def make_documents(count, words_per_doc=60, vocabulary=20000, seed=0):
+    """List of iter_documents(...)"""
+    return list(iter_documents(count, words_per_doc, vocabulary, seed))
+
+
+def make_queries(count, vocabulary=20000, seed=1):
+    """Queries of 2-5 mid-frequency words"""
+    rng = random.Random(seed)
+    return [" ".join(f"term{rng.randint(20, vocabulary // 4)}" for _ in range(rng.randint(2, 5)))
+            for _ in range(count)]
+
+
+def run_load(fn, inputs, concurrency=1, warmup=0):
+    """
+    Call fn(item) for every item using `concurrency` worker threads.
+
+    Returns latency percentiles and throughput. Failed calls are counted as
+    errors and left out of the latency numbers.
+    """
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        fn(item)
+
+    def timed(item):
+        start = time.perf_counter()
+        try:
+            fn(item)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, inputs))
+    wall = time.perf_counter() - start
+
+    latencies = [r for r in results if r is not None]
+    summary = summarize_latencies(latencies, wall, errors=len(results) - len(latencies))
+    summary["concurrency"] = concurrency
+    return summary
+
+
+def save_results(name, results, directory=RESULTS_DIR):
+    """Write results to <directory>/<name>.json and return the path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.json")
+    payload = {"name": name, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(path):
+    """Load results written by save_results"""
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+# Metrics where a bigger number is an improvement (as is any rate ending in
+# _per_s); everything else is "lower is better"
+HIGHER_IS_BETTER = {"throughput_rps", "recall_at_k", "mrr", "speedup", "hit_rate", "parsed"}
+LOWER_IS_BETTER_SUFFIXES = ("_ms", "_s", "_bytes", "_mb", "_usd")
+
+
+def higher_is_better(metric):
+    """True for throughput-style metrics such as docs_per_s"""
+    return metric in HIGHER_IS_BETTER or metric.endswith("_per_s")
+
+
+def compare_results(current, baseline, tolerance=0.10):
+    """
+    Compare two {scenario: {metric: value}} dicts.
+
+    Returns a list of (scenario, metric, baseline, current, change) tuples for
+    metrics that got worse by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for scenario, metrics in current.items():
+        base_metrics = baseline.get(scenario)
+        if not isinstance(metrics, dict) or not isinstance(base_metrics, dict):
+            continue
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            higher = higher_is_better(metric)
+            if not (higher or metric.endswith(LOWER_IS_BETTER_SUFFIXES)):
+                continue
+            change = (value - base) / abs(base)
+            worse = -change if higher else change
+            if worse > tolerance:
+                regressions.append((scenario, metric, base, value, change))
+    return regressions
+
+
+def print_table(results, columns):
+    """Print {scenario: metrics} as a fixed-width table"""
+    header = f"{'scenario':<28}" + "".join(f"{c:>16}" for c in columns)
+    print(header)
+    print("-" * len(header))
+    for scenario, metrics in results.items():
+        row = f"{scenario:<28}"
+        for c in columns:
+            value = metrics.get(c, "")
+            row += f"{value:>16.2f}" if isinstance(value, float) else f"{value!s:>16}"
+        print(row)
+
+
+def print_regressions(regressions, tolerance):
+    """Report the output of compare_results; returns True when there were none"""
+    if not regressions:
+        print(f"\n✅ No regressions beyond {tolerance:.0%}")
+        return True
+    print(f"\n❌ {len(regressions)} regression(s) beyond {tolerance:.0%}:")
+    for scenario, metric, base, value, change in regressions:
+        print(f"   {scenario} {metric}: {base:.3f} -> {value:.3f} ({change:+.1%})")
+    return False
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+stub_server.py
+Local OpenAI-compatible completions server that injects 429 rate-limit errors
+
+Requests over --rpm in any rolling minute, plus a random --error-rate
+fraction of the rest, get a 429 with a Retry-After header. Point an OpenAI
+client at it with base_url="http://127.0.0.1:<port>/v1".
+"""
+
+import argparse
+import collections
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """Counters and the rolling request window shared by handler threads"""
+
+    def __init__(self, rpm, error_rate, latency_ms, seed=0):
+        self.rpm = rpm
+        self.error_rate = error_rate
+        self.latency = latency_ms / 1000
+        self.random = random.Random(seed)
+        self.window = collections.deque()
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+
+    def admit(self):
+        """Return (accepted, retry_after_seconds)"""
+        now = time.monotonic()
+        with self.lock:
+            while self.window and now - self.window[0] > 60:
+                self.window.popleft()
+            if len(self.window) >= self.rpm:
+                self.rejected += 1
+                return False, 60 - (now - self.window[0])
+            if self.random.random() < self.error_rate:
+                self.rejected += 1
+                return False, 0.2
+            self.window.append(now)
+            self.accepted += 1
+            return True, 0
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with state.lock:
+                self._send(200, {"accepted": state.accepted, "rejected": state.rejected})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+
+            accepted, retry_after = state.admit()
+            if not accepted:
+                self._send(429, {"error": {"message": "Rate limit reached for requests",
+                                           "type": "requests", "code": "rate_limit_exceeded"}},
+                           {"Retry-After": f"{retry_after:.2f}"})
+                return
+
+            time.sleep(state.latency)
+            prompts = request.get("prompt", "")
+            prompts = prompts if isinstance(prompts, list) else [prompts]
+            choices = [{"text": " Stub completion.", "index": i, "logprobs": None,
+                        "finish_reason": "stop"} for i in range(len(prompts))]
+            prompt_tokens = sum(len(str(p).split()) for p in prompts)
+            self._send(200, {
+                "id": "cmpl-stub", "object": "text_completion", "created": int(time.time()),
+                "model": request.get("model", "stub"), "choices": choices,
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 2 * len(prompts),
+                          "total_tokens": prompt_tokens + 2 * len(prompts)},
+            })
+
+    return Handler
+
+
+def start_server(port=0, rpm=600, error_rate=0.1, latency_ms=20, seed=0):
+    """Start the stub in a background thread; returns (server, state)"""
+    state = StubState(rpm, error_rate, latency_ms, seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub that injects 429s")
+    parser.add_argument("--port", type=int, default=8429)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    server, _ = start_server(args.port, args.rpm, args.error_rate, args.latency_ms)
+    print(f"🧪 Stub listening on http://127.0.0.1:{server.server_address[1]}/v1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
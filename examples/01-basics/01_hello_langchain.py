@@ -4,8 +4,12 @@ Your first LangChain program - Basic LLM interaction
 """
 
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_openai import OpenAI
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm import get_llm, has_llm_access
 
 # Load environment variables
 load_dotenv()
@@ -16,13 +20,13 @@ def main():
     """
     
     # Check if API key is set
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Please set your OPENAI_API_KEY in .env file")
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
         print("Copy .env.example to .env and add your API key")
         return
     
     # Initialize the LLM
-    llm = OpenAI(temperature=0.7)
+    llm = get_llm(temperature=0.7)
     
     # Simple text generation
     prompt = "Explain what LangChain is in simple terms:"
@@ -3,10 +3,17 @@
 Working with Prompt Templates - Making prompts dynamic and reusable
 """
 
+import json
 import os
+import sys
+import time
 from dotenv import load_dotenv
-from langchain_openai import OpenAI
-from langchain_core.prompts import PromptTemplate
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm import get_llm, has_llm_access
+from common.rate_limit import LLMScheduler
+from common.tokens import count_tokens
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +22,9 @@ def basic_prompt_template():
     """
     Basic prompt template with variables
     """
+    # LangChain is imported where it is used so a missing key exits fast
+    from langchain_core.prompts import PromptTemplate
+    
     print("🎯 Basic Prompt Template Example")
     print("=" * 40)
     
@@ -45,48 +55,145 @@ def basic_prompt_template():
     print(formatted_prompt)
     return formatted_prompt
 
+# The few-shot instructions and examples never change, so they form a
+# byte-identical leading segment of every prompt. Providers that cache
+# prompt prefixes (e.g. OpenAI for prefixes of 1024+ tokens) can then skip
+# re-processing it; only the tail with {text} differs between calls.
+FEW_SHOT_PREFIX = """You are a sentiment analyzer. Classify the sentiment as Positive, Negative, or Neutral.
+
+Examples:
+Text: "I love this product!"
+Sentiment: Positive
+
+Text: "This is terrible quality."
+Sentiment: Negative
+
+Text: "The weather is okay today."
+Sentiment: Neutral
+
+"""
+
+FEW_SHOT_SUFFIX = """Now classify this text:
+Text: "{text}"
+Sentiment:"""
+
+FEW_SHOT_BATCH_SUFFIX = """Now classify each numbered text below.
+Answer with only a JSON array of labels in the same order, e.g. ["Positive", "Neutral"].
+
+{items}
+Sentiments:"""
+
+SENTIMENT_LABELS = ("Positive", "Negative", "Neutral")
+
 def few_shot_prompting():
     """
     Few-shot prompting with examples
     """
+    from langchain_core.prompts import PromptTemplate
+    
     print("\n🎯 Few-Shot Prompting Example")
     print("=" * 40)
     
-    template = """
-    You are a sentiment analyzer. Classify the sentiment as Positive, Negative, or Neutral.
+    prompt = PromptTemplate(
+        input_variables=["text"],
+        template=FEW_SHOT_PREFIX + FEW_SHOT_SUFFIX
+    )
+    
+    return prompt
+
+def batch_few_shot_prompting():
+    """
+    Few-shot prompt that classifies several texts in one request
+    
+    Shares FEW_SHOT_PREFIX with few_shot_prompting(), so the examples are
+    paid for once per batch instead of once per text.
+    """
+    from langchain_core.prompts import PromptTemplate
+    
+    return PromptTemplate(
+        input_variables=["items"],
+        template=FEW_SHOT_PREFIX + FEW_SHOT_BATCH_SUFFIX
+    )
+
+def format_batch_items(texts):
+    """Number the texts for the batch prompt"""
+    return "\n".join(f'{i}. Text: "{text}"' for i, text in enumerate(texts, 1))
+
+def parse_batch_labels(output, count):
+    """
+    Parse the JSON array answer of a batch prompt
     
-    Examples:
-    Text: "I love this product!"
-    Sentiment: Positive
+    Returns exactly `count` labels; positions the model skipped or answered
+    with something other than a known label are None.
+    """
+    labels = []
+    start, end = output.find("["), output.rfind("]")
+    if start != -1 and end > start:
+        try:
+            labels = json.loads(output[start:end + 1])
+        except ValueError:
+            labels = []
+    if not isinstance(labels, list) or not labels:
+        # Fall back to one label per line ("1. Positive")
+        labels = [line.split(".", 1)[-1] for line in output.strip().splitlines()]
     
-    Text: "This is terrible quality."
-    Sentiment: Negative
+    cleaned = []
+    for label in labels[:count]:
+        label = str(label).strip().strip('"').capitalize()
+        cleaned.append(label if label in SENTIMENT_LABELS else None)
+    return cleaned + [None] * (count - len(cleaned))
+
+def classify_batch(llm, texts, batch_size=20):
+    """Classify texts with one LLM call per batch of batch_size"""
+    prompt = batch_few_shot_prompting()
+    labels = []
+    for i in range(0, len(texts), batch_size):
+        chunk = texts[i:i + batch_size]
+        output = llm.invoke(prompt.format(items=format_batch_items(chunk)))
+        labels.extend(parse_batch_labels(output, len(chunk)))
+    return labels
+
+def measure_batch_savings(llm, texts):
+    """Compare per-text calls with one packed call: tokens and latency per item"""
+    from langchain_core.prompts import PromptTemplate
     
-    Text: "The weather is okay today."
-    Sentiment: Neutral
+    single_prompt = PromptTemplate(input_variables=["text"], template=FEW_SHOT_PREFIX + FEW_SHOT_SUFFIX)
+    single_prompts = [single_prompt.format(text=text) for text in texts]
+    batch_prompt = batch_few_shot_prompting().format(items=format_batch_items(texts))
     
-    Now classify this text:
-    Text: "{text}"
-    Sentiment:"""
+    start = time.perf_counter()
+    for prompt in single_prompts:
+        llm.invoke(prompt)
+    single_seconds = time.perf_counter() - start
     
-    prompt = PromptTemplate(
-        input_variables=["text"],
-        template=template
-    )
+    start = time.perf_counter()
+    classify_batch(llm, texts, batch_size=len(texts))
+    batch_seconds = time.perf_counter() - start
     
-    return prompt
+    single_tokens = sum(count_tokens(p) for p in single_prompts)
+    batch_tokens = count_tokens(batch_prompt)
+    n = len(texts)
+    return {
+        "prefix_tokens": count_tokens(FEW_SHOT_PREFIX),
+        "single_tokens_per_item": single_tokens / n,
+        "batch_tokens_per_item": batch_tokens / n,
+        "tokens_saved_per_item": (single_tokens - batch_tokens) / n,
+        "single_ms_per_item": 1000 * single_seconds / n,
+        "batch_ms_per_item": 1000 * batch_seconds / n,
+        "ms_saved_per_item": 1000 * (single_seconds - batch_seconds) / n,
+    }
 
 def main():
     """
     Demonstrate different prompt techniques
     """
     
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Please set your OPENAI_API_KEY in .env file")
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
         return
     
     # Initialize LLM
-    llm = OpenAI(temperature=0.3)
+    llm = get_llm(temperature=0.3)
     
     # 1. Basic prompt template
     formatted_prompt = basic_prompt_template()
@@ -112,16 +219,43 @@ def main():
     print("\n🎯 Few-Shot Classification Results:")
     print("=" * 40)
     
-    for text in test_texts:
-        try:
-            formatted = few_shot_prompt.format(text=text)
-            result = llm.invoke(formatted)
-            print(f"Text: '{text}'")
-            print(f"Result: {result.strip()}")
-            print("-" * 20)
-            
-        except Exception as e:
-            print(f"❌ Error processing '{text}': {e}")
+    # Sentiment labels don't need the big model: LLM_ROUTING=1 sends them to the fast tier
+    from common.routing import router_from_env
+    router = router_from_env()
+    classifier = router.llm_for("sentiment", temperature=0.3) if router else llm
+    
+    # Classify concurrently; the scheduler rate-limits and retries 429s
+    scheduler = LLMScheduler.from_env()
+    formatted = [few_shot_prompt.format(text=text) for text in test_texts]
+    results = scheduler.map(classifier.invoke, formatted, estimate_tokens=count_tokens)
+    
+    for text, result in zip(test_texts, results):
+        if isinstance(result, Exception):
+            print(f"❌ Error processing '{text}': {result}")
+            continue
+        print(f"Text: '{text}'")
+        print(f"Result: {result.strip()}")
+        print("-" * 20)
+    
+    # 3. Batch classification: one request for all texts, shared prefix
+    print("\n📦 Batch Classification (one request):")
+    print("=" * 40)
+    
+    try:
+        for text, label in zip(test_texts, classify_batch(classifier, test_texts)):
+            print(f"{label or '?':<9} {text}")
+        
+        savings = measure_batch_savings(classifier, test_texts)
+        print(f"\n📉 Static prefix: {savings['prefix_tokens']} tokens")
+        print(f"   Per item: {savings['single_tokens_per_item']:.0f} -> "
+              f"{savings['batch_tokens_per_item']:.0f} prompt tokens "
+              f"({savings['tokens_saved_per_item']:.0f} saved)")
+        print(f"   Per item: {savings['single_ms_per_item']:.0f} -> "
+              f"{savings['batch_ms_per_item']:.0f} ms "
+              f"({savings['ms_saved_per_item']:.0f} ms saved)")
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
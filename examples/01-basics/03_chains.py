@@ -4,18 +4,38 @@ Understanding Chains - Connecting prompts and LLMs in sequences
 """
 
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_openai import OpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm import get_llm, has_llm_access
 
 # Load environment variables
 load_dotenv()
 
+_tracer = None
+
+def get_tracer():
+    """
+    Per-stage timing of every runnable (TRACE_STAGES=1, export with TRACE_JSONL / TRACE_PROM)
+    
+    Created on first use: tracing pulls in LangChain's callback machinery,
+    which a run that exits on a missing key should not pay for.
+    """
+    global _tracer
+    if _tracer is None:
+        from common.tracing import tracer_from_env
+        _tracer = tracer_from_env()
+    return _tracer
+
 def simple_chain():
     """
     Create a simple chain with prompt + LLM + output parser
     """
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    
     print("🔗 Simple Chain Example")
     print("=" * 30)
     
@@ -24,7 +44,7 @@ def simple_chain():
         "Write a short {adjective} story about {subject} in exactly {word_count} words."
     )
     
-    llm = OpenAI(temperature=0.8)
+    llm = get_llm(temperature=0.8)
     output_parser = StrOutputParser()
     
     # Create the chain using LCEL (LangChain Expression Language)
@@ -35,7 +55,7 @@ def simple_chain():
         "adjective": "mysterious",
         "subject": "a lost cat",
         "word_count": "50"
-    })
+    }, config=get_tracer().config())
     
     print("📖 Generated Story:")
     print(result)
@@ -45,6 +65,9 @@ def sequential_chain():
     """
     Create a chain where output of one step feeds into the next
     """
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    
     print("\n🔗 Sequential Chain Example")
     print("=" * 35)
     
@@ -63,7 +86,7 @@ def sequential_chain():
         "Write a brief introduction paragraph for a tutorial with this outline:\n{outline}"
     )
     
-    llm = OpenAI(temperature=0.7)
+    llm = get_llm(temperature=0.7)
     
     # Create individual chains
     topic_chain = topic_prompt | llm | StrOutputParser()
@@ -77,10 +100,16 @@ def main():
     Demonstrate different types of chains
     """
     
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Please set your OPENAI_API_KEY in .env file")
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
         return
     
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from common.tracing import export_from_env
+    
+    tracer = get_tracer()
+    
     try:
         # 1. Simple chain
         simple_chain()
@@ -90,15 +119,15 @@ def main():
         
         # Execute the sequential chain step by step
         print("Step 1: Generating topic...")
-        topic = topic_chain.invoke({"category": "programming"})
+        topic = topic_chain.invoke({"category": "programming"}, config=tracer.config())
         print(f"📋 Topic: {topic.strip()}")
         
         print("\nStep 2: Creating outline...")
-        outline = outline_chain.invoke({"topic": topic})
+        outline = outline_chain.invoke({"topic": topic}, config=tracer.config())
         print(f"📝 Outline:\n{outline}")
         
         print("\nStep 3: Writing introduction...")
-        introduction = intro_chain.invoke({"outline": outline})
+        introduction = intro_chain.invoke({"outline": outline}, config=tracer.config())
         print(f"✍️ Introduction:\n{introduction}")
         
         # Alternative: Chain them together in one go
@@ -116,17 +145,21 @@ def main():
         # Create a mega-chain that does all steps
         combined_chain = (
             topic_prompt_combined 
-            | OpenAI(temperature=0.7) 
+            | get_llm(temperature=0.7) 
             | StrOutputParser() 
             | (lambda topic: {"topic": topic}) 
             | outline_prompt_combined 
-            | OpenAI(temperature=0.7) 
+            | get_llm(temperature=0.7) 
             | StrOutputParser()
         )
         
-        result = combined_chain.invoke({"category": "data science"})
+        result = combined_chain.invoke({"category": "data science"}, config=tracer.config())
         print(f"🎯 Combined Result:\n{result}")
         
+        if tracer.enabled:
+            tracer.print_summary()
+            export_from_env(tracer)
+        
     except Exception as e:
         print(f"❌ Error: {e}")
 
@@ -4,13 +4,20 @@ Structuring LLM Outputs - Convert text responses to structured data
 """
 
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_openai import OpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+# CleanOutputParser and the models below are module-level classes, so their
+# bases are imported eagerly; everything else is imported where it is used
+from langchain_core.output_parsers import StrOutputParser
 from pydantic import BaseModel, Field
 from typing import List
 
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm import get_llm, has_llm_access
+from common.rate_limit import LLMScheduler
+from common.single_flight import SingleFlight
+
 # Load environment variables
 load_dotenv()
 
@@ -30,15 +37,32 @@ class ProductReview(BaseModel):
     key_points: List[str] = Field(description="Main points mentioned in the review")
     recommendation: str = Field(description="Would recommend: Yes, No, or Maybe")
 
-def json_output_parser_example():
+class CleanOutputParser(StrOutputParser):
+    """Custom output parser that cleans and formats the output"""
+    
+    def parse(self, text: str) -> str:
+        # Remove extra whitespace and format nicely
+        cleaned = text.strip()
+        # Capitalize first letter of each sentence
+        sentences = cleaned.split('. ')
+        capitalized = [s.capitalize() for s in sentences if s]
+        return '. '.join(capitalized)
+
+def json_output_parser_example(router=None):
     """
     Use JsonOutputParser to get structured JSON output
+    
+    With a ModelRouter the recipe is tried on the cheap tier first and
+    escalated when the JSON does not validate as a Recipe.
     """
+    from langchain_core.prompts import PromptTemplate
+    from common.fast_parse import FastJsonOutputParser
+    
     print("📊 JSON Output Parser Example")
     print("=" * 35)
     
-    # Create parser for Recipe model
-    parser = JsonOutputParser(pydantic_object=Recipe)
+    # Create parser for Recipe model (validates and repairs malformed JSON locally)
+    parser = FastJsonOutputParser(pydantic_object=Recipe)
     
     # Create prompt with format instructions
     prompt = PromptTemplate(
@@ -51,21 +75,30 @@ Make sure to include realistic prep time and difficulty level.""",
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
     
-    llm = OpenAI(temperature=0.3)
+    if router:
+        return router.chain("recipe", prompt, parser, temperature=0.3)
+    
+    llm = get_llm(temperature=0.3)
     
     # Create the chain
     chain = prompt | llm | parser
     
     return chain
 
-def review_analysis_parser():
+def review_analysis_parser(router=None):
     """
     Parse and analyze product reviews
+    
+    With a ModelRouter, reviews the cheap tier cannot turn into a valid
+    ProductReview are escalated to the next tier.
     """
+    from langchain_core.prompts import PromptTemplate
+    from common.fast_parse import FastJsonOutputParser
+    
     print("\n🔍 Review Analysis Parser Example")
     print("=" * 40)
     
-    parser = JsonOutputParser(pydantic_object=ProductReview)
+    parser = FastJsonOutputParser(pydantic_object=ProductReview)
     
     prompt = PromptTemplate(
         template="""Analyze the following product review and extract structured information:
@@ -79,36 +112,41 @@ Be accurate and objective in your analysis.""",
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
     
-    llm = OpenAI(temperature=0.2)
+    if router:
+        return router.chain("review", prompt, parser, temperature=0.2)
+    
+    llm = get_llm(temperature=0.2)
     chain = prompt | llm | parser
     
     return chain
 
-def string_manipulation_parser():
+def string_manipulation_parser(single_flight=None, router=None, accountant=None):
     """
     Simple string output with custom processing
+    
+    With a SingleFlight, concurrent requests for the same topic share one
+    LLM call (temperature 0.8, so the SingleFlight must be opt_in=True).
+    A ModelRouter sends quotes to its "quote" tier. With a UsageAccountant
+    the quotes get shorter as its token budget runs out.
     """
+    from langchain_core.prompts import PromptTemplate
+    
     print("\n✂️ String Manipulation Example")
     print("=" * 35)
     
-    # Custom output parser that cleans and formats the output
-    class CleanOutputParser(StrOutputParser):
-        def parse(self, text: str) -> str:
-            # Remove extra whitespace and format nicely
-            cleaned = text.strip()
-            # Capitalize first letter of each sentence
-            sentences = cleaned.split('. ')
-            capitalized = [s.capitalize() for s in sentences if s]
-            return '. '.join(capitalized)
-    
     prompt = PromptTemplate.from_template(
         "write a short motivational quote about {topic}"
     )
     
-    llm = OpenAI(temperature=0.8)
+    llm = router.llm_for("quote", temperature=0.8) if router else get_llm(temperature=0.8)
+    if accountant:
+        llm = accountant.limit(llm, max_tokens=64)
     custom_parser = CleanOutputParser()
     
-    chain = prompt | llm | custom_parser
+    if single_flight:
+        chain = prompt | single_flight.wrap(llm) | custom_parser
+    else:
+        chain = prompt | llm | custom_parser
     
     return chain
 
@@ -117,16 +155,25 @@ def main():
     Demonstrate different output parsers
     """
     
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Please set your OPENAI_API_KEY in .env file")
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
         return
     
+    from common.routing import router_from_env
+    from common.usage import TokenBudgetExceeded, UsageAccountant
+    
+    # Token usage per chain (set TOKEN_BUDGET to cap the whole run)
+    accountant = UsageAccountant.from_env()
+    # LLM_ROUTING=1: cheap model tier first, escalating on invalid output
+    router = router_from_env()
+    
     try:
         # 1. JSON Output Parser - Recipe
-        recipe_chain = json_output_parser_example()
+        recipe_chain = json_output_parser_example(router)
         
         print("Generating recipe for pasta...")
-        recipe_result = recipe_chain.invoke({"dish": "spaghetti carbonara"})
+        recipe_result = recipe_chain.invoke({"dish": "spaghetti carbonara"},
+                                            config=accountant.config("recipe"))
         
         print(f"📋 Recipe Name: {recipe_result['name']}")
         print(f"⏰ Prep Time: {recipe_result['prep_time']} minutes")
@@ -134,7 +181,7 @@ def main():
         print(f"🥘 Ingredients: {', '.join(recipe_result['ingredients'][:3])}...")
         
         # 2. Review Analysis Parser
-        review_chain = review_analysis_parser()
+        review_chain = review_analysis_parser(router)
         
         sample_reviews = [
             "This laptop is amazing! Super fast, great battery life, and the display is gorgeous. Highly recommend!",
@@ -142,27 +189,58 @@ def main():
             "It's okay, does what it says. Nothing special but gets the job done. Fair price."
         ]
         
-        for i, review in enumerate(sample_reviews, 1):
+        # Analyze all reviews concurrently under the shared rate limits
+        scheduler = LLMScheduler.from_env()
+        analyses = scheduler.map(
+            lambda review: review_chain.invoke({"review_text": review},
+                                               config=accountant.config("review_analysis")),
+            sample_reviews,
+            estimate_tokens=lambda review: 400  # format instructions dominate the prompt
+        )
+        
+        for i, analysis in enumerate(analyses, 1):
             print(f"\n--- Review {i} Analysis ---")
-            analysis = review_chain.invoke({"review_text": review})
+            if isinstance(analysis, TokenBudgetExceeded):
+                raise analysis
+            if isinstance(analysis, Exception):
+                print(f"❌ Error: {analysis}")
+                continue
             print(f"Sentiment: {analysis['sentiment']}")
             print(f"Rating: {analysis['rating']}/5 stars")
             print(f"Recommendation: {analysis['recommendation']}")
         
         # 3. Custom String Parser
-        quote_chain = string_manipulation_parser()
+        quote_flight = SingleFlight(opt_in=True)
+        quote_chain = string_manipulation_parser(single_flight=quote_flight, router=router,
+                                                 accountant=accountant)
         
         topics = ["success", "learning", "perseverance"]
         print(f"\n💬 Motivational Quotes:")
         print("=" * 25)
         
         for topic in topics:
-            quote = quote_chain.invoke({"topic": topic})
+            quote = quote_chain.invoke({"topic": topic},
+                                       config=accountant.config("motivational_quote"))
             print(f"📝 {topic.title()}: {quote}")
         
+        flight = quote_flight.stats()
+        print(f"🔀 Quote LLM calls: {flight['upstream_calls']} upstream for "
+              f"{flight['requests']} requests ({flight['collapsed']} coalesced)")
+        
+    except TokenBudgetExceeded as e:
+        print(f"⛔ Stopping early, token budget reached: {e}")
+        
     except Exception as e:
         print(f"❌ Error: {e}")
         print("Make sure your API key is valid and you have credits")
+    
+    accountant.print_summary()
+    
+    if router:
+        print("\n🧭 Model routing:")
+        for route, stats in router.stats().items():
+            served = ", ".join(f"{tier} {count}" for tier, count in stats["served"].items())
+            print(f"   {route}: {stats['calls']} calls ({served}), {stats['escalations']} escalated")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
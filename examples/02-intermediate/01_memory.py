@@ -4,8 +4,12 @@ Conversation Memory Systems - Maintaining context across interactions
 """
 
 import os
+import sys
 from dotenv import load_dotenv
-from langchain_openai import OpenAI
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm import get_llm, has_llm_access
 
 # Load environment variables
 load_dotenv()
@@ -39,7 +43,7 @@ def simple_memory_demo():
     print("💭 Simple Memory Conversation Demo")
     print("=" * 40)
     
-    llm = OpenAI(temperature=0.7)
+    llm = get_llm(temperature=0.7)
     memory = SimpleMemory(max_messages=6)  # Keep last 6 messages
     
     # Conversation steps
@@ -86,7 +90,7 @@ def window_memory_demo():
     print("\n🪟 Window Memory Demo (max 4 messages)")
     print("=" * 45)
     
-    llm = OpenAI(temperature=0.7)
+    llm = get_llm(temperature=0.7)
     memory = SimpleMemory(max_messages=4)  # Very small window
     
     inputs = [
@@ -119,8 +123,8 @@ def main():
     Run memory demonstrations
     """
     
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Please set your OPENAI_API_KEY in .env file")
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
         return
     
     try:
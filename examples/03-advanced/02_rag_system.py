@@ -4,9 +4,19 @@ Retrieval Augmented Generation - Combining document retrieval with LLM generatio
 """
 
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from langchain_openai import OpenAI
-from langchain_core.prompts import PromptTemplate
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm import get_llm, has_llm_access
+from common.context import ContextPacker
+from common.index import KeywordIndex
+from common.rate_limit import LLMScheduler
+from common.semantic_cache import SemanticCache
+from common.single_flight import SingleFlight, prompt_key
 
 # Load environment variables
 load_dotenv()
@@ -43,88 +53,230 @@ KNOWLEDGE_BASE = [
 class SimpleVectorStore:
     """Simple vector store implementation for demonstration"""
     
-    def __init__(self):
-        self.documents = []
+    def __init__(self, documents=None):
+        # A list of dicts by default; pass a ColumnarDocStore to hold large
+        # corpora compactly (documents already in it are indexed here)
+        self.documents = [] if documents is None else documents
+        # Inverted keyword index, so a query no longer re-splits every document
+        self.index = KeywordIndex()
+        self.index.add_documents(self.documents)
+        # Bumped on every change so caches can tell stale answers apart
+        self.version = 0
+        
+    def add_documents(self, docs, index=None, quiet=False):
+        """
+        Add documents to the store
         
-    def add_documents(self, docs):
-        """Add documents to the store"""
+        index may be a KeywordIndex already built over exactly these docs
+        (e.g. merged from worker processes); it is merged instead of
+        tokenizing the documents again. quiet=True skips the "Added"
+        line, for callers adding many batches.
+        """
+        if index is None:
+            index = KeywordIndex()
+            index.add_documents(docs)
+        elif len(index) != len(docs):
+            raise ValueError(f"index covers {len(index)} documents, got {len(docs)}")
         self.documents.extend(docs)
-        print(f"✅ Added {len(docs)} documents to vector store")
+        self.index.merge(index)
+        self.version += 1
+        if not quiet:
+            print(f"✅ Added {len(docs)} documents to vector store")
     
     def similarity_search(self, query, k=3):
         """Simple keyword-based search (in real implementation, use embeddings)"""
-        query_words = query.lower().split()
-        
-        # Score documents based on keyword overlap
-        scored_docs = []
-        for doc in self.documents:
-            content_words = doc['content'].lower().split()
-            title_words = doc['title'].lower().split()
-            
-            # Count overlapping words
-            content_overlap = len(set(query_words) & set(content_words))
-            title_overlap = len(set(query_words) & set(title_words)) * 2  # Weight title higher
-            
-            total_score = content_overlap + title_overlap
-            
-            if total_score > 0:
-                scored_docs.append((doc, total_score))
+        return [doc for doc, score in self.similarity_search_with_score(query, k)]
+    
+    def similarity_search_with_score(self, query, k=3):
+        """
+        Keyword-based search returning (document, score) pairs
         
-        # Sort by score and return top k
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
-        return [doc for doc, score in scored_docs[:k]]
+        Score = distinct query words in the content + 2 x distinct query
+        words in the title (titles weigh higher); best first.
+        """
+        return [(self.documents[position], score) for position, score in self.index.search(query, k)]
+
+# The instructions are a byte-identical leading segment of every RAG prompt
+# (nothing query-specific before them), so provider-side prompt caching can
+# reuse it. Only the retrieved context and the question vary.
+RAG_PROMPT_PREFIX = """Use the following pieces of context to answer the question. 
+If you don't know the answer based on the context, say that you don't know.
+
+"""
+
+RAG_PROMPT_SUFFIX = """Context:
+{context}
+Question: {question}
+
+Answer:"""
+
+# Chat turns put the conversation so far between the instructions and the context
+RAG_CHAT_SUFFIX = """Conversation so far:
+{history}
+""" + RAG_PROMPT_SUFFIX
 
 class SimpleRAG:
     """Simple RAG implementation"""
     
-    def __init__(self, llm, vector_store):
+    def __init__(self, llm, vector_store, k=2, context_packer=None, cache=None, tracer=None,
+                 scheduler=None, single_flight=None, reranker=None, candidates=None):
+        # Imported here so loading the module (or exiting on a missing key) stays cheap
+        from langchain_core.prompts import PromptTemplate
+        from common.tracing import NULL_TRACER
+        
         self.llm = llm
         self.vector_store = vector_store
+        self.k = k
+        
+        # Optional token-budget packing of the retrieved context
+        self.context_packer = context_packer
+        
+        # Optional semantic cache of previous answers
+        self.cache = cache
+        
+        # Per-stage timing (no-op unless a StageTracer is passed)
+        self.tracer = tracer or NULL_TRACER
+        
+        # Optional LLMScheduler for rate limiting and retrying LLM calls
+        self.scheduler = scheduler
+        
+        # Optional SingleFlight so identical concurrent prompts share one LLM call
+        self.single_flight = single_flight
         
-        # RAG prompt template
+        # Optional second stage: fetch `candidates` docs cheaply, re-rank them down to k
+        self.reranker = reranker
+        self.candidates = candidates or k * 5
+        
+        # RAG prompt template: static instructions first, per-query parts last
         self.prompt = PromptTemplate(
             input_variables=["context", "question"],
-            template="""Use the following pieces of context to answer the question. 
-If you don't know the answer based on the context, say that you don't know.
-
-Context:
-{context}
-Question: {question}
-
-Answer:"""
+            template=RAG_PROMPT_PREFIX + RAG_PROMPT_SUFFIX
+        )
+        self.chat_prompt = PromptTemplate(
+            input_variables=["history", "context", "question"],
+            template=RAG_PROMPT_PREFIX + RAG_CHAT_SUFFIX
         )
     
     def query(self, question):
-        """Query the RAG system"""
-        # 1. Retrieve relevant documents
-        relevant_docs = self.vector_store.similarity_search(question, k=2)
+        """Query the RAG system, answering from the cache when possible"""
+        if self.cache is None:
+            return self._answer(question)
         
-        # 2. Prepare context
-        context = "\n\n".join([f"Document {i+1}: {doc['content']}" 
-                              for i, doc in enumerate(relevant_docs)])
+        version = getattr(self.vector_store, "version", 0)
+        cached, similarity = self.cache.lookup(question, version)
+        if cached is not None:
+            return dict(cached, cached=True, cache_similarity=similarity)
         
-        # 3. Generate response
-        prompt_input = self.prompt.format(context=context, question=question)
-        response = self.llm.invoke(prompt_input)
+        start = time.perf_counter()
+        result = self._answer(question)
+        self.cache.store(question, result, version, time.perf_counter() - start)
+        return dict(result, cached=False)
+    
+    def _answer(self, question):
+        """Retrieve, build the context and generate an answer"""
+        scored_docs = self.retrieve(question)
+        prompt_input, relevant_docs, packed = self.build_prompt(question, scored_docs)
+        response = self.generate(prompt_input)
         
-        return {
+        result = {
             "answer": response.strip(),
             "sources": [doc['title'] for doc in relevant_docs],
             "retrieved_docs": relevant_docs
         }
+        if packed:
+            result["context_tokens"] = packed.used_tokens
+            result["tokens_saved"] = packed.saved_tokens
+        return result
+    
+    def retrieve(self, question):
+        """1. Retrieve relevant (document, score) pairs"""
+        if self.reranker is None:
+            with self.tracer.stage("rag:retrieve"):
+                return self.vector_store.similarity_search_with_score(question, k=self.k)
+        
+        # The reranker's latency budget covers both stages
+        started = time.perf_counter()
+        with self.tracer.stage("rag:retrieve"):
+            candidates = self.vector_store.similarity_search_with_score(question, k=self.candidates)
+        with self.tracer.stage("rag:rerank"):
+            return self.reranker.rerank(question, candidates, self.k, started=started)
+    
+    def build_prompt(self, question, scored_docs, history=None):
+        """2. Prepare the context and format the prompt (history: earlier chat turns, if any)"""
+        with self.tracer.stage("rag:format"):
+            packed = None
+            if self.context_packer:
+                packed = self.context_packer.pack(scored_docs)
+                context = packed.context
+                relevant_docs = packed.documents
+            else:
+                relevant_docs = [doc for doc, score in scored_docs]
+                context = "\n\n".join([f"Document {i+1}: {doc['content']}" 
+                                      for i, doc in enumerate(relevant_docs)])
+            
+            if history:
+                prompt_input = self.chat_prompt.format(history=history, context=context, question=question)
+            else:
+                prompt_input = self.prompt.format(context=context, question=question)
+        return prompt_input, relevant_docs, packed
+    
+    def generate(self, prompt_input):
+        """3. Generate the response"""
+        with self.tracer.stage("rag:generate"):
+            if self.single_flight is None:
+                return self._call_llm(prompt_input)
+            if self.single_flight.eligible(self.llm):
+                return self.single_flight.do(
+                    prompt_key(self.llm, prompt_input),
+                    lambda: self._call_llm(prompt_input)
+                )
+            # Not shareable, but still counted in the SingleFlight's stats
+            return self.single_flight.passthrough(lambda: self._call_llm(prompt_input))
+    
+    def _call_llm(self, prompt_input):
+        if self.scheduler:
+            return self.scheduler.invoke(self.llm, prompt_input, config=self.tracer.config())
+        return self.llm.invoke(prompt_input, config=self.tracer.config())
+    
+    def batch_query(self, questions, max_workers=None):
+        """
+        Answer many questions concurrently.
+        
+        Results are in input order; a question that failed yields its
+        exception instead of a result dict.
+        """
+        if max_workers is None:
+            max_workers = self.scheduler.max_concurrency if self.scheduler else 4
+        
+        def run(question):
+            try:
+                return self.query(question)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(run, questions))
 
 def rag_demo():
     """Demonstrate RAG system"""
+    from common.tracing import export_from_env, tracer_from_env
+    
     print("🔍 RAG System Demo")
     print("=" * 20)
     
     # Setup components
-    llm = OpenAI(temperature=0.3)
+    llm = get_llm(temperature=0.3)
     vector_store = SimpleVectorStore()
     vector_store.add_documents(KNOWLEDGE_BASE)
     
-    # Create RAG system
-    rag = SimpleRAG(llm, vector_store)
+    # Create RAG system (pack up to 3 retrieved docs into a 120-token context)
+    packer = ContextPacker(max_tokens=120)
+    cache = SemanticCache()
+    tracer = tracer_from_env()  # TRACE_STAGES=1 to time retrieve/format/generate
+    # Users asking the same question at the same moment share one answer (opt-in at temperature 0.3)
+    single_flight = SingleFlight(opt_in=True)
+    rag = SimpleRAG(llm, vector_store, k=3, context_packer=packer, cache=cache, tracer=tracer,
+                    scheduler=LLMScheduler.from_env(), single_flight=single_flight)
     
     # Test questions
     questions = [
@@ -132,7 +284,8 @@ def rag_demo():
         "How do RAG systems work?",
         "What are LangChain agents?",
         "Tell me about prompt engineering techniques",
-        "What is the weather like today?"  # Should say "don't know"
+        "What is the weather like today?",  # Should say "don't know"
+        "what's langchain"  # Rephrased repeat - served from the cache
     ]
     
     for i, question in enumerate(questions, 1):
@@ -142,19 +295,31 @@ def rag_demo():
         try:
             result = rag.query(question)
             
+            if result['cached']:
+                print(f"⚡ Cache hit (similarity {result['cache_similarity']:.2f})")
             print(f"📖 Sources: {', '.join(result['sources'])}")
+            print(f"🧮 Context: {result['context_tokens']} tokens "
+                  f"({result['tokens_saved']} saved by packing)")
             print(f"💬 Answer: {result['answer'][:200]}...")
             
         except Exception as e:
             print(f"❌ Error: {e}")
+    
+    stats = cache.stats()
+    print(f"\n📊 Cache: {stats['hits']} hits / {stats['misses']} misses "
+          f"(hit rate {stats['hit_rate']:.0%}, avg lookup {stats['avg_lookup_ms']:.2f} ms)")
+    
+    if tracer.enabled:
+        tracer.print_summary()
+        export_from_env(tracer)
 
 def main():
     """
     Run RAG system demonstration
     """
     
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Please set your OPENAI_API_KEY in .env file")
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
         return
     
     try:
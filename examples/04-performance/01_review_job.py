@@ -0,0 +1,109 @@
+"""
+01_review_job.py
+Bulk Review Analysis - Run the ProductReview chain over large CSV/JSONL files
+
+Examples:
+    python 01_review_job.py --make-sample /tmp/reviews.jsonl --rows 5000
+    python 01_review_job.py --input /tmp/reviews.jsonl --output /tmp/analysis.jsonl
+    # Interrupt it with Ctrl+C and run the same command again: it resumes
+
+Output rows are ProductReview fields plus the input row index; failed rows
+go to <output>.errors.jsonl and progress to <output>.checkpoint.json.
+Delete the checkpoint to start over (the outputs are then overwritten).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from dotenv import load_dotenv
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.jobs import CheckpointMismatch, JobRunner
+from common.llm import has_llm_access
+from common.loader import load_example
+from common.rate_limit import LLMScheduler
+
+# Load environment variables
+load_dotenv()
+
+SAMPLE_REVIEWS = [
+    "This laptop is amazing! Super fast, great battery life, and the display is gorgeous. Highly recommend!",
+    "Terrible product. Broke after 2 days. Waste of money. Customer service was unhelpful.",
+    "It's okay, does what it says. Nothing special but gets the job done. Fair price.",
+    "Great headphones, the noise cancelling is excellent but the case feels cheap.",
+    "Worst purchase this year. The app keeps crashing and support never answered.",
+]
+
+def make_sample(path, rows):
+    """Write a JSONL file of synthetic reviews"""
+    rng = random.Random(0)
+    with open(path, "w") as f:
+        for i in range(rows):
+            f.write(json.dumps({"id": f"r{i}", "review_text": rng.choice(SAMPLE_REVIEWS)}) + "\n")
+    print(f"✅ Wrote {rows} sample reviews to {path}")
+
+def build_analyzer(text_field):
+    """row -> ProductReview dict, rate limited and retried by LLMScheduler"""
+    parsers = load_example("01-basics/04_output_parsers.py")
+    review_chain = parsers.review_analysis_parser()
+    scheduler = LLMScheduler.from_env()
+    
+    def analyze(row):
+        result = scheduler.call(review_chain.invoke, {"review_text": row[text_field]},
+                                estimated_tokens=400)
+        if "id" in row:
+            result = dict(result, id=row["id"])
+        return result
+    
+    return analyze
+
+def main():
+    """
+    Run (or resume) a bulk review analysis job
+    """
+    parser = argparse.ArgumentParser(description="Bulk ProductReview analysis with checkpointing")
+    parser.add_argument("--input", help="CSV or JSONL file of reviews")
+    parser.add_argument("--output", help="JSONL file (or directory with --format parquet)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--text-field", default="review_text")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--checkpoint-every", type=int, default=200)
+    parser.add_argument("--make-sample", metavar="PATH", help="write a synthetic input file and exit")
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+    
+    if args.make_sample:
+        make_sample(args.make_sample, args.rows)
+        return
+    
+    if not args.input or not args.output:
+        parser.error("--input and --output are required")
+    
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
+        return
+    
+    print("📦 Bulk Review Analysis Job")
+    print("=" * 30)
+    
+    runner = JobRunner(
+        build_analyzer(args.text_field),
+        args.input,
+        args.output,
+        concurrency=args.concurrency,
+        checkpoint_every=args.checkpoint_every,
+        output_format=args.format
+    )
+    
+    try:
+        runner.run()
+    except CheckpointMismatch as e:
+        print(f"❌ Error: {e}")
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted - run the same command again to resume from the last checkpoint")
+
+if __name__ == "__main__":
+    main()
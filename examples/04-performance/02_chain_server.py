@@ -0,0 +1,427 @@
+"""
+02_chain_server.py
+Chain Server - Serve the RAG pipeline, parser chains and chat memory over HTTP
+
+The one-shot examples rebuild their LLMs, prompts and vector store on every
+run. This server builds them once at startup and then only runs the query
+per request. It is a plain ASGI app, so any ASGI server can host it; run
+directly it uses uvicorn (pip install uvicorn).
+
+Examples:
+    FAKE_LLM=1 python 02_chain_server.py --port 8000
+    curl localhost:8000/health
+    curl -X POST localhost:8000/rag/query -d '{"question": "What is LangChain?"}'
+    curl -N -X POST localhost:8000/rag/query -d '{"question": "How do RAG systems work?", "stream": true}'
+    curl -X POST localhost:8000/parse/review -d '{"review_text": "Great value, fast shipping"}'
+    curl -N -X POST localhost:8000/chat -d '{"session_id": "s1", "message": "Hi, I am Sam", "stream": true}'
+    curl localhost:8000/metrics
+
+Endpoints:
+    GET  /health          status, uptime and in-flight requests
+    GET  /metrics         Prometheus text: per-stage histograms plus server gauges
+    POST /rag/query       {"question", "stream"?}
+    POST /parse/recipe    {"dish"}
+    POST /parse/review    {"review_text"}
+    POST /parse/quote     {"topic"}
+    POST /chat            {"session_id", "message", "stream"?}
+
+With "stream": true the answer is sent as server-sent events: one
+`data: {"token": ...}` event per chunk, then `data: {"done": true, ...}`.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from dotenv import load_dotenv
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm import get_llm, has_llm_access
+from common.loader import load_example
+
+# Load environment variables
+load_dotenv()
+
+CHAT_PROMPT = """You are a helpful educational assistant. Here's our conversation:
+
+{history}
+
+Please respond helpfully to the latest message."""
+
+# Routes recorded under their own metric label; anything else is "unmatched",
+# so arbitrary request paths cannot grow the label set
+ROUTES = {"GET /health", "GET /metrics", "POST /rag/query", "POST /chat"}
+PARSE_PREFIX = "POST /parse/"
+
+# Expected completion size reserved against the tokens/minute limit
+STREAM_MAX_TOKENS = 256
+
+class HTTPError(Exception):
+    """Error that is returned to the client as {"error": message}"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ChainService:
+    """Everything that is built once and shared by all requests"""
+
+    def __init__(self, max_sessions=1000, session_messages=10):
+        from common.context import ContextPacker
+        from common.rate_limit import LLMScheduler
+        from common.semantic_cache import SemanticCache
+        from common.single_flight import SingleFlight
+        from common.tracing import StageTracer
+
+        self.started = time.time()
+        # Histograms only: a long-running process must not keep every event
+        self.tracer = StageTracer(keep_events=False)
+        self.scheduler = LLMScheduler.from_env()
+        self.single_flight = SingleFlight(opt_in=True)
+        # Blocking work (retrieval, scheduled LLM calls) runs here, off the event loop
+        self.executor = ThreadPoolExecutor(max_workers=self.scheduler.max_concurrency)
+
+        # The example modules print banners while building their chains
+        with contextlib.redirect_stdout(io.StringIO()):
+            rag_module = load_example("03-advanced/02_rag_system.py")
+            parsers = load_example("01-basics/04_output_parsers.py")
+            self.memory_class = load_example("02-intermediate/01_memory.py").SimpleMemory
+
+            self.vector_store = rag_module.SimpleVectorStore()
+            self.vector_store.add_documents(rag_module.KNOWLEDGE_BASE)
+            self.rag = rag_module.SimpleRAG(
+                get_llm(temperature=0.3), self.vector_store, k=3,
+                context_packer=ContextPacker(max_tokens=120),
+                cache=SemanticCache(),
+                tracer=self.tracer,
+                scheduler=self.scheduler,
+                single_flight=self.single_flight
+            )
+            # name -> (chain, input field, estimated tokens per call)
+            self.parser_chains = {
+                "recipe": (parsers.json_output_parser_example(), "dish", 400),
+                "review": (parsers.review_analysis_parser(), "review_text", 400),
+                "quote": (parsers.string_manipulation_parser(single_flight=self.single_flight), "topic", 100),
+            }
+
+        self.chat_llm = get_llm(temperature=0.7)
+        # session_id -> (SimpleMemory, asyncio.Lock), least recently used first
+        self.sessions = OrderedDict()
+        self.max_sessions = max_sessions
+        self.session_messages = session_messages
+
+    async def run_blocking(self, fn, *args):
+        """Run a blocking call on the shared thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def stream_scheduled(self, llm, prompt):
+        """
+        Yield llm.astream(prompt) chunks inside one LLMScheduler slot.
+
+        The slot is taken before the first token (rate limits and adaptive
+        concurrency apply), but a stream is not retried: a failure
+        mid-stream is reported in-band.
+        """
+        from common.tokens import count_tokens
+
+        await self.run_blocking(self.scheduler.admit, count_tokens(prompt) + STREAM_MAX_TOKENS)
+        error = None
+        try:
+            async for chunk in llm.astream(prompt, config=self.tracer.config()):
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.scheduler.finish(error)
+
+    def session(self, session_id):
+        """The (memory, lock) for a session, evicting the least recently used beyond max_sessions"""
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            entry = self.sessions[session_id] = (self.memory_class(max_messages=self.session_messages),
+                                                 asyncio.Lock())
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+        return entry
+
+    # -- RAG -------------------------------------------------------------------
+
+    async def rag_query(self, question):
+        result = await self.run_blocking(self.rag.query, question)
+        result.pop("retrieved_docs", None)
+        return result
+
+    async def rag_stream(self, question):
+        """Yield answer chunks, then a final dict with the sources"""
+        rag = self.rag
+        version = self.vector_store.version
+        cached, similarity = rag.cache.lookup(question, version)
+        if cached is not None:
+            yield cached["answer"]
+            yield {"sources": cached["sources"], "cached": True, "cache_similarity": similarity}
+            return
+
+        start = time.perf_counter()
+        scored_docs = await self.run_blocking(rag.retrieve, question)
+        prompt_input, relevant_docs, packed = rag.build_prompt(question, scored_docs)
+
+        chunks = []
+        async for chunk in self.stream_scheduled(rag.llm, prompt_input):
+            chunks.append(chunk)
+            yield chunk
+
+        result = {"answer": "".join(chunks).strip(), "sources": [doc['title'] for doc in relevant_docs]}
+        rag.cache.store(question, result, version, time.perf_counter() - start)
+        yield {"sources": result["sources"], "cached": False}
+
+    # -- Parser chains -----------------------------------------------------------
+
+    async def parse(self, name, body):
+        chain, field, estimated_tokens = self.parser_chains[name]
+        call = partial(self.scheduler.call, chain.invoke, {field: require(body, field)},
+                       config=self.tracer.config(), estimated_tokens=estimated_tokens)
+        return await self.run_blocking(call)
+
+    # -- Chat ----------------------------------------------------------------------
+
+    async def chat_stream(self, session_id, message):
+        """Yield reply chunks, then a final dict; turns of one session run one at a time"""
+        memory, lock = self.session(session_id)
+        async with lock:
+            memory.add_message("Human", message)
+            prompt = CHAT_PROMPT.format(history=memory.get_history())
+            chunks = []
+            async for chunk in self.stream_scheduled(self.chat_llm, prompt):
+                chunks.append(chunk)
+                yield chunk
+            memory.add_message("Assistant", "".join(chunks).strip())
+            yield {"session_id": session_id, "messages": len(memory.messages)}
+
+    # -- Metrics -------------------------------------------------------------------
+
+    def metrics_text(self, in_flight):
+        """Stage histograms plus server, cache, scheduler and coalescing gauges"""
+        cache = self.rag.cache.stats()
+        scheduler = self.scheduler.stats()
+        flight = self.single_flight.stats()
+        gauges = {
+            "chain_server_uptime_seconds": time.time() - self.started,
+            "chain_server_requests_in_flight": in_flight,
+            "chain_server_sessions": len(self.sessions),
+            "chain_server_rag_cache_entries": cache["entries"],
+            "chain_server_rag_cache_hit_rate": cache["hit_rate"],
+            "chain_server_llm_calls_total": scheduler["calls"],
+            "chain_server_llm_retries_total": scheduler["retries"],
+            "chain_server_llm_rate_limited_total": scheduler["rate_limited"],
+            "chain_server_llm_concurrency_limit": scheduler["concurrency_limit"],
+            "chain_server_coalesced_requests_total": flight["collapsed"],
+        }
+        lines = [self.tracer.prometheus_text().rstrip("\n")]
+        for name, value in gauges.items():
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def require(body, field):
+    value = body.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{field}' must be a non-empty string")
+    return value
+
+# -- ASGI plumbing -------------------------------------------------------------------
+
+async def read_json(receive):
+    """Read the whole request body and decode it as a JSON object"""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    raw = b"".join(chunks)
+    if not raw:
+        return {}
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        raise HTTPError(400, "request body is not valid JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "request body must be a JSON object")
+    return body
+
+async def send_response(send, status, body, content_type="application/json"):
+    if content_type == "application/json":
+        body = json.dumps(body, default=str)
+    data = body.encode("utf-8")
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", content_type.encode()),
+                            (b"content-length", str(len(data)).encode())]})
+    await send({"type": "http.response.body", "body": data})
+
+async def send_event_stream(send, events):
+    """Send an async iterator of chunks (str) and a final dict as server-sent events"""
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/event-stream"),
+                            (b"cache-control", b"no-cache")]})
+    try:
+        async for event in events:
+            payload = {"token": event} if isinstance(event, str) else dict(event, done=True)
+            await send({"type": "http.response.body", "more_body": True,
+                        "body": f"data: {json.dumps(payload)}\n\n".encode("utf-8")})
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        await send({"type": "http.response.body", "more_body": True,
+                    "body": f"data: {json.dumps({'error': str(e), 'done': True})}\n\n".encode("utf-8")})
+    await send({"type": "http.response.body", "body": b""})
+
+class ChainServerApp:
+    """
+    ASGI application: routes requests to a ChainService
+
+    The service is built on the lifespan startup event (or on the first
+    request when the server does not send lifespan events).
+    """
+
+    def __init__(self, max_in_flight=256, **service_options):
+        self.service = None
+        self.service_options = service_options
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    def get_service(self):
+        if self.service is None:
+            self.service = ChainService(**self.service_options)
+        return self.service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.handle(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.get_service()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.service:
+                    self.service.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def route_label(route, service):
+        """route if the server serves it, else 'unmatched' (metric labels must stay bounded)"""
+        if route in ROUTES or (route.startswith(PARSE_PREFIX) and route[len(PARSE_PREFIX):] in service.parser_chains):
+            return route
+        return "unmatched"
+
+    async def handle(self, scope, receive, send):
+        route = f"{scope['method']} {scope['path']}"
+        service = self.get_service()
+
+        # Shed load instead of queueing without bound
+        if self.in_flight >= self.max_in_flight:
+            await send_response(send, 503, {"error": "server busy, retry later"})
+            return
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        error = None
+        try:
+            await self.dispatch(route, service, receive, send)
+        except HTTPError as e:
+            error = e
+            await send_response(send, e.status, {"error": str(e)})
+        except Exception as e:
+            error = e
+            await send_response(send, 500, {"error": repr(e)})
+        finally:
+            self.in_flight -= 1
+            service.tracer.record(f"http:{self.route_label(route, service)}", time.perf_counter() - start,
+                                  error=error)
+
+    async def dispatch(self, route, service, receive, send):
+        if route == "GET /health":
+            await send_response(send, 200, {
+                "status": "ok",
+                "uptime_s": round(time.time() - service.started, 1),
+                "in_flight": self.in_flight,
+                "documents": len(service.vector_store.documents),
+                "sessions": len(service.sessions),
+            })
+        elif route == "GET /metrics":
+            await send_response(send, 200, service.metrics_text(self.in_flight),
+                                content_type="text/plain; version=0.0.4")
+        elif route == "POST /rag/query":
+            body = await read_json(receive)
+            question = require(body, "question")
+            if body.get("stream"):
+                await send_event_stream(send, service.rag_stream(question))
+            else:
+                await send_response(send, 200, await service.rag_query(question))
+        elif route.startswith(PARSE_PREFIX) and route[len(PARSE_PREFIX):] in service.parser_chains:
+            body = await read_json(receive)
+            await send_response(send, 200, await service.parse(route[len(PARSE_PREFIX):], body))
+        elif route == "POST /chat":
+            body = await read_json(receive)
+            events = service.chat_stream(require(body, "session_id"), require(body, "message"))
+            if body.get("stream"):
+                await send_event_stream(send, events)
+            else:
+                chunks = []
+                async for event in events:
+                    chunks.append(event)
+                await send_response(send, 200, dict(chunks[-1], reply="".join(chunks[:-1]).strip()))
+        else:
+            raise HTTPError(404, f"no route for {route}")
+
+app = ChainServerApp()
+
+def main():
+    """
+    Serve the chains with uvicorn
+    """
+    parser = argparse.ArgumentParser(description="Serve the RAG pipeline, parser chains and chat over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-in-flight", type=int, default=256, help="requests beyond this get a 503")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="chat sessions kept in memory")
+    args = parser.parse_args()
+
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
+        return
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ Server mode needs uvicorn: pip install uvicorn")
+        return
+
+    print("🌐 Chain Server")
+    print("=" * 20)
+    print(f"Listening on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    server_app = ChainServerApp(max_in_flight=args.max_in_flight, max_sessions=args.max_sessions)
+    uvicorn.run(server_app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
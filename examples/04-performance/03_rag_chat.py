@@ -0,0 +1,152 @@
+"""
+03_rag_chat.py
+RAG Chat - Conversation memory plus retrieval, with overlapped turns
+
+Examples:
+    python 03_rag_chat.py
+    python 03_rag_chat.py --extra-docs 200000 --window 4
+    python 03_rag_chat.py --no-compare   # overlapped run only
+
+Each turn retrieves documents for the new message on a worker thread
+while the memory window is summarized and rendered, and follow-up
+messages on the same topic reuse the previous retrieval. The same
+conversation is first run sequentially and then overlapped without reuse,
+so the saving from each can be reported separately.
+"""
+
+import argparse
+import os
+import random
+import sys
+from dotenv import load_dotenv
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.context import ContextPacker
+from common.conversation import ConversationalRAG, RetrievalReuse
+from common.llm import get_llm, has_llm_access
+from common.loader import load_example
+from common.rerank import Reranker, idf_scorer
+
+# Load environment variables
+load_dotenv()
+
+CONVERSATION = [
+    "Hi, I'm building a support bot. What is LangChain?",
+    "What components does LangChain provide?",
+    "Can you explain more?",
+    "How do RAG systems work?",
+    "How does a RAG system retrieve documents?",
+    "What about vector databases and semantic search?",
+    "And how do LangChain agents decide what actions to take?",
+    "What did I say I was building?",
+]
+
+SUMMARY_PROMPT = """Progressively summarize the conversation, keeping names and facts.
+
+Current summary: {summary}
+
+New lines:
+{lines}
+
+New summary:"""
+
+# Filler documents share only these everyday words with the conversation
+COMMON_WORDS = ["what", "how", "does", "do", "a", "the", "and", "i", "is", "to", "can", "you"]
+
+def make_extra_docs(count, seed=0):
+    """Off-topic filler documents, so retrieval costs what it would on a real corpus"""
+    rng = random.Random(seed)
+    rare = [f"w{i}" for i in range(5000)]
+    words = COMMON_WORDS * 50 + rare
+    return [{"id": f"extra{i}", "title": " ".join(rng.choices(rare, k=3)),
+             "content": " ".join(rng.choices(words, k=60))} for i in range(count)]
+
+def make_summarizer(llm):
+    """summary, dropped messages -> new summary, with one LLM call"""
+    def summarize(summary, messages):
+        lines = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        return llm.invoke(SUMMARY_PROMPT.format(summary=summary or "(none)", lines=lines)).strip()
+    return summarize
+
+def run_conversation(rag, memory_class, llm, window, overlap, reuse, verbose):
+    """Run CONVERSATION once; return per-turn seconds and the reuse stats"""
+    reuse = RetrievalReuse() if reuse else None
+    chat = ConversationalRAG(rag, memory_class(max_messages=window), summarize=make_summarizer(llm),
+                             reuse=reuse, overlap=overlap)
+    seconds = []
+    with chat:
+        for i, message in enumerate(CONVERSATION, 1):
+            try:
+                result = chat.turn(message)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                continue
+            seconds.append(result["seconds"])
+            if verbose:
+                print(f"\n--- Turn {i} ---")
+                print(f"👤 User: {message}")
+                note = "♻️  reused topic retrieval" if result["reused"] else "🔍 retrieved"
+                print(f"{note}: {', '.join(result['sources']) or '(no sources)'}")
+                print(f"🤖 Assistant: {result['answer'][:150]}...")
+                print(f"⏱️  {1000 * result['seconds']:.0f} ms")
+    return seconds, reuse.stats() if reuse else None
+
+def main():
+    """
+    Run the RAG chat, sequentially and overlapped
+    """
+    parser = argparse.ArgumentParser(description="RAG chat with overlapped retrieval and topic reuse")
+    parser.add_argument("--extra-docs", type=int, default=50000, help="filler documents added to the corpus")
+    parser.add_argument("--window", type=int, default=4, help="messages kept in memory before summarizing")
+    parser.add_argument("--no-compare", action="store_true",
+                        help="skip the sequential and no-reuse runs")
+    args = parser.parse_args()
+
+    if not has_llm_access():
+        print("❌ Please set your OPENAI_API_KEY in .env file (or FAKE_LLM=1 to run offline)")
+        return
+
+    rag_module = load_example("03-advanced/02_rag_system.py")
+    memory_class = load_example("02-intermediate/01_memory.py").SimpleMemory
+
+    print("💬 RAG Chat Demo")
+    print("=" * 40)
+
+    llm = get_llm(temperature=0.3)
+    vector_store = rag_module.SimpleVectorStore()
+    vector_store.add_documents(rag_module.KNOWLEDGE_BASE + make_extra_docs(args.extra_docs))
+
+    def run(overlap, reuse, verbose=False):
+        # A fresh RAG and Reranker per run, so each run's stats are its own. Two-stage
+        # retrieval: 20 keyword candidates re-ranked by query-word rarity
+        reranker = Reranker(scorer=idf_scorer(vector_store.index))
+        rag = rag_module.SimpleRAG(llm, vector_store, k=3, context_packer=ContextPacker(max_tokens=120),
+                                   reranker=reranker, candidates=20)
+        seconds, stats = run_conversation(rag, memory_class, llm, args.window, overlap=overlap,
+                                          reuse=reuse, verbose=verbose)
+        return sum(seconds) / len(seconds), stats, reranker.stats()
+
+    try:
+        sequential = no_reuse = None
+        if not args.no_compare:
+            sequential, _, _ = run(overlap=False, reuse=False)
+            no_reuse, _, _ = run(overlap=True, reuse=False)
+        overlapped, stats, rerank = run(overlap=True, reuse=True, verbose=True)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return
+
+    print(f"\n📊 Topic reuse: {stats['hits']} hits / {stats['misses']} misses "
+          f"(hit rate {stats['hit_rate']:.0%}, {stats['saved_ms']:.0f} ms of retrieval skipped)")
+    print(f"🔀 Re-rank: {rerank['scored']} candidates scored, {rerank['skipped']} skipped by early cut-off")
+    print(f"⏱️  Overlapped + reuse: {1000 * overlapped:.0f} ms per turn")
+    if sequential:
+        print(f"⏱️  Sequential:         {1000 * sequential:.0f} ms per turn")
+        print(f"⏱️  Overlapped only:    {1000 * no_reuse:.0f} ms per turn "
+              f"({1 - no_reuse / sequential:.0%} saved by overlapping)")
+        print(f"⏱️  Reuse on top:       {1000 * (no_reuse - overlapped):.0f} ms per turn "
+              f"({1 - overlapped / no_reuse:.0%} saved by topic reuse)")
+
+if __name__ == "__main__":
+    main()
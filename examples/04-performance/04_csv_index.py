@@ -0,0 +1,123 @@
+"""
+04_csv_index.py
+CSV Indexing - Stream a large CSV into the keyword store as typed documents
+
+Examples:
+    python 04_csv_index.py --make-sample /tmp/products.csv --rows 1000000
+    python 04_csv_index.py --input /tmp/products.csv --query "wireless headphones"
+    python 04_csv_index.py --input data.csv --id id --title name \\
+        --content name description --metadata price:float in_stock:bool added:date
+
+Rows are read and indexed in batches (--batch-size), so only one batch of
+rows is held at a time. With --columnar the documents go into a compact
+ColumnarDocStore (id, title and content only - metadata is not kept).
+"""
+
+import argparse
+import os
+import random
+import sys
+from dotenv import load_dotenv
+
+# Make the shared helpers in examples/common importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.csv_ingest import CsvIngestor, CsvMapping, parse_column_spec
+from common.loader import load_example
+
+# Load environment variables
+load_dotenv()
+
+ADJECTIVES = ["wireless", "compact", "ergonomic", "waterproof", "portable", "smart", "vintage", "solar"]
+PRODUCTS = ["headphones", "keyboard", "backpack", "lamp", "speaker", "camera", "kettle", "watch"]
+CATEGORIES = ["electronics", "home", "outdoor", "office"]
+FEATURES = ["long battery life", "fast charging", "noise cancelling", "recycled materials",
+            "two year warranty", "bluetooth", "usb-c", "touch controls", "dishwasher safe"]
+
+def make_sample(path, rows):
+    """Write a CSV of synthetic products (about 1 in 500 rows has a bad price)"""
+    rng = random.Random(0)
+    with open(path, "w") as f:
+        f.write("sku,name,category,description,price,in_stock,added,tags\n")
+        for i in range(rows):
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(PRODUCTS)}"
+            description = f"A {name} with {rng.choice(FEATURES)} and {rng.choice(FEATURES)}"
+            price = "N/A" if i % 500 == 499 else f"{rng.uniform(5, 500):.2f}"
+            added = f"20{rng.randint(18, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            tags = ";".join(rng.sample(FEATURES, 2))
+            f.write(f"p{i},{name},{rng.choice(CATEGORIES)},{description},{price},"
+                    f"{rng.choice(['yes', 'no'])},{added},{tags}\n")
+    print(f"✅ Wrote {rows} sample products to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+def main():
+    """
+    Index a CSV file and run a query against it
+    """
+    parser = argparse.ArgumentParser(description="Stream a CSV file into the keyword store")
+    parser.add_argument("--input", help="CSV file to index")
+    parser.add_argument("--id", default="sku", help="column with the document id")
+    parser.add_argument("--title", nargs="*", default=["name"], help="columns joined into the title")
+    parser.add_argument("--content", nargs="+", default=["name", "category", "description", "tags"],
+                        help="columns rendered into the searchable content")
+    parser.add_argument("--metadata", nargs="*", metavar="COLUMN:TYPE",
+                        default=["price:float", "in_stock:bool", "added:date", "tags:list"],
+                        help="typed metadata columns (str, int, float, bool, date, list)")
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--columnar", action="store_true", help="store documents in a ColumnarDocStore")
+    parser.add_argument("--query", default="waterproof speaker")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--make-sample", metavar="PATH", help="write a synthetic products CSV and exit")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    if args.make_sample:
+        make_sample(args.make_sample, args.rows)
+        return
+
+    if not args.input:
+        parser.error("--input is required")
+
+    try:
+        mapping = CsvMapping(args.content, title_columns=args.title, id_column=args.id or None,
+                             metadata=dict(parse_column_spec(spec) for spec in args.metadata))
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return
+
+    print("📊 CSV Indexing")
+    print("=" * 30)
+
+    rag_module = load_example("03-advanced/02_rag_system.py")
+    if args.columnar:
+        from common.docstore import ColumnarDocStore
+        store = rag_module.SimpleVectorStore(ColumnarDocStore())
+    else:
+        store = rag_module.SimpleVectorStore()
+
+    def progress(stats):
+        print(f"📥 {stats['rows']} rows, {stats['skipped']} skipped "
+              f"({stats['rows_per_s']:.0f} rows/s)")
+
+    ingestor = CsvIngestor(mapping, batch_size=args.batch_size, delimiter=args.delimiter)
+    try:
+        stats = ingestor.ingest(store, args.input, progress=progress)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return
+
+    print(f"\n✅ Indexed {stats['documents']} documents from {stats['rows']} rows in "
+          f"{stats['seconds']:.1f}s ({stats['rows_per_s']:.0f} rows/s, {stats['mb_per_s']:.1f} MB/s)")
+    if ingestor.errors:
+        print(f"⚠️  {stats['skipped']} rows skipped, e.g.:")
+        for line, error in ingestor.errors[:3]:
+            print(f"   line {line}: {error}")
+
+    print(f"\n🔍 {args.query!r}:")
+    for doc, score in store.similarity_search_with_score(args.query, k=args.k):
+        print(f"   [{score}] {doc['id']}: {doc['title']}")
+        metadata = doc.get("metadata")
+        if metadata:
+            print(f"        {metadata}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+common
+Shared helpers used by the examples (token counting, context packing, ...)
+
+The example scripts are meant to be run from their own folder, so they add
+the ``examples/`` directory to ``sys.path`` before importing from here.
+"""
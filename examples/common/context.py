@@ -0,0 +1,153 @@
+"""
+context.py
+Context packing - fit retrieved documents into a prompt under a token budget
+"""
+
+import random
+import zlib
+
+from .tokens import count_tokens, truncate_to_tokens
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """MinHash signatures over word shingles for near-duplicate detection"""
+
+    def __init__(self, num_perm=64, shingle_size=3, seed=42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+        # Fixed seed so signatures are comparable across calls and runs
+        rng = random.Random(seed)
+        self.params = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def shingles(self, text):
+        """Return the set of hashed word n-grams in text"""
+        words = text.lower().split()
+        n = self.shingle_size
+        if len(words) < n:
+            return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+        return {
+            zlib.crc32(" ".join(words[i:i + n]).encode("utf-8"))
+            for i in range(len(words) - n + 1)
+        }
+
+    def signature(self, text):
+        """Compute the MinHash signature of text"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(
+            min(((a * s + b) % _MERSENNE_PRIME) & _MAX_HASH for s in shingles)
+            for a, b in self.params
+        )
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """Estimate the Jaccard similarity of two signatures"""
+        matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return matches / len(sig_a)
+
+
+class PackedContext:
+    """Result of packing documents into a context window"""
+
+    def __init__(self, context, documents, used_tokens, original_tokens,
+                 dropped_duplicates=0, dropped_over_budget=0, trimmed=0):
+        self.context = context
+        self.documents = documents
+        self.used_tokens = used_tokens
+        self.original_tokens = original_tokens
+        self.dropped_duplicates = dropped_duplicates
+        self.dropped_over_budget = dropped_over_budget
+        self.trimmed = trimmed
+
+    @property
+    def saved_tokens(self):
+        """Tokens that would have been sent without packing"""
+        return self.original_tokens - self.used_tokens
+
+    def summary(self):
+        """One-line description of what packing did"""
+        return (f"{self.used_tokens}/{self.original_tokens} context tokens "
+                f"(saved {self.saved_tokens}, {self.dropped_duplicates} duplicates dropped, "
+                f"{self.trimmed} trimmed, {self.dropped_over_budget} over budget)")
+
+
+class ContextPacker:
+    """Pack the highest-scoring documents into a prompt context under a token budget"""
+
+    def __init__(self, max_tokens=512, duplicate_threshold=0.8, min_chunk_tokens=32,
+                 encoding="cl100k_base", hasher=None):
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.min_chunk_tokens = min_chunk_tokens
+        self.encoding = encoding
+        self.hasher = hasher or MinHasher()
+
+    @staticmethod
+    def format_document(index, content):
+        """Format one document the same way SimpleRAG always has"""
+        return f"Document {index}: {content}"
+
+    def pack(self, scored_docs):
+        """
+        Pack (doc, score) pairs into a context string.
+
+        Documents are taken in descending score order. Near-duplicates of an
+        already packed document are dropped, a document that only partly fits
+        is trimmed to the remaining budget, and the rest are dropped.
+        """
+        ranked = sorted(scored_docs, key=lambda pair: pair[1], reverse=True)
+        separator_tokens = count_tokens("\n\n", self.encoding)
+
+        # What the unpacked context would have cost
+        original_parts = [self.format_document(i + 1, doc['content'])
+                          for i, (doc, _) in enumerate(ranked)]
+        original_tokens = count_tokens("\n\n".join(original_parts), self.encoding)
+
+        parts, packed_docs, signatures = [], [], []
+        used = 0
+        duplicates = over_budget = trimmed = 0
+
+        for doc, _score in ranked:
+            signature = self.hasher.signature(doc['content'])
+            if any(self.hasher.similarity(signature, seen) >= self.duplicate_threshold
+                   for seen in signatures):
+                duplicates += 1
+                continue
+
+            budget_left = self.max_tokens - used - (separator_tokens if parts else 0)
+            part = self.format_document(len(parts) + 1, doc['content'])
+            part_tokens = count_tokens(part, self.encoding)
+
+            if part_tokens > budget_left:
+                if budget_left < self.min_chunk_tokens:
+                    over_budget += 1
+                    continue
+                part = truncate_to_tokens(part, budget_left, self.encoding)
+                if not part:
+                    over_budget += 1
+                    continue
+                part_tokens = count_tokens(part, self.encoding)
+                trimmed += 1
+
+            used += part_tokens + (separator_tokens if parts else 0)
+            parts.append(part)
+            packed_docs.append(doc)
+            signatures.append(signature)
+
+        return PackedContext(
+            context="\n\n".join(parts),
+            documents=packed_docs,
+            used_tokens=used,
+            original_tokens=original_tokens,
+            dropped_duplicates=duplicates,
+            dropped_over_budget=over_budget,
+            trimmed=trimmed,
+        )
@@ -0,0 +1,181 @@
+"""
+conversation.py
+RAG-backed chat turns with overlapped retrieval and topic-level reuse
+
+A naive RAG chat turn runs strictly in sequence: store the message,
+summarize whatever falls out of the memory window, render the history,
+retrieve, then call the LLM. Retrieval only needs the new message, so
+ConversationalRAG starts it on a worker thread the moment the message
+arrives and does the memory work (including the summarization LLM call)
+meanwhile. Follow-up messages on the same topic skip retrieval altogether
+and reuse the documents retrieved for the turn that opened the topic.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .semantic_cache import normalize_question
+from .tokens import STOPWORDS
+
+# Words that say nothing about the topic of a chat message
+_FILLER = STOPWORDS | {
+    "what", "how", "why", "who", "which", "when", "where", "can", "could", "would", "you",
+    "i", "my", "it", "its", "they", "them", "their", "this", "that", "these", "those",
+    "and", "or", "in", "on", "to", "for", "with", "more", "some", "any", "also", "again",
+    "explain", "give", "example", "examples", "use", "used", "work", "works",
+}
+
+def topic_terms(text):
+    """Content words of a message, without question words and filler, plurals folded"""
+    words = normalize_question(text).split()
+    return {word[:-1] if len(word) > 3 and word.endswith("s") else word
+            for word in words if word not in _FILLER}
+
+
+class RetrievalReuse:
+    """
+    Remember the retrieval of the current topic and reuse it for follow-ups.
+
+    A message continues the topic when it has no content words of its own
+    ("can you explain more?") or when the Jaccard overlap of its content
+    words with the topic's is at least threshold. Results are dropped when
+    the vector store's version changes.
+    """
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+        self.terms = None
+        self.version = None
+        self.scored_docs = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._retrieve_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def lookup(self, message, version):
+        """The topic's (document, score) pairs if message continues it, else None"""
+        with self._lock:
+            terms = topic_terms(message)
+            if self.scored_docs is not None and version == self.version:
+                union = terms | self.terms
+                if not terms or len(terms & self.terms) / len(union) >= self.threshold:
+                    self.hits += 1
+                    self.saved_seconds += self._retrieve_seconds
+                    return self.scored_docs
+            self.misses += 1
+            return None
+
+    def store(self, message, version, scored_docs, seconds):
+        """Start a new topic from message's retrieval"""
+        with self._lock:
+            self.terms = topic_terms(message)
+            self.version = version
+            self.scored_docs = scored_docs
+            self._retrieve_seconds = seconds
+
+    def stats(self):
+        """Snapshot of reuse metrics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_ms": 1000 * self.saved_seconds,
+            }
+
+
+class ConversationalRAG:
+    """
+    Chat over a SimpleRAG with a SimpleMemory window.
+
+    summarize(summary, dropped_messages) -> new summary is called with the
+    messages that are about to fall out of the window (e.g. an LLM call);
+    without it they are simply forgotten, as in SimpleMemory. With
+    overlap=False every turn runs sequentially, for comparison.
+    """
+
+    def __init__(self, rag, memory, summarize=None, reuse=None, overlap=True, executor=None):
+        self.rag = rag
+        self.memory = memory
+        self.summarize = summarize
+        self.summary = ""
+        self.reuse = reuse
+        self.overlap = overlap
+        self._own_executor = executor is None and overlap
+        self.executor = ThreadPoolExecutor(max_workers=1) if self._own_executor else executor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._own_executor:
+            self.executor.shutdown()
+
+    def turn(self, message):
+        """
+        Answer one Human message.
+
+        Returns {"answer", "sources", "reused", "seconds"}; "reused" is True
+        when the topic's earlier retrieval was used instead of searching.
+        """
+        start = time.perf_counter()
+        version = getattr(self.rag.vector_store, "version", 0)
+        scored_docs = self.reuse.lookup(message, version) if self.reuse else None
+        reused = scored_docs is not None
+
+        pending = None
+        if not reused and self.overlap:
+            # Retrieval needs nothing but the message: start it right away
+            pending = self.executor.submit(self._retrieve, message)
+        elif not reused:
+            scored_docs, retrieve_seconds = self._retrieve(message)
+
+        history = self._remember(message)
+
+        if pending is not None:
+            scored_docs, retrieve_seconds = pending.result()
+        if not reused and self.reuse:
+            self.reuse.store(message, version, scored_docs, retrieve_seconds)
+
+        # The message is the question; earlier turns go in the prompt's history section
+        prompt_input, relevant_docs, _ = self.rag.build_prompt(message, scored_docs, history=history or None)
+        answer = self.rag.generate(prompt_input).strip()
+        self.memory.add_message("Assistant", answer)
+
+        return {
+            "answer": answer,
+            "sources": [doc['title'] for doc in relevant_docs],
+            "reused": reused,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def _retrieve(self, message):
+        start = time.perf_counter()
+        scored_docs = self.rag.retrieve(message)
+        return scored_docs, time.perf_counter() - start
+
+    def _remember(self, message):
+        """
+        Add the Human message and return the history before it.
+
+        Room is made for both the message and the reply to come; the
+        messages that fall out of the window are folded into the summary.
+        """
+        overflow = len(self.memory.messages) + 2 - self.memory.max_messages
+        if overflow > 0 and self.summarize:
+            with self.rag.tracer.stage("chat:summarize"):
+                self.summary = self.summarize(self.summary, self.memory.messages[:overflow])
+            del self.memory.messages[:overflow]
+        history = self.memory.get_history()
+        self.memory.add_message("Human", message)
+        if self.summary:
+            history = f"Summary of earlier conversation: {self.summary}\n{history}"
+        return history
@@ -0,0 +1,181 @@
+"""
+csv_ingest.py
+Streaming CSV ingestion - rows -> typed documents -> keyword store, batch by batch
+
+csv.DictReader already streams, so the only thing that has to stay
+bounded is what is held between reading and indexing: rows are converted
+into documents one batch at a time, and each batch is indexed into the
+store before the next one is read, so memory holds one batch plus the
+store itself.
+
+A CsvMapping says which columns become the document id, title and content
+and which become typed metadata, e.g.
+
+    CsvMapping(id_column="sku", title_columns=["name"],
+               content_columns=["name", "description"],
+               metadata={"price": "float", "in_stock": "bool", "added": "date"})
+"""
+
+import csv
+import os
+import time
+from datetime import date
+
+
+def parse_bool(value):
+    """'true'/'yes'/'1'/'y' -> True, 'false'/'no'/'0'/'n' -> False"""
+    lowered = value.strip().lower()
+    if lowered in ("true", "yes", "1", "y"):
+        return True
+    if lowered in ("false", "no", "0", "n"):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def parse_list(value):
+    """'a; b;c' -> ['a', 'b', 'c']"""
+    return [item.strip() for item in value.split(";") if item.strip()]
+
+
+COLUMN_TYPES = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": parse_bool,
+    "date": date.fromisoformat,
+    "list": parse_list,
+}
+
+
+def parse_column_spec(spec):
+    """'age:int' -> ('age', 'int'); a bare column name is a str column"""
+    column, _, type_name = spec.partition(":")
+    type_name = type_name or "str"
+    if type_name not in COLUMN_TYPES:
+        raise ValueError(f"unknown column type {type_name!r} in {spec!r} "
+                         f"(expected one of {', '.join(COLUMN_TYPES)})")
+    return column, type_name
+
+
+class CsvMapping:
+    """
+    How a CSV row becomes a {"id", "title", "content", "metadata"} document.
+
+    Content is one "column: value" line per content column, so both the
+    column names and the values are searchable. Empty metadata cells become
+    None; cells that do not parse as their type raise ValueError.
+    """
+
+    def __init__(self, content_columns, title_columns=(), id_column=None, metadata=None):
+        if not content_columns:
+            raise ValueError("at least one content column is required")
+        self.content_columns = list(content_columns)
+        self.title_columns = list(title_columns)
+        self.id_column = id_column
+        self.metadata = {}
+        for column, type_name in (metadata or {}).items():
+            if type_name not in COLUMN_TYPES:
+                raise ValueError(f"unknown type {type_name!r} for column {column!r}")
+            self.metadata[column] = COLUMN_TYPES[type_name]
+
+    def columns(self):
+        """Every column the mapping reads"""
+        needed = self.content_columns + self.title_columns + list(self.metadata)
+        if self.id_column:
+            needed.append(self.id_column)
+        return list(dict.fromkeys(needed))
+
+    def to_document(self, row_number, row):
+        metadata = {}
+        for column, parse in self.metadata.items():
+            value = (row.get(column) or "").strip()
+            try:
+                metadata[column] = parse(value) if value else None
+            except ValueError as e:
+                raise ValueError(f"column {column!r}: {e}") from None
+        return {
+            "id": (row.get(self.id_column) if self.id_column else None) or f"row{row_number}",
+            "title": " - ".join(row[column] for column in self.title_columns if row.get(column)),
+            "content": "\n".join(f"{column}: {row[column]}" for column in self.content_columns
+                                 if row.get(column)),
+            "metadata": metadata,
+        }
+
+
+def iter_batches(path, batch_size=10000, delimiter=",", columns=()):
+    """
+    Yield [(row number, line number, row dict), ...] with up to batch_size rows per batch.
+
+    The header is checked for columns before any row is read, so a file
+    without data rows is rejected just like one with them. The line number
+    is the file line a row ends on (quoted fields may span lines).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        if reader.fieldnames is None:
+            raise ValueError(f"{path} is empty")
+        missing = [column for column in columns if column not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"{path} has no column(s) {', '.join(missing)}")
+
+        batch = []
+        for row_number, row in enumerate(reader):
+            batch.append((row_number, reader.line_num, row))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+class CsvIngestor:
+    """
+    Stream a CSV file into a SimpleVectorStore (or ShardedVectorStore) in batches.
+
+    Rows whose typed columns do not parse are skipped and counted; the
+    first max_errors of them are kept in .errors for reporting.
+    """
+
+    def __init__(self, mapping, batch_size=10000, delimiter=",", max_errors=20):
+        self.mapping = mapping
+        self.batch_size = batch_size
+        self.delimiter = delimiter
+        self.max_errors = max_errors
+        self.errors = []
+
+    def ingest(self, store, path, progress=None):
+        """
+        Index every row of path into store; returns throughput stats.
+
+        progress(stats) is called after each batch with the running totals.
+        """
+        start = time.perf_counter()
+        rows = documents = skipped = 0
+        for batch in iter_batches(path, self.batch_size, self.delimiter, self.mapping.columns()):
+            docs = []
+            for row_number, line_number, row in batch:
+                try:
+                    docs.append(self.mapping.to_document(row_number, row))
+                except ValueError as e:
+                    skipped += 1
+                    if len(self.errors) < self.max_errors:
+                        self.errors.append((line_number, str(e)))
+            rows += len(batch)
+
+            if docs:
+                # The caller reports the total once, not one line per batch
+                store.add_documents(docs, quiet=True)
+                documents += len(docs)
+
+            if progress:
+                progress(self._stats(rows, documents, skipped, start))
+
+        stats = self._stats(rows, documents, skipped, start)
+        stats["mb_per_s"] = os.path.getsize(path) / 1e6 / stats["seconds"] if stats["seconds"] else 0.0
+        return stats
+
+    @staticmethod
+    def _stats(rows, documents, skipped, start):
+        seconds = time.perf_counter() - start
+        return {"rows": rows, "documents": documents, "skipped": skipped, "seconds": seconds,
+                "rows_per_s": rows / seconds if seconds else 0.0}
@@ -0,0 +1,162 @@
+"""
+docstore.py
+Compact columnar document storage
+
+A list of {"id", "title", "content"} dicts costs a dict plus three str
+objects per document - a few hundred bytes of overhead before any text.
+ColumnarDocStore keeps each field as one UTF-8 byte buffer plus an array
+of offsets, i.e. 24 bytes of overhead per document, and can be saved to a
+file and memory-mapped so the text stays in the OS page cache instead of
+the Python heap.
+
+Indexing a store returns DocView objects: __slots__ views that decode a
+field only when it is read (doc['content']), so the retriever
+materializes strings just for the top-k hits it hands to SimpleRAG.
+"""
+
+import mmap
+import struct
+from array import array
+
+FIELDS = ("id", "title", "content")
+
+_MAGIC = b"CDS1"
+# magic, document count, then the byte length of each field's data
+_HEADER = struct.Struct("<4s4xQ" + "Q" * len(FIELDS))
+
+
+class DocView:
+    """Read-only view of one document; supports doc['title'], doc.get(), dict(doc)"""
+
+    __slots__ = ("_store", "_position")
+
+    def __init__(self, store, position):
+        self._store = store
+        self._position = position
+
+    def __getitem__(self, field):
+        return self._store.field(self._position, field)
+
+    def get(self, field, default=None):
+        return self[field] if field in FIELDS else default
+
+    def keys(self):
+        return FIELDS
+
+    def __contains__(self, field):
+        return field in FIELDS
+
+    def __eq__(self, other):
+        if isinstance(other, DocView):
+            return self._store is other._store and self._position == other._position
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._store), self._position))
+
+    def __repr__(self):
+        return f"DocView({self['id']!r}, {self['title']!r})"
+
+    def to_dict(self):
+        return {field: self[field] for field in FIELDS}
+
+
+class ColumnarDocStore:
+    """
+    Documents as per-field byte buffers plus offset arrays.
+
+    Behaves like a read-mostly list of documents: len(), store[i] (a
+    DocView), iteration, append() and extend(). Stores opened from a file
+    with open() are memory-mapped and read-only.
+    """
+
+    def __init__(self):
+        # offsets[field][i]:offsets[field][i + 1] is document i's field in data[field]
+        self.offsets = {field: array("Q", [0]) for field in FIELDS}
+        self.data = {field: bytearray() for field in FIELDS}
+        self.readonly = False
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.offsets["id"]) - 1
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [DocView(self, i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("document position out of range")
+        return DocView(self, position)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield DocView(self, position)
+
+    def field(self, position, field):
+        """Decode one field of one document"""
+        offsets = self.offsets[field]
+        # str(buffer, encoding) works for bytearrays and memory-mapped memoryviews alike
+        return str(self.data[field][offsets[position]:offsets[position + 1]], "utf-8")
+
+    def append(self, doc):
+        if self.readonly:
+            raise TypeError("memory-mapped document store is read-only")
+        for field in FIELDS:
+            data = self.data[field]
+            data += str(doc[field]).encode("utf-8")
+            self.offsets[field].append(len(data))
+
+    def extend(self, docs):
+        for doc in docs:
+            self.append(doc)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the buffers and offset arrays (file size when memory-mapped)"""
+        return sum(len(self.data[field]) + self.offsets[field].itemsize * len(self.offsets[field])
+                   for field in FIELDS)
+
+    # -- Files -------------------------------------------------------------------
+
+    def save(self, path):
+        """Write the store to a file that open() can memory-map"""
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(self), *(len(self.data[field]) for field in FIELDS)))
+            for field in FIELDS:
+                f.write(self.offsets[field].tobytes())
+            for field in FIELDS:
+                f.write(self.data[field])
+        return path
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a saved store; text is paged in from the file as it is read"""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, *lengths = _HEADER.unpack_from(mapped, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a ColumnarDocStore file")
+
+        store = cls.__new__(cls)
+        store.readonly = True
+        store._mmap = mapped
+        store.offsets = {}
+        store.data = {}
+        view = memoryview(mapped)
+        position = _HEADER.size
+        for field in FIELDS:
+            size = (count + 1) * 8
+            store.offsets[field] = view[position:position + size].cast("Q")
+            position += size
+        for field, length in zip(FIELDS, lengths):
+            store.data[field] = view[position:position + length]
+            position += length
+        return store
+
+    def close(self):
+        """Release the memory map (views must not be used afterwards)"""
+        if self._mmap is not None:
+            self.offsets = self.data = None
+            self._mmap.close()
+            self._mmap = None
@@ -0,0 +1,229 @@
+"""
+fake_llm.py
+Deterministic offline LLM - a drop-in for OpenAI(...) when benchmarking or testing
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.llms import BaseLLM
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
+from langchain_core.pydantic_v1 import PrivateAttr
+
+from .tokens import count_tokens, truncate_to_tokens
+
+_SCHEMA_RE = re.compile(r"Here is the output schema:\s*```\s*(\{.*?\})\s*```", re.DOTALL)
+_SUBJECT_RE = re.compile(r'(?:Text|Review): "([^"]*)"')
+_BATCH_ITEM_RE = re.compile(r'^\s*\d+\. Text: "([^"]*)"', re.MULTILINE)
+_CHOICES_RE = re.compile(r":\s*(\w+),\s*(\w+),?\s*or\s+(\w+)")
+
+_POSITIVE = {"love", "amazing", "great", "gorgeous", "excellent", "recommend", "fast", "good"}
+_NEGATIVE = {"hate", "terrible", "broke", "waste", "unhelpful", "bad", "awful", "worst"}
+
+_FILLER = ("LangChain connects language models to data and tools so applications can "
+           "reason over context, call functions and keep track of conversations.").split()
+
+
+def _stable_hash(text):
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _sentiment_index(text):
+    """0 = positive, 1 = negative, 2 = neutral (the order the example models list them)"""
+    words = set(re.findall(r"[a-z]+", text.lower()))
+    positive, negative = len(words & _POSITIVE), len(words & _NEGATIVE)
+    if positive > negative:
+        return 0
+    if negative > positive:
+        return 1
+    return 2
+
+
+def _example_value(name, spec, sentiment, seed):
+    """Build a plausible value for one JSON-schema property"""
+    kind = spec.get("type")
+    description = spec.get("description", "")
+
+    if kind == "array":
+        item = spec.get("items", {"type": "string"})
+        return [_example_value(f"{name} {i + 1}", item, sentiment, seed + i) for i in range(3)]
+    if kind == "integer":
+        if "1-5" in description:
+            return (5, 1, 3)[sentiment]
+        return 10 + seed % 50
+    if kind == "number":
+        return round(1 + (seed % 100) / 10, 1)
+    if kind == "boolean":
+        return sentiment != 1
+
+    choices = _CHOICES_RE.search(description)
+    if choices:
+        return choices.group(sentiment + 1)
+    return f"{name.replace('_', ' ')} example"
+
+
+def _drop_last_field(text):
+    """The JSON answer without its last property (fails pydantic validation)"""
+    try:
+        instance = json.loads(text)
+    except ValueError:
+        return text
+    if instance:
+        instance.pop(list(instance)[-1])
+    return "\n" + json.dumps(instance, indent=2)
+
+
+def fake_completion(prompt):
+    """Deterministic completion text for a prompt"""
+    subjects = _SUBJECT_RE.findall(prompt)
+    subject = subjects[-1] if subjects else prompt
+    sentiment = _sentiment_index(subject)
+    seed = _stable_hash(prompt)
+
+    # JsonOutputParser format instructions: answer with a matching instance
+    schema_match = _SCHEMA_RE.search(prompt)
+    if schema_match:
+        try:
+            schema = json.loads(schema_match.group(1))
+            instance = {
+                name: _example_value(name, spec, sentiment, seed + i)
+                for i, (name, spec) in enumerate(schema.get("properties", {}).items())
+            }
+            return "\n" + json.dumps(instance, indent=2)
+        except ValueError:
+            pass
+
+    # Few-shot sentiment classification, batched or one text at a time
+    if prompt.rstrip().endswith("Sentiments:"):
+        labels = [("Positive", "Negative", "Neutral")[_sentiment_index(item)]
+                  for item in _BATCH_ITEM_RE.findall(prompt)]
+        return " " + json.dumps(labels)
+    if prompt.rstrip().endswith("Sentiment:"):
+        return " " + ("Positive", "Negative", "Neutral")[sentiment]
+
+    start = seed % len(_FILLER)
+    words = [_FILLER[(start + i) % len(_FILLER)] for i in range(len(_FILLER))]
+    return "\n" + " ".join(words).capitalize() + "."
+
+
+class FakeLLM(BaseLLM):
+    """
+    Offline stand-in for langchain_openai.OpenAI.
+
+    Answers are derived from the prompt alone, so runs are repeatable. Each
+    call sleeps for a first-token latency drawn from the configured
+    distribution plus the output length divided by tokens_per_second.
+
+    invalid_json_rate makes that fraction of structured (format
+    instructions) answers omit a required field, like a weaker model that
+    fails schema validation. Which prompts fail is fixed per model name
+    and seed, so retrying the same model does not help.
+    """
+
+    model_name: str = "fake-instruct"
+    temperature: float = 0.7
+    max_tokens: int = 256
+    latency_ms: float = 200.0
+    latency_distribution: str = "lognormal"  # fixed, uniform or lognormal
+    latency_jitter: float = 0.5
+    tokens_per_second: float = 200.0
+    invalid_json_rate: float = 0.0
+    seed: int = 0
+
+    _rng: Any = PrivateAttr(default=None)
+    _rng_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self):
+        return "fake"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name, "temperature": self.temperature,
+                "max_tokens": self.max_tokens}
+
+    def sample_latency(self):
+        """Seconds to wait before the first token"""
+        mean = self.latency_ms / 1000
+        with self._rng_lock:
+            # One RNG per instance: latencies vary call to call but replay per seed
+            if self._rng is None:
+                self._rng = random.Random(self.seed)
+            rng = self._rng
+            if self.latency_distribution == "fixed":
+                return mean
+            if self.latency_distribution == "uniform":
+                return max(0.0, rng.uniform(mean * (1 - self.latency_jitter),
+                                            mean * (1 + self.latency_jitter)))
+            # lognormal with the configured median
+            return rng.lognormvariate(math.log(mean), self.latency_jitter) if mean > 0 else 0.0
+
+    def _complete(self, prompt, stop=None, max_tokens=None):
+        text = fake_completion(prompt)
+        if self.invalid_json_rate and _SCHEMA_RE.search(prompt):
+            draw = _stable_hash(f"{self.model_name}:{self.seed}:{prompt}") % 10000
+            if draw < self.invalid_json_rate * 10000:
+                text = _drop_last_field(text)
+        if stop:
+            for token in stop:
+                if token in text:
+                    text = text[:text.index(token)]
+        if max_tokens is not None and max_tokens >= 0:
+            # A per-call max_tokens (llm.invoke(..., max_tokens=n)) cuts the answer short
+            text = truncate_to_tokens(text, max_tokens)
+        return text
+
+    def _usage(self, prompts, texts):
+        prompt_tokens = sum(count_tokens(p) for p in prompts)
+        completion_tokens = sum(count_tokens(t) for t in texts)
+        return {"token_usage": {"prompt_tokens": prompt_tokens,
+                                "completion_tokens": completion_tokens,
+                                "total_tokens": prompt_tokens + completion_tokens},
+                "model_name": self.model_name}
+
+    def _delay(self, text):
+        generation_time = count_tokens(text) / self.tokens_per_second if self.tokens_per_second else 0.0
+        return self.sample_latency() + generation_time
+
+    def _generate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> LLMResult:
+        texts = [self._complete(p, stop, kwargs.get("max_tokens")) for p in prompts]
+        time.sleep(sum(self._delay(t) for t in texts))
+        return LLMResult(generations=[[Generation(text=t)] for t in texts],
+                         llm_output=self._usage(prompts, texts))
+
+    async def _agenerate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> LLMResult:
+        texts = [self._complete(p, stop, kwargs.get("max_tokens")) for p in prompts]
+        await asyncio.sleep(sum(self._delay(t) for t in texts))
+        return LLMResult(generations=[[Generation(text=t)] for t in texts],
+                         llm_output=self._usage(prompts, texts))
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        time.sleep(self.sample_latency())
+        for piece in re.findall(r"\s*\S+", self._complete(prompt, stop, kwargs.get("max_tokens"))):
+            if self.tokens_per_second:
+                time.sleep(count_tokens(piece) / self.tokens_per_second)
+            chunk = GenerationChunk(text=piece)
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        await asyncio.sleep(self.sample_latency())
+        for piece in re.findall(r"\s*\S+", self._complete(prompt, stop, kwargs.get("max_tokens"))):
+            if self.tokens_per_second:
+                await asyncio.sleep(count_tokens(piece) / self.tokens_per_second)
+            chunk = GenerationChunk(text=piece)
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
@@ -0,0 +1,246 @@
+"""
+fast_parse.py
+Fast structured-output parsing for JSON-producing chains
+
+FastJsonOutputParser is a drop-in for JsonOutputParser(pydantic_object=...)
+that:
+- finds the JSON span with one linear, string-aware scan (no regex)
+- decodes with orjson when it is installed, json otherwise
+- repairs common model mistakes locally (code fences, trailing commas,
+  single quotes, Python literals, unclosed brackets) instead of re-asking
+- validates through a per-model validator built once and cached
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Optional, Type
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import BaseOutputParser
+from langchain_core.output_parsers.format_instructions import JSON_FORMAT_INSTRUCTIONS
+
+try:
+    import orjson
+
+    def loads(text):
+        return orjson.loads(text)
+except ImportError:  # pragma: no cover - orjson is optional
+    loads = json.loads
+
+_CLOSERS = {"{": "}", "[": "]"}
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+# String opener -> characters that close it; smart-quoted strings also close on a plain quote
+_QUOTES = {'"': '"', "'": "'", "\u201c": "\u201d\"", "\u2018": "\u2019'"}
+_OPENERS = {dict: "{", list: "["}
+
+
+def extract_json_span(text, pos=0, openers="{["):
+    """
+    Return (start, end, complete) of the first JSON object/array at or after pos.
+
+    Only values opening with one of openers count. end is exclusive. If the
+    value is cut off, complete is False and end is len(text). Returns None
+    when there is no opener.
+    """
+    starts = [i for i in (text.find(ch, pos) for ch in openers) if i != -1]
+    if not starts:
+        return None
+    start = min(starts)
+
+    depth = 0
+    in_string = None
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == in_string:
+                in_string = None
+        elif ch == '"' or ch == "'":
+            in_string = ch
+        elif ch == "{" or ch == "[":
+            depth += 1
+        elif ch == "}" or ch == "]":
+            depth -= 1
+            if depth == 0:
+                return start, i + 1, True
+    return start, len(text), False
+
+
+def repair_json(text):
+    """
+    Fix common malformed-JSON mistakes in one pass.
+
+    Handles single-quoted strings, Python True/False/None, trailing commas,
+    smart-quoted strings, and unterminated strings/objects/arrays. Smart
+    quotes are only treated as delimiters where a string starts or ends;
+    inside a string value they are kept as text.
+    """
+    out = []
+    stack = []
+    in_string = None
+    escaped = False
+    i = 0
+    n = len(text)
+
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(ch)
+            elif ch == "\\":
+                escaped = True
+                out.append(ch)
+            elif ch in in_string:
+                in_string = None
+                out.append('"')
+            elif ch == '"':
+                # A double quote inside a single-quoted string
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in _QUOTES:
+            in_string = _QUOTES[ch]
+            out.append('"')
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+        elif ch == "}" or ch == "]":
+            # Drop a trailing comma before the closer
+            while out and out[-1] in " \t\r\n":
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if in_string:
+        out.append('"')
+    while out and out[-1] in " \t\r\n,":
+        out.pop()
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def parse_json_text(text, expect=None):
+    """
+    Extract and decode the JSON value in an LLM completion, repairing it if needed.
+
+    With expect=dict (or list), values of the other kind are skipped, so
+    "[1] then {...}" yields the object; the first candidate that decodes
+    wins, and the first error is raised if none does.
+    """
+    openers = _OPENERS.get(expect, "{[")
+    pos = 0
+    first_error = None
+    while True:
+        span = extract_json_span(text, pos, openers)
+        if span is None:
+            break
+        try:
+            return _decode_span(text, *span)
+        except OutputParserException as e:
+            first_error = first_error or e
+        pos = span[0] + 1
+
+    if first_error is not None:
+        raise first_error
+    raise OutputParserException(f"No JSON {'object' if expect is not list else 'array'} found in output: "
+                                f"{text[:200]!r}", llm_output=text)
+
+
+def _decode_span(text, start, end, complete):
+    candidate = text[start:end]
+
+    if complete:
+        try:
+            return loads(candidate)
+        except ValueError:
+            pass
+    try:
+        return loads(repair_json(candidate))
+    except ValueError as e:
+        error = e
+
+    if not complete:
+        # Cut-off output: drop the partial last member and close what is left
+        for _ in range(3):
+            cut = candidate.rfind(",")
+            if cut <= 0:
+                break
+            candidate = candidate[:cut]
+            try:
+                return loads(repair_json(candidate))
+            except ValueError as e:
+                error = e
+    raise OutputParserException(f"Invalid JSON in output: {error}", llm_output=text)
+
+
+@lru_cache(maxsize=None)
+def get_validator(model):
+    """
+    Build (once per model) a function that validates a dict and returns a dict.
+
+    Uses pydantic v2's compiled TypeAdapter when the model is a v2 model,
+    and parse_obj for pydantic v1 models.
+    """
+    if hasattr(model, "model_validate"):
+        from pydantic import TypeAdapter
+        adapter = TypeAdapter(model)
+        return lambda data: adapter.validate_python(data).model_dump()
+    return lambda data: model.parse_obj(data).dict()
+
+
+@lru_cache(maxsize=None)
+def _format_instructions(model):
+    """Same text JsonOutputParser produces, for pydantic v1 or v2 models"""
+    schema = model.model_json_schema() if hasattr(model, "model_json_schema") else model.schema()
+    reduced = {k: v for k, v in schema.items() if k not in ("title", "type")}
+    return JSON_FORMAT_INSTRUCTIONS.format(schema=json.dumps(reduced))
+
+
+class FastJsonOutputParser(BaseOutputParser):
+    """JSON output parser with local repair and cached pydantic validation"""
+
+    pydantic_object: Optional[Type[Any]] = None
+
+    @property
+    def _type(self):
+        return "fast_json_output_parser"
+
+    def parse(self, text: str) -> Any:
+        # A pydantic model is always a JSON object
+        data = parse_json_text(text, expect=None if self.pydantic_object is None else dict)
+        if self.pydantic_object is None:
+            return data
+        try:
+            return get_validator(self.pydantic_object)(data)
+        except Exception as e:
+            raise OutputParserException(f"Output does not match {self.pydantic_object.__name__}: {e}",
+                                        llm_output=text)
+
+    def get_format_instructions(self) -> str:
+        if self.pydantic_object is None:
+            return "Return a JSON object."
+        return _format_instructions(self.pydantic_object)
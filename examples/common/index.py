@@ -0,0 +1,88 @@
+"""
+index.py
+Inverted keyword index with the same scoring as SimpleVectorStore
+
+A document scores one point per distinct query word found in its content
+and two per distinct query word found in its title. The original store
+re-split every document on every query; the index splits each document
+once and a query only touches the posting lists of its own words.
+
+Indexes built separately over consecutive slices of a corpus (e.g. one per
+worker process) are combined with merge(), which shifts the incoming
+document positions by the size of the index being merged into.
+"""
+
+import heapq
+from array import array
+
+
+def tokenize(text):
+    """Lower-cased whitespace tokens, as SimpleVectorStore has always used"""
+    return text.lower().split()
+
+
+class KeywordIndex:
+    """Word -> positions of the documents whose content / title contain it"""
+
+    def __init__(self):
+        self.content_postings = {}
+        self.title_postings = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, title, content):
+        """Index one document; returns its position"""
+        position = self.size
+        for word in set(tokenize(content)):
+            postings = self.content_postings.get(word)
+            if postings is None:
+                postings = self.content_postings[word] = array("i")
+            postings.append(position)
+        for word in set(tokenize(title)):
+            postings = self.title_postings.get(word)
+            if postings is None:
+                postings = self.title_postings[word] = array("i")
+            postings.append(position)
+        self.size += 1
+        return position
+
+    def add_documents(self, docs):
+        """Index documents with 'title' and 'content' keys"""
+        for doc in docs:
+            self.add(doc['title'], doc['content'])
+
+    def merge(self, other):
+        """Append another index's documents after this index's documents"""
+        offset = self.size
+        for own, incoming in ((self.content_postings, other.content_postings),
+                              (self.title_postings, other.title_postings)):
+            for word, positions in incoming.items():
+                postings = own.get(word)
+                if postings is None:
+                    postings = own[word] = array("i")
+                if offset:
+                    postings.extend(p + offset for p in positions)
+                else:
+                    postings.extend(positions)
+        self.size += other.size
+
+    def scores(self, query):
+        """{position: score} for every document sharing a word with the query"""
+        scores = {}
+        for word in set(tokenize(query)):
+            for position in self.content_postings.get(word, ()):
+                scores[position] = scores.get(position, 0) + 1
+            for position in self.title_postings.get(word, ()):
+                scores[position] = scores.get(position, 0) + 2
+        return scores
+
+    def search(self, query, k=3):
+        """
+        Top-k (position, score) pairs, best first.
+
+        Ties keep insertion order, matching the stable sort the store used.
+        """
+        scores = self.scores(query)
+        return heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,257 @@
+"""
+jobs.py
+Resumable bulk jobs - stream rows through a chain with bounded concurrency
+
+Results are written in input order, so a checkpoint is just "rows done" plus
+the byte offsets (or part count) of the output files at that point. On
+resume the outputs are truncated back to the checkpoint and processing
+restarts from the next row, so no row is lost or written twice. The
+checkpoint also records which input file it belongs to, and refuses to
+resume against a different one.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def iter_rows(path):
+    """Yield (index, row dict) from a .csv or .jsonl file without loading it all"""
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, row
+    else:
+        with open(path) as f:
+            index = 0
+            for line in f:
+                if line.strip():
+                    yield index, json.loads(line)
+                    index += 1
+
+
+class JsonlSink:
+    """Append-only JSONL output that can be rolled back to a byte offset"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a")
+
+    def position(self):
+        self.file.flush()
+        return self.file.tell()
+
+    def truncate(self, position):
+        self.file.flush()
+        self.file.truncate(position)
+        self.file.seek(position)
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Parquet output as a directory of part files, one per checkpoint (needs pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.buffer = []
+
+    def _parts(self):
+        return sorted(p for p in os.listdir(self.path) if p.endswith(".parquet"))
+
+    def position(self):
+        return len(self._parts())
+
+    def truncate(self, position):
+        for name in self._parts()[position:]:
+            os.remove(os.path.join(self.path, name))
+        self.buffer = []
+
+    def write(self, record):
+        self.buffer.append(record)
+
+    def sync(self):
+        if not self.buffer:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        part = os.path.join(self.path, f"part-{self.position():05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(self.buffer), part + ".tmp")
+        os.replace(part + ".tmp", part)
+        self.buffer = []
+
+    def close(self):
+        self.sync()
+
+
+class CheckpointMismatch(ValueError):
+    """Raised when a checkpoint was written for a different input file"""
+
+
+def input_fingerprint(path, head_bytes=1 << 20):
+    """Identify an input file by absolute path, size and a hash of its first MB"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(head_bytes))
+    return {"path": os.path.abspath(path), "size": os.path.getsize(path), "head_sha256": digest.hexdigest()}
+
+
+class Checkpoint:
+    """Rows completed plus output positions and the input's fingerprint, written atomically"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {"next_row": 0, "positions": {}, "succeeded": 0, "failed": 0}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state.update(json.load(f))
+
+    def check_input(self, input_path):
+        """
+        Bind the checkpoint to input_path, or raise CheckpointMismatch.
+
+        Resuming is refused when rows were already done against a file of
+        another size or content (the path may differ - a moved file is fine).
+        """
+        fingerprint = input_fingerprint(input_path)
+        recorded = self.state.get("input")
+        if recorded and self.state["next_row"]:
+            if (recorded["size"], recorded["head_sha256"]) != (fingerprint["size"], fingerprint["head_sha256"]):
+                raise CheckpointMismatch(
+                    f"{self.path} belongs to {recorded['path']} ({recorded['size']} bytes), not "
+                    f"{fingerprint['path']} ({fingerprint['size']} bytes) - use another --output "
+                    f"or delete the checkpoint to start over")
+        self.state["input"] = fingerprint
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+class JobRunner:
+    """
+    Run fn(row) over every input row with bounded concurrency.
+
+    fn returns a dict that is written to the output with the row index
+    added; rows whose fn raises go to the errors JSONL instead.
+    """
+
+    def __init__(self, fn, input_path, output_path, errors_path=None, checkpoint_path=None,
+                 concurrency=8, checkpoint_every=200, report_every=1000, output_format="jsonl"):
+        self.fn = fn
+        self.input_path = input_path
+        self.output_path = output_path
+        self.errors_path = errors_path or output_path.rstrip("/") + ".errors.jsonl"
+        self.checkpoint = Checkpoint(checkpoint_path or output_path.rstrip("/") + ".checkpoint.json")
+        self.concurrency = concurrency
+        self.checkpoint_every = checkpoint_every
+        self.report_every = report_every
+        self.output_format = output_format
+
+    def _open_sinks(self):
+        output = ParquetSink(self.output_path) if self.output_format == "parquet" else JsonlSink(self.output_path)
+        errors = JsonlSink(self.errors_path)
+        positions = self.checkpoint.state["positions"]
+        # Roll back anything written after the last checkpoint
+        output.truncate(positions.get("output", 0))
+        errors.truncate(positions.get("errors", 0))
+        return output, errors
+
+    def _commit(self, next_row, output, errors):
+        output.sync()
+        errors.sync()
+        self.checkpoint.state["next_row"] = next_row
+        self.checkpoint.state["positions"] = {"output": output.position(), "errors": errors.position()}
+        self.checkpoint.save()
+
+    def _call(self, index, row):
+        try:
+            return index, self.fn(row), None
+        except Exception as e:
+            return index, None, e
+
+    def run(self):
+        """Process the remaining rows; returns a stats dict"""
+        state = self.checkpoint.state
+        start_row = state["next_row"]
+        # Before the sinks are rolled back, so a mismatch leaves the outputs alone
+        self.checkpoint.check_input(self.input_path)
+        output, errors = self._open_sinks()
+        window = deque()
+        processed = 0
+        started = time.perf_counter()
+
+        if start_row:
+            print(f"↩️  Resuming at row {start_row} ({state['succeeded']} ok, {state['failed']} failed so far)")
+
+        def drain_one():
+            nonlocal processed
+            index, result, error = window.popleft().result()
+            if error is None:
+                output.write(dict(result, row=index))
+                state["succeeded"] += 1
+            else:
+                errors.write({"row": index, "error": repr(error)})
+                state["failed"] += 1
+            processed += 1
+            if processed % self.checkpoint_every == 0:
+                self._commit(index + 1, output, errors)
+            if processed % self.report_every == 0:
+                self._report(processed, started)
+            return index
+
+        last_index = start_row - 1
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                for index, row in iter_rows(self.input_path):
+                    if index < start_row:
+                        continue
+                    # Bounded in-flight window keeps memory flat and output ordered
+                    if len(window) >= self.concurrency * 2:
+                        last_index = drain_one()
+                    window.append(pool.submit(self._call, index, row))
+                while window:
+                    last_index = drain_one()
+            self._commit(last_index + 1, output, errors)
+        finally:
+            output.close()
+            errors.close()
+
+        return self._report(processed, started, final=True)
+
+    def _report(self, processed, started, final=False):
+        state = self.checkpoint.state
+        elapsed = time.perf_counter() - started
+        total = state["succeeded"] + state["failed"]
+        stats = {
+            "processed": processed,
+            "succeeded": state["succeeded"],
+            "failed": state["failed"],
+            "rows_per_s": processed / elapsed if elapsed else 0.0,
+            "error_rate": state["failed"] / total if total else 0.0,
+            "elapsed_s": elapsed,
+        }
+        print(f"{'✅' if final else '⏳'} {total} rows done ({processed} this run) - "
+              f"{stats['rows_per_s']:.1f} rows/s, error rate {stats['error_rate']:.1%}")
+        return stats
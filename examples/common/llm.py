@@ -0,0 +1,46 @@
+"""
+llm.py
+LLM factory - real OpenAI models normally, the offline FakeLLM when FAKE_LLM=1
+"""
+
+import os
+
+
+def use_fake_llm():
+    """True when the examples should run against the offline fake LLM"""
+    return os.getenv("FAKE_LLM", "").lower() in ("1", "true", "yes")
+
+
+def has_llm_access():
+    """True when an LLM call can be made (real API key or fake mode)"""
+    return use_fake_llm() or bool(os.getenv("OPENAI_API_KEY"))
+
+
+def fake_llm_settings():
+    """FakeLLM settings read from FAKE_LLM_* environment variables"""
+    return {
+        "latency_ms": float(os.getenv("FAKE_LLM_LATENCY_MS", "200")),
+        "latency_distribution": os.getenv("FAKE_LLM_DISTRIBUTION", "lognormal"),
+        "latency_jitter": float(os.getenv("FAKE_LLM_JITTER", "0.5")),
+        "tokens_per_second": float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "200")),
+        "seed": int(os.getenv("FAKE_LLM_SEED", "0")),
+    }
+
+
+def get_llm(**kwargs):
+    """
+    Create an LLM with the same arguments you would pass to OpenAI(...).
+
+    With FAKE_LLM=1 a FakeLLM is returned instead, so examples and
+    benchmarks run offline without an API key.
+    """
+    if use_fake_llm():
+        from .fake_llm import FakeLLM
+        settings = fake_llm_settings()
+        for key in ("model_name", "temperature", "max_tokens"):
+            if key in kwargs:
+                settings[key] = kwargs[key]
+        return FakeLLM(**settings)
+
+    from langchain_openai import OpenAI
+    return OpenAI(**kwargs)
@@ -0,0 +1,33 @@
+"""
+loader.py
+Import example scripts by path (their numbered file names are not valid module names)
+"""
+
+import importlib.util
+import os
+import sys
+
+EXAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_example(relative_path):
+    """
+    Load an example script, e.g. load_example("03-advanced/02_rag_system.py").
+
+    Modules are cached in sys.modules, so each script is only executed once.
+    """
+    path = os.path.join(EXAMPLES_DIR, relative_path)
+    stem = os.path.splitext(os.path.basename(relative_path))[0]
+    name = "example_" + os.path.dirname(relative_path).replace("-", "_") + "_" + stem
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
@@ -0,0 +1,174 @@
+"""
+pipeline.py
+Parallel ingestion - clean -> split -> index across a process pool
+
+Cleaning HTML, splitting into chunks and tokenizing for the keyword index
+are pure CPU work, so threads do not help. ParallelIngestor shards them
+across worker processes:
+
+- the raw document text is packed once into a shared-memory buffer; a
+  worker receives only the buffer name and its byte offsets, not the text
+- each worker cleans, splits and indexes its shard (a contiguous range of
+  documents) and returns the chunks plus a shard KeywordIndex
+- the parent merges the shard indexes in order, so the store ends up
+  exactly as if everything had been ingested serially
+"""
+
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .index import KeywordIndex
+
+_DROP_BLOCKS = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+
+def clean_text(text):
+    """Strip HTML (tags, scripts, styles, entities) and collapse whitespace"""
+    if "<" in text:
+        text = _TAGS.sub(" ", _DROP_BLOCKS.sub(" ", text))
+    if "&" in text:
+        text = html.unescape(text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def split_text(text, chunk_words=200, overlap=20):
+    """Split into chunks of up to chunk_words words, each repeating the last `overlap` words of the previous one"""
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [text] if words else []
+    step = max(1, chunk_words - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+def process_documents(docs, chunk_words=200, overlap=20):
+    """
+    Run clean -> split -> index over documents serially.
+
+    Returns (chunks, index): chunk documents keep the source id (with a
+    '#n' suffix when a document was split) and title.
+    """
+    chunks = []
+    index = KeywordIndex()
+    for doc in docs:
+        pieces = split_text(clean_text(doc['content']), chunk_words, overlap)
+        title = clean_text(doc['title'])
+        for n, piece in enumerate(pieces):
+            chunk = {"id": doc['id'] if len(pieces) == 1 else f"{doc['id']}#{n}",
+                     "title": title, "content": piece}
+            chunks.append(chunk)
+            index.add(title, piece)
+    return chunks, index
+
+
+def _process_shard(buffer_name, offsets, metas, chunk_words, overlap):
+    """Worker: decode this shard's texts from shared memory and process them"""
+    # Pool workers share the parent's resource tracker, so attaching here
+    # does not take ownership: the parent unlinks the block when done
+    shm = shared_memory.SharedMemory(name=buffer_name)
+    try:
+        buf = shm.buf
+        docs = [{"id": doc_id, "title": title, "content": bytes(buf[start:end]).decode("utf-8")}
+                for (doc_id, title), (start, end) in zip(metas, offsets)]
+        del buf
+    finally:
+        shm.close()
+    return process_documents(docs, chunk_words, overlap)
+
+
+class ParallelIngestor:
+    """
+    Clean, split and index documents on `workers` processes.
+
+    workers=1 (or a corpus smaller than min_parallel_docs) runs in-process.
+    The pool is started on first use and reused until close().
+    """
+
+    def __init__(self, workers=None, chunk_words=200, overlap=20, shards_per_worker=4,
+                 min_parallel_docs=2000):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_words = chunk_words
+        self.overlap = overlap
+        self.shards_per_worker = shards_per_worker
+        self.min_parallel_docs = min_parallel_docs
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def run(self, docs):
+        """Return (chunks, index) for the documents, in input order"""
+        docs = list(docs)
+        if self.workers <= 1 or len(docs) < self.min_parallel_docs:
+            return process_documents(docs, self.chunk_words, self.overlap)
+
+        # One contiguous buffer of all contents; workers slice it by offset
+        encoded = [doc['content'].encode("utf-8") for doc in docs]
+        offsets = []
+        position = 0
+        for data in encoded:
+            offsets.append((position, position + len(data)))
+            position += len(data)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(position, 1))
+        try:
+            shm.buf[:position] = b"".join(encoded)
+            del encoded
+
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            shard_count = min(len(docs), self.workers * self.shards_per_worker)
+            bounds = [len(docs) * i // shard_count for i in range(shard_count + 1)]
+            futures = [
+                self._pool.submit(_process_shard, shm.name, offsets[lo:hi],
+                                  [(doc['id'], doc['title']) for doc in docs[lo:hi]],
+                                  self.chunk_words, self.overlap)
+                for lo, hi in zip(bounds, bounds[1:])
+            ]
+
+            # Merge in shard order so positions match a serial run
+            chunks = []
+            index = KeywordIndex()
+            for future in futures:
+                shard_chunks, shard_index = future.result()
+                chunks.extend(shard_chunks)
+                index.merge(shard_index)
+        finally:
+            shm.close()
+            shm.unlink()
+        return chunks, index
+
+    def ingest(self, store, docs):
+        """Process documents and add them to a SimpleVectorStore; returns timing stats"""
+        start = time.perf_counter()
+        docs = list(docs)
+        chunks, index = self.run(docs)
+        processed = time.perf_counter()
+        store.add_documents(chunks, index=index)
+        done = time.perf_counter()
+        return {
+            "documents": len(docs),
+            "chunks": len(chunks),
+            "workers": self.workers,
+            "process_s": processed - start,
+            "merge_s": done - processed,
+            "docs_per_s": len(docs) / (done - start) if done > start else 0.0,
+        }
@@ -0,0 +1,253 @@
+"""
+rate_limit.py
+Client-side scheduling for LLM calls - rate limits, retries and adaptive concurrency
+
+LLMScheduler combines three pieces:
+- two token buckets, one for requests/minute and one for tokens/minute
+- retries with exponential backoff and full jitter (honouring Retry-After)
+- an AIMD concurrency limit that halves on rate-limit errors and grows
+  by one slot per window of successful calls
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .tokens import count_tokens
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        if rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """Block until `amount` tokens are available, then take them"""
+        # A single request larger than the bucket may still go once it is full
+        amount = min(amount, self.capacity)
+        with self._cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                self._cond.wait((amount - self.tokens) / self.rate)
+
+    def refund(self, amount):
+        """Give back tokens that were reserved but not used"""
+        with self._cond:
+            self.tokens = min(self.capacity, self.tokens + amount)
+            self._cond.notify_all()
+
+
+class AIMDLimiter:
+    """Adaptive concurrency limit: additive increase, multiplicative decrease"""
+
+    def __init__(self, initial=4, minimum=1, maximum=32, decrease_factor=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            # +1 slot after roughly `limit` successes
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def on_rate_limited(self):
+        with self._cond:
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+
+
+def is_rate_limit_error(error):
+    """True for HTTP 429 / provider RateLimitError exceptions"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    if type(error).__name__ == "RateLimitError":
+        return True
+    # Not a bare "429": any message with that number in it would match
+    return "rate limit" in str(error).lower()
+
+
+def is_retryable_error(error):
+    """Rate limits, timeouts, connection errors and 5xx responses"""
+    if is_rate_limit_error(error):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None and status >= 500:
+        return True
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "Timeout",
+                                    "ConnectionError", "TimeoutError")
+
+
+def retry_after_seconds(error):
+    """Retry-After header value from an HTTP error, if the provider sent one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class LLMScheduler:
+    """Run LLM calls under rate limits with retries and adaptive concurrency"""
+
+    def __init__(self, requests_per_minute=3500, tokens_per_minute=90000,
+                 max_concurrency=16, initial_concurrency=4, max_retries=6,
+                 base_delay=0.5, max_delay=30.0, seed=None):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.limiter = AIMDLimiter(initial=initial_concurrency, maximum=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls):
+        """Scheduler configured from LLM_RPM, LLM_TPM and LLM_MAX_CONCURRENCY"""
+        return cls(requests_per_minute=int(os.getenv("LLM_RPM", "3500")),
+                   tokens_per_minute=int(os.getenv("LLM_TPM", "90000")),
+                   max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")))
+
+    def backoff(self, attempt, error=None):
+        """Seconds to wait before retry number `attempt` (full jitter)"""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        with self._lock:
+            delay = self._random.uniform(0, cap)
+        hinted = retry_after_seconds(error) if error is not None else None
+        return max(delay, hinted) if hinted else delay
+
+    def call(self, fn, *args, estimated_tokens=1, **kwargs):
+        """Call fn(*args, **kwargs), waiting for capacity and retrying transient errors"""
+        attempt = 0
+        while True:
+            self.request_bucket.acquire(1)
+            self.token_bucket.acquire(estimated_tokens)
+            self.limiter.acquire()
+            try:
+                with self._lock:
+                    self.calls += 1
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self.limiter.release()
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                if is_rate_limit_error(e):
+                    self.limiter.on_rate_limited()
+                    with self._lock:
+                        self.rate_limited += 1
+                # Rejected or failed before producing tokens - return the TPM
+                # reservation; the retry reserves again
+                self.token_bucket.refund(estimated_tokens)
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self.backoff(attempt, e))
+                attempt += 1
+                continue
+            self.limiter.release()
+            self.limiter.on_success()
+            return result
+
+    def admit(self, estimated_tokens=1):
+        """
+        Block until one call may start, for calls that cannot go through call().
+
+        Streamed responses cannot be retried once tokens have been sent, so
+        a stream takes a slot with admit() and gives it back with
+        finish(error) - rate limits and adaptive concurrency still apply,
+        only the retries do not.
+        """
+        self.request_bucket.acquire(1)
+        self.token_bucket.acquire(estimated_tokens)
+        self.limiter.acquire()
+        with self._lock:
+            self.calls += 1
+
+    def finish(self, error=None):
+        """Release the slot taken by admit(); error is the exception the call raised, if any"""
+        self.limiter.release()
+        if error is None:
+            self.limiter.on_success()
+            return
+        rate_limited = is_rate_limit_error(error)
+        if rate_limited:
+            self.limiter.on_rate_limited()
+        with self._lock:
+            self.rate_limited += rate_limited
+            self.failures += 1
+
+    def invoke(self, llm, prompt, config=None, max_tokens=256):
+        """llm.invoke(prompt) with the prompt + expected completion counted against TPM"""
+        estimated = count_tokens(prompt) + max_tokens
+        return self.call(llm.invoke, prompt, config=config, estimated_tokens=estimated)
+
+    def map(self, fn, items, estimate_tokens=None):
+        """
+        Apply fn to every item concurrently under the scheduler's limits.
+
+        Results come back in input order; an item that still fails after
+        all retries yields its exception instead of a result.
+        """
+        items = list(items)
+
+        def run(item):
+            estimated = estimate_tokens(item) if estimate_tokens else 1
+            try:
+                return self.call(fn, item, estimated_tokens=estimated)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            return list(pool.map(run, items))
+
+    def stats(self):
+        """Snapshot of scheduler metrics"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "failures": self.failures,
+                "concurrency_limit": round(self.limiter.limit, 2),
+            }
@@ -0,0 +1,181 @@
+"""
+rerank.py
+Second-stage re-ranking with early cut-off and a latency budget
+
+Two-stage retrieval: the keyword store cheaply fetches a wide candidate
+set, then a more expensive local scorer re-orders it. The final score is
+
+    first-stage score + max_bonus * scorer(query, doc)    (scorer in [0, 1])
+
+so a candidate can gain at most max_bonus. Candidates are scored in
+first-stage order: the first k establish a k-th best final score, then
+each batch only takes the candidates whose first-stage score + max_bonus
+can still beat it - the first one that cannot ends scoring, since every
+later candidate scores lower. The cut-off never changes the result, so it
+only saves work where first-stage scores spread wider than max_bonus; a
+smaller max_bonus cuts off more but lets the second stage move less.
+A deadline (the retrieval latency budget) stops scoring as well;
+unscored candidates keep their first-stage score.
+
+The first stage counts every distinct query word the same; idf_scorer()
+weighs them by rarity, which is what the second stage adds. proximity_scores
+needs no index but only helps where word order carries meaning.
+"""
+
+import heapq
+import math
+import threading
+import time
+
+from .index import tokenize
+
+
+def proximity_score(query_terms, content):
+    """
+    Term-proximity score in [0, 1]: query coverage x density of the tightest span.
+
+    The span is the shortest run of content tokens containing every query
+    term that occurs in the document; a document with all query words next
+    to each other scores 1.
+    """
+    if not query_terms:
+        return 0.0
+    hits = [(i, token) for i, token in enumerate(tokenize(content)) if token in query_terms]
+    matched = len({token for _, token in hits})
+    if not matched:
+        return 0.0
+
+    # Shortest window over the hit list that contains all matched terms
+    counts = {}
+    have = 0
+    best = None
+    left = 0
+    for position, token in hits:
+        counts[token] = counts.get(token, 0) + 1
+        if counts[token] == 1:
+            have += 1
+        while have == matched:
+            span = position - hits[left][0] + 1
+            if best is None or span < best:
+                best = span
+            left_token = hits[left][1]
+            counts[left_token] -= 1
+            if counts[left_token] == 0:
+                have -= 1
+            left += 1
+
+    coverage = matched / len(query_terms)
+    return coverage * matched / best
+
+
+def proximity_scores(query, docs):
+    """Batch scorer: proximity_score for each document"""
+    query_terms = set(tokenize(query))
+    return [proximity_score(query_terms, doc['content']) for doc in docs]
+
+
+def idf_scorer(index):
+    """
+    Batch scorer over a KeywordIndex: the share of the query's IDF weight in each document.
+
+    A query word in few documents weighs log(1 + N / (1 + df)), so a match
+    on a rare word counts for much more than one on a common word.
+    """
+    def idf_scores(query, docs):
+        size = len(index)
+        weights = {term: math.log(1 + size / (1 + len(index.content_postings.get(term, ()))))
+                   for term in set(tokenize(query))}
+        total = sum(weights.values())
+        if not total:
+            return [0.0] * len(docs)
+        scores = []
+        for doc in docs:
+            words = set(tokenize(doc['content']))
+            scores.append(sum(weight for term, weight in weights.items() if term in words) / total)
+        return scores
+
+    return idf_scores
+
+
+class Reranker:
+    """
+    Re-rank first-stage (document, score) candidates with an expensive scorer.
+
+    scorer(query, docs) -> list of floats in [0, 1], one per document; it is
+    called on batches of batch_size candidates, so a cross-encoder style
+    model can score a batch in one call.
+    """
+
+    def __init__(self, scorer=proximity_scores, max_bonus=2.0, batch_size=8, budget_ms=None):
+        self.scorer = scorer
+        self.max_bonus = max_bonus
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+
+        # Metrics
+        self.calls = 0
+        self.scored = 0
+        self.skipped = 0
+        self.budget_stops = 0
+        self._lock = threading.Lock()
+
+    def rerank(self, query, candidates, k, started=None):
+        """
+        Top-k (document, score) pairs after re-ranking.
+
+        started is the perf_counter() value the latency budget counts from
+        (default: now), so first-stage time can be included in the budget.
+        """
+        candidates = sorted(candidates, key=lambda pair: pair[1], reverse=True)
+        deadline = None
+        if self.budget_ms is not None:
+            deadline = (started if started is not None else time.perf_counter()) + self.budget_ms / 1000
+
+        final = []
+        done = 0
+        budget_stop = False
+        while done < len(candidates):
+            if deadline is not None and time.perf_counter() >= deadline:
+                budget_stop = True
+                break
+            if len(final) < k:
+                # Just enough to know a k-th best score before cutting off
+                size = min(self.batch_size, k - len(final))
+            else:
+                kth_best = heapq.nlargest(k, (score for _, score, _ in final))[-1]
+                size = 0
+                for _, score in candidates[done:done + self.batch_size]:
+                    if kth_best >= score + self.max_bonus:
+                        break  # neither this candidate nor any later one can reach the top-k
+                    size += 1
+                if not size:
+                    break
+            batch = candidates[done:done + size]
+            bonuses = self.scorer(query, [doc for doc, _ in batch])
+            for offset, ((doc, score), bonus) in enumerate(zip(batch, bonuses)):
+                final.append((doc, score + self.max_bonus * min(max(bonus, 0.0), 1.0), done + offset))
+            done += len(batch)
+
+        # Unscored candidates keep their first-stage score (bonus 0)
+        final.extend((doc, score, done + offset) for offset, (doc, score) in enumerate(candidates[done:]))
+        with self._lock:
+            self.calls += 1
+            self.scored += done
+            self.skipped += len(candidates) - done
+            self.budget_stops += budget_stop
+
+        # Ties keep first-stage order
+        final.sort(key=lambda item: (-item[1], item[2]))
+        return [(doc, score) for doc, score, _ in final[:k]]
+
+    def stats(self):
+        """Snapshot of re-ranking metrics"""
+        with self._lock:
+            total = self.scored + self.skipped
+            return {
+                "calls": self.calls,
+                "scored": self.scored,
+                "skipped": self.skipped,
+                "skip_rate": self.skipped / total if total else 0.0,
+                "budget_stops": self.budget_stops,
+            }
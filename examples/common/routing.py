@@ -0,0 +1,196 @@
+"""
+routing.py
+Model routing - pick a model tier per chain, cheapest first
+
+Every route (a chain or template name such as "review") maps to a list
+of tiers to try in order. A structured chain built with router.chain()
+runs the prompt on the first tier and only escalates to the next one when
+the output parser rejects the answer (OutputParserException, e.g. JSON
+that does not validate as a ProductReview), so easy inputs never pay for
+the expensive model.
+
+With FAKE_LLM=1 every tier is a FakeLLM under the tier's real model name
+(so UsageAccountant prices it), with the tier's latency, speed and
+invalid-output rate, so routing policies can be benchmarked offline.
+"""
+
+import os
+import threading
+import time
+
+from .llm import fake_llm_settings, get_llm, use_fake_llm
+
+
+class ModelTier:
+    """One model tier and how its offline stand-in behaves"""
+
+    def __init__(self, model_name, fake_latency_scale=1.0, fake_speed_scale=1.0,
+                 fake_invalid_json_rate=0.0):
+        self.model_name = model_name
+        self.fake_latency_scale = fake_latency_scale
+        self.fake_speed_scale = fake_speed_scale
+        self.fake_invalid_json_rate = fake_invalid_json_rate
+
+
+DEFAULT_TIERS = {
+    # Small completion model: classification, short text, simple extraction
+    "fast": ModelTier("babbage-002", fake_latency_scale=0.3, fake_speed_scale=3.0,
+                      fake_invalid_json_rate=0.2),
+    # The model every example used before routing
+    "strong": ModelTier("gpt-3.5-turbo-instruct"),
+}
+
+DEFAULT_ROUTES = {
+    "sentiment": ("fast",),
+    "quote": ("fast",),
+    "review": ("fast", "strong"),
+    "recipe": ("fast", "strong"),
+    "story": ("strong",),
+    "rag": ("strong",),
+    "chat": ("strong",),
+}
+
+
+class RouteStats:
+    """Counters for one route"""
+
+    def __init__(self):
+        self.calls = 0
+        self.served = {}  # tier -> calls answered by it
+        self.escalations = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+
+class ModelRouter:
+    """
+    Map routes to model tiers and run cheap-first cascades.
+
+    Routes not listed use default_route. Use llm_for() where there is no
+    parser to validate the answer, and chain() for structured output.
+    """
+
+    def __init__(self, tiers=None, routes=None, default_route=("strong",)):
+        self.tiers = dict(DEFAULT_TIERS if tiers is None else tiers)
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.default_route = tuple(default_route)
+        for route, names in list(self.routes.items()) + [("default", self.default_route)]:
+            unknown = [name for name in names if name not in self.tiers]
+            if unknown:
+                raise ValueError(f"route {route!r} uses unknown tiers {unknown}")
+
+        self._llms = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Router whose tier models can be overridden with LLM_FAST_MODEL / LLM_STRONG_MODEL"""
+        tiers = dict(DEFAULT_TIERS)
+        for name, tier in DEFAULT_TIERS.items():
+            model = os.getenv(f"LLM_{name.upper()}_MODEL")
+            if model:
+                tiers[name] = ModelTier(model, tier.fake_latency_scale, tier.fake_speed_scale,
+                                        tier.fake_invalid_json_rate)
+        return cls(tiers=tiers)
+
+    def tiers_for(self, route):
+        """Tier names to try for route, cheapest first"""
+        return tuple(self.routes.get(route, self.default_route))
+
+    def llm(self, tier, temperature=0.7):
+        """The (cached) LLM for a tier at a temperature"""
+        key = (tier, temperature)
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                llm = self._llms[key] = self._create(self.tiers[tier], temperature)
+            return llm
+
+    def _create(self, tier, temperature):
+        if not use_fake_llm():
+            return get_llm(model_name=tier.model_name, temperature=temperature)
+
+        from .fake_llm import FakeLLM
+        settings = fake_llm_settings()
+        settings.update(
+            model_name=tier.model_name,
+            temperature=temperature,
+            latency_ms=settings["latency_ms"] * tier.fake_latency_scale,
+            tokens_per_second=settings["tokens_per_second"] * tier.fake_speed_scale,
+            invalid_json_rate=tier.fake_invalid_json_rate,
+        )
+        return FakeLLM(**settings)
+
+    def llm_for(self, route, temperature=0.7):
+        """The first tier's LLM for route (no validation, so no escalation)"""
+        return self.llm(self.tiers_for(route)[0], temperature)
+
+    def chain(self, route, prompt, parser, temperature=0.7):
+        """
+        prompt -> LLM -> parser as one runnable, escalating through the route's tiers.
+
+        Each tier gets one attempt; if the parser raises
+        OutputParserException the next tier answers the same prompt. The
+        last tier's parse error propagates.
+        """
+        from langchain_core.exceptions import OutputParserException
+        from langchain_core.runnables import RunnableLambda
+
+        tiers = self.tiers_for(route)
+
+        def cascade(inputs, config=None):
+            start = time.perf_counter()
+            prompt_value = prompt.invoke(inputs, config)
+            try:
+                for attempt, tier in enumerate(tiers):
+                    text = self.llm(tier, temperature).invoke(prompt_value, config)
+                    try:
+                        result = parser.invoke(text, config)
+                    except OutputParserException:
+                        if attempt == len(tiers) - 1:
+                            raise
+                        self._record(route, escalated=True)
+                        continue
+                    self._record(route, served_by=tier, seconds=time.perf_counter() - start)
+                    return result
+            except Exception:
+                self._record(route, failed=True, seconds=time.perf_counter() - start)
+                raise
+
+        return RunnableLambda(cascade, name=f"route:{route}")
+
+    def _record(self, route, served_by=None, escalated=False, failed=False, seconds=0.0):
+        with self._lock:
+            stats = self._stats.setdefault(route, RouteStats())
+            if escalated:
+                stats.escalations += 1
+                return
+            stats.calls += 1
+            stats.seconds += seconds
+            if failed:
+                stats.failures += 1
+            else:
+                stats.served[served_by] = stats.served.get(served_by, 0) + 1
+
+    def stats(self):
+        """{route: {calls, served, escalations, escalation_rate, failures, avg_ms}}"""
+        with self._lock:
+            return {
+                route: {
+                    "calls": s.calls,
+                    "served": dict(s.served),
+                    "escalations": s.escalations,
+                    "escalation_rate": s.escalations / s.calls if s.calls else 0.0,
+                    "failures": s.failures,
+                    "avg_ms": 1000 * s.seconds / s.calls if s.calls else 0.0,
+                }
+                for route, s in self._stats.items()
+            }
+
+
+def router_from_env():
+    """ModelRouter.from_env() when LLM_ROUTING=1, otherwise None (one model for everything)"""
+    if os.getenv("LLM_ROUTING", "").lower() in ("1", "true", "yes"):
+        return ModelRouter.from_env()
+    return None
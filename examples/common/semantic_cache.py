@@ -0,0 +1,260 @@
+"""
+semantic_cache.py
+Semantic query cache - reuse answers for differently phrased repeat questions
+
+Embedding similarity alone cannot tell "What is LangChain?" from "What is
+not LangChain?", so a hit also needs the questions' words to agree: the
+new question may not add content words the cached one lacks, and both
+must have the same negations.
+"""
+
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from .tokens import STOPWORDS
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Expand the common contractions so "what's" and "what is" embed the same
+_CONTRACTIONS = {
+    "what's": "what is", "who's": "who is", "where's": "where is",
+    "how's": "how is", "it's": "it is", "that's": "that is",
+    "there's": "there is", "can't": "cannot", "don't": "do not",
+    "doesn't": "does not", "isn't": "is not", "aren't": "are not",
+}
+
+# Whole words only, so "that's" expands but "somewhat's" is left alone
+_CONTRACTION_RE = re.compile(r"\b(" + "|".join(re.escape(short) for short in _CONTRACTIONS) + r")\b")
+
+# Words that flip a question's meaning
+NEGATIONS = frozenset({"not", "no", "never", "without", "cannot", "nor", "none"})
+
+
+def normalize_question(text):
+    """Lowercase, expand contractions and strip punctuation"""
+    text = _CONTRACTION_RE.sub(lambda m: _CONTRACTIONS[m.group(1)], text.lower())
+    return " ".join(_WORD_RE.findall(text))
+
+
+def question_terms(text):
+    """Content words of a question (stopwords dropped, plurals folded)"""
+    return frozenset(word[:-1] if len(word) > 3 and word.endswith("s") else word
+                     for word in normalize_question(text).split() if word not in STOPWORDS)
+
+
+def same_question(terms, cached_terms):
+    """Whether a cached answer may serve: no new content words, same negations"""
+    return terms <= cached_terms and terms & NEGATIONS == cached_terms & NEGATIONS
+
+
+class HashingEmbedder:
+    """Cheap local embedding: hashed words and character trigrams, L2-normalized"""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def __call__(self, text):
+        vector = [0.0] * self.dim
+        words = [w for w in normalize_question(text).split() if w not in STOPWORDS]
+
+        for word in words:
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                trigram = "#" + padded[i:i + 3]
+                vector[zlib.crc32(trigram.encode("utf-8")) % self.dim] += 0.5
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+
+def cosine(a, b):
+    """Cosine similarity of two L2-normalized vectors"""
+    return sum(x * y for x, y in zip(a, b))
+
+
+class LSHIndex:
+    """Random-hyperplane LSH index for approximate cosine nearest neighbours"""
+
+    def __init__(self, dim, num_tables=4, num_bits=8, seed=7):
+        rng = random.Random(seed)
+        self.tables = [
+            ([[rng.gauss(0, 1) for _ in range(dim)] for _ in range(num_bits)], {})
+            for _ in range(num_tables)
+        ]
+
+    @staticmethod
+    def _bucket(planes, vector):
+        key = 0
+        for plane in planes:
+            key = (key << 1) | (sum(p * v for p, v in zip(plane, vector)) >= 0)
+        return key
+
+    def add(self, key, vector):
+        for planes, buckets in self.tables:
+            buckets.setdefault(self._bucket(planes, vector), set()).add(key)
+
+    def remove(self, key, vector):
+        for planes, buckets in self.tables:
+            bucket = buckets.get(self._bucket(planes, vector))
+            if bucket:
+                bucket.discard(key)
+
+    def candidates(self, vector):
+        found = set()
+        for planes, buckets in self.tables:
+            found |= buckets.get(self._bucket(planes, vector), set())
+        return found
+
+
+class CacheEntry:
+    """A cached answer plus what is needed to validate and evict it"""
+
+    __slots__ = ("question", "terms", "vector", "value", "version", "compute_seconds")
+
+    def __init__(self, question, vector, value, version, compute_seconds):
+        self.question = question
+        self.terms = question_terms(question)
+        self.vector = vector
+        self.value = value
+        self.version = version
+        self.compute_seconds = compute_seconds
+
+
+class SemanticCache:
+    """
+    LRU cache of answers keyed by question embedding.
+
+    A lookup returns a cached value when a previously answered question has
+    cosine similarity >= threshold with the new one, passes same_question()
+    and was answered against the same corpus version. Versions only go up: the first lookup or store
+    with a newer version purges every entry answered against an older one.
+    """
+
+    def __init__(self, embed_fn=None, threshold=0.9, max_entries=1024, dim=256):
+        self.embed_fn = embed_fn or HashingEmbedder(dim)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._index = None
+        self._next_id = 0
+        self._version = None  # newest corpus version seen
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.near_misses = 0  # similar enough, but the words disagree
+        self.evictions = 0
+        self.lookup_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        self._index.remove(entry_id, entry.vector)
+
+    def _purge_older(self, version):
+        """Drop every entry answered against a corpus older than version"""
+        if self._version is not None and version <= self._version:
+            return
+        self._version = version
+        for entry_id in [i for i, entry in self._entries.items() if entry.version < version]:
+            self._remove(entry_id)
+            self.stale += 1
+
+    def lookup(self, question, version=0):
+        """Return (value, similarity) for a matching entry, or (None, best similarity)"""
+        start = time.perf_counter()
+        vector = self.embed_fn(question)
+        terms = question_terms(question)
+
+        with self._lock:
+            self._purge_older(version)
+            best_sim = 0.0
+            best_id, match_sim = None, 0.0
+            near_miss = False
+            if self._index is not None:
+                for entry_id in self._index.candidates(vector):
+                    sim = cosine(vector, self._entries[entry_id].vector)
+                    best_sim = max(best_sim, sim)
+                    if sim < self.threshold or sim <= match_sim:
+                        continue
+                    if not same_question(terms, self._entries[entry_id].terms):
+                        near_miss = True
+                        continue
+                    best_id, match_sim = entry_id, sim
+
+            value = None
+            if best_id is not None:
+                entry = self._entries[best_id]
+                if entry.version != version:
+                    # Newer than the caller's corpus; leave it for current callers
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(best_id)
+                    self.hits += 1
+                    self.saved_seconds += entry.compute_seconds
+                    value = entry.value
+            else:
+                self.misses += 1
+                self.near_misses += near_miss
+
+            self.lookup_seconds += time.perf_counter() - start
+        return value, (match_sim if value is not None else best_sim)
+
+    def store(self, question, value, version=0, compute_seconds=0.0):
+        """Cache the answer to question, evicting the least recently used entry"""
+        vector = self.embed_fn(question)
+
+        with self._lock:
+            self._purge_older(version)
+            if version < self._version:
+                # Computed against a corpus that has since changed
+                return
+            if self._index is None:
+                self._index = LSHIndex(len(vector))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = CacheEntry(question, vector, value, version, compute_seconds)
+            self._index.add(entry_id, vector)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._index = None
+            self._version = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Snapshot of cache metrics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "near_misses": self.near_misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+            "avg_lookup_ms": 1000 * self.lookup_seconds / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+        }
@@ -0,0 +1,261 @@
+"""
+sharding.py
+Sharded keyword store - partition documents, search all shards, merge top-k
+
+ShardedVectorStore is a drop-in for SimpleVectorStore (same documents /
+add_documents / similarity_search / similarity_search_with_score /
+version), with the corpus split round-robin over N shards, each holding
+its own documents and KeywordIndex.
+
+Queries are scattered to all shards at once, each shard returns its local
+top-k, and the parent merges them. In-process shards are searched on a
+small thread pool (they share the GIL, so this mostly overlaps the
+fan-out). With processes=True every shard lives in its own worker
+process, so both indexing and scoring run on separate cores and no single
+interpreter has to hold the whole corpus; each worker pipe has its own
+lock, so concurrent queries pipeline through the workers instead of
+queueing behind one another.
+
+Results are identical to a single SimpleVectorStore: shards keep each
+document's global insertion position and the merge breaks score ties on
+it, exactly like the unsharded store's stable sort.
+"""
+
+import heapq
+import multiprocessing
+import threading
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+from .index import KeywordIndex
+
+
+class Shard:
+    """One partition: documents, their global positions and a KeywordIndex"""
+
+    def __init__(self):
+        self.documents = []
+        self.positions = array("q")
+        self.index = KeywordIndex()
+
+    def add(self, docs, positions):
+        for doc in docs:
+            self.index.add(doc['title'], doc['content'])
+        self.documents.extend(docs)
+        self.positions.extend(positions)
+
+    def search(self, query, k):
+        """Local top-k as (global position, score, document)"""
+        return [(self.positions[p], score, self.documents[p]) for p, score in self.index.search(query, k)]
+
+    def search_many(self, queries, k):
+        return [self.search(query, k) for query in queries]
+
+
+def _shard_worker(conn):
+    """Worker process: own one Shard and answer requests until told to stop"""
+    shard = Shard()
+    while True:
+        request = conn.recv()
+        op = request[0]
+        try:
+            if op == "add":
+                shard.add(request[1], request[2])
+                conn.send(("ok", len(shard.documents)))
+            elif op == "search":
+                conn.send(("ok", shard.search_many(request[1], request[2])))
+            elif op == "get":
+                conn.send(("ok", shard.documents[request[1]]))
+            elif op == "documents":
+                conn.send(("ok", shard.documents))
+            elif op == "stop":
+                conn.send(("ok", None))
+                break
+            else:
+                # Every request gets a reply, or the caller would wait forever
+                conn.send(("error", f"unknown op {op!r}"))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+    conn.close()
+
+
+def merge_top_k(shard_results, k):
+    """Merge per-shard (global position, score, document) lists into (document, score) pairs"""
+    best = heapq.nsmallest(k, (hit for hits in shard_results for hit in hits),
+                           key=lambda hit: (-hit[1], hit[0]))
+    return [(doc, score) for position, score, doc in best]
+
+
+class ShardedDocuments(Sequence):
+    """Read-only view of a ShardedVectorStore's documents in insertion order"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.size
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("document position out of range")
+        return self.store._document(position)
+
+    def __iter__(self):
+        # One fetch per shard, then deal them back into insertion order
+        per_shard = self.store._shard_documents()
+        num_shards = self.store.num_shards
+        for position in range(len(self)):
+            yield per_shard[position % num_shards][position // num_shards]
+
+
+class ShardedVectorStore:
+    """Keyword store partitioned over num_shards in-process shards or worker processes"""
+
+    def __init__(self, num_shards=4, processes=False):
+        self.num_shards = num_shards
+        self.processes = processes
+        self.size = 0
+        # Bumped on every change so caches can tell stale answers apart
+        self.version = 0
+        self.documents = ShardedDocuments(self)
+
+        if processes:
+            # One request/reply at a time per pipe; different pipes run independently
+            self._conn_locks = [threading.Lock() for _ in range(num_shards)]
+            self._conns = []
+            self._workers = []
+            for _ in range(num_shards):
+                parent_conn, child_conn = multiprocessing.Pipe()
+                worker = multiprocessing.Process(target=_shard_worker, args=(child_conn,), daemon=True)
+                worker.start()
+                child_conn.close()
+                self._conns.append(parent_conn)
+                self._workers.append(worker)
+        else:
+            self.shards = [Shard() for _ in range(num_shards)]
+            # Searches every shard at once
+            self._pool = ThreadPoolExecutor(max_workers=num_shards, thread_name_prefix="shard")
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes and the fan-out threads"""
+        if not self.processes:
+            self._pool.shutdown(wait=False)
+        elif self._workers:
+            self._scatter([("stop",)] * self.num_shards)
+            for worker in self._workers:
+                worker.join(timeout=5)
+            self._workers = []
+
+    def _request(self, shard, request):
+        """One request/reply with one worker"""
+        conn = self._conns[shard]
+        with self._conn_locks[shard]:
+            conn.send(request)
+            status, payload = conn.recv()
+        if status == "error":
+            raise RuntimeError(f"shard worker failed: {payload}")
+        return payload
+
+    def _scatter(self, requests):
+        """
+        Send one request to every worker, then collect the replies in shard order.
+
+        Each pipe's lock is held from its send to its reply and the locks
+        are always taken in shard order, so concurrent scatters pipeline
+        (one reads shard 0's reply while the next already sends to shard 0)
+        and cannot deadlock.
+        """
+        held = []
+        replies = []
+        try:
+            for lock, conn, request in zip(self._conn_locks, self._conns, requests):
+                lock.acquire()
+                held.append(lock)
+                conn.send(request)
+            for conn in self._conns:
+                replies.append(conn.recv())
+                held.pop(0).release()
+        finally:
+            for lock in held:
+                lock.release()
+        for status, payload in replies:
+            if status == "error":
+                raise RuntimeError(f"shard worker failed: {payload}")
+        return [payload for status, payload in replies]
+
+    def _document(self, position):
+        shard, local = position % self.num_shards, position // self.num_shards
+        if self.processes:
+            return self._request(shard, ("get", local))
+        return self.shards[shard].documents[local]
+
+    def _shard_documents(self):
+        if self.processes:
+            return self._scatter([("documents",)] * self.num_shards)
+        return [shard.documents for shard in self.shards]
+
+    def add_documents(self, docs, index=None, quiet=False):
+        """
+        Add documents, dealing them round-robin over the shards
+
+        index and quiet work as in SimpleVectorStore, except that index is
+        only checked, not reused: every shard indexes its own slice, which
+        a whole-batch KeywordIndex cannot be split into.
+        """
+        docs = list(docs)
+        if index is not None and len(index) != len(docs):
+            raise ValueError(f"index covers {len(index)} documents, got {len(docs)}")
+        batches = [([], array("q")) for _ in range(self.num_shards)]
+        for offset, doc in enumerate(docs):
+            position = self.size + offset
+            shard_docs, positions = batches[position % self.num_shards]
+            shard_docs.append(doc)
+            positions.append(position)
+
+        if self.processes:
+            # Shards index their batches concurrently
+            self._scatter([("add", shard_docs, positions) for shard_docs, positions in batches])
+        else:
+            for shard, (shard_docs, positions) in zip(self.shards, batches):
+                shard.add(shard_docs, positions)
+
+        self.size += len(docs)
+        self.version += 1
+        if not quiet:
+            print(f"✅ Added {len(docs)} documents to {self.num_shards} shards")
+
+    def similarity_search(self, query, k=3):
+        """Keyword search over all shards"""
+        return [doc for doc, score in self.similarity_search_with_score(query, k)]
+
+    def similarity_search_with_score(self, query, k=3):
+        """Top-k (document, score) pairs, merged from every shard's local top-k"""
+        return self.batch_search_with_score([query], k)[0]
+
+    def batch_search_with_score(self, queries, k=3):
+        """
+        Search many queries with one round trip per shard.
+
+        Returns one list of (document, score) pairs per query, in order.
+        """
+        queries = list(queries)
+        if self.processes:
+            per_shard = self._scatter([("search", queries, k)] * self.num_shards)
+        else:
+            futures = [self._pool.submit(shard.search_many, queries, k) for shard in self.shards]
+            per_shard = [future.result() for future in futures]
+        return [merge_top_k([hits[i] for hits in per_shard], k) for i in range(len(queries))]
@@ -0,0 +1,136 @@
+"""
+single_flight.py
+Request coalescing - concurrent identical LLM prompts share one upstream call
+
+Only deterministic calls are coalesced by default (temperature 0). For
+sampled models, sharing one completion between callers changes behaviour,
+so it has to be switched on explicitly with SingleFlight(opt_in=True).
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+
+
+def llm_settings(llm):
+    """The model settings that affect an LLM's output"""
+    params = getattr(llm, "_identifying_params", None)
+    if params is None:
+        params = {"temperature": getattr(llm, "temperature", None),
+                  "model_name": getattr(llm, "model_name", None)}
+    return dict(params, _type=type(llm).__name__)
+
+
+def prompt_key(llm, prompt):
+    """Key identifying (model settings, prompt text)"""
+    text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+    settings = json.dumps(llm_settings(llm), sort_keys=True, default=str)
+    return hashlib.sha256(f"{settings}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one execution"""
+
+    def __init__(self, opt_in=False):
+        self.opt_in = opt_in
+        self._futures = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.upstream_calls = 0
+        self.collapsed = 0
+
+    def eligible(self, llm):
+        """Whether calls to this LLM may share results"""
+        return self.opt_in or getattr(llm, "temperature", None) == 0
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with the same key"""
+        with self._lock:
+            self.requests += 1
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+                self.upstream_calls += 1
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+    def passthrough(self, fn):
+        """Run fn() uncoalesced (an ineligible call), counted like every other request"""
+        self._count_uncoalesced()
+        return fn()
+
+    def _count_uncoalesced(self):
+        with self._lock:
+            self.requests += 1
+            self.upstream_calls += 1
+
+    async def ado(self, key, coro_fn):
+        """Async version of do(); callers on the same event loop share one task"""
+        import asyncio  # already loaded by the running loop; keeps module import light
+
+        with self._lock:
+            self.requests += 1
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(coro_fn())
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+                self.upstream_calls += 1
+            else:
+                self.collapsed += 1
+        # shield() so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(task)
+
+    def invoke(self, llm, prompt, config=None):
+        """llm.invoke(prompt), coalesced with identical in-flight calls when eligible"""
+        if not self.eligible(llm):
+            return self.passthrough(lambda: llm.invoke(prompt, config=config))
+        return self.do(prompt_key(llm, prompt), lambda: llm.invoke(prompt, config=config))
+
+    async def ainvoke(self, llm, prompt, config=None):
+        """Async llm.ainvoke(prompt) with coalescing"""
+        if not self.eligible(llm):
+            self._count_uncoalesced()
+            return await llm.ainvoke(prompt, config=config)
+        return await self.ado(prompt_key(llm, prompt), lambda: llm.ainvoke(prompt, config=config))
+
+    def wrap(self, llm):
+        """A runnable that can replace `llm` in a chain: prompt | flight.wrap(llm) | parser"""
+        from langchain_core.runnables import RunnableLambda
+
+        def call(prompt, config):
+            return self.invoke(llm, prompt, config)
+
+        async def acall(prompt, config):
+            return await self.ainvoke(llm, prompt, config)
+
+        return RunnableLambda(call, afunc=acall)
+
+    def stats(self):
+        """Snapshot of coalescing metrics"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "upstream_calls": self.upstream_calls,
+                "collapsed": self.collapsed,
+                "collapse_rate": self.collapsed / self.requests if self.requests else 0.0,
+            }
@@ -0,0 +1,65 @@
+"""
+tokens.py
+Token counting helpers - tiktoken when available, a cheap estimate otherwise
+"""
+
+import re
+from functools import lru_cache
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Roughly how tiktoken splits English text: words, numbers and punctuation runs
+_APPROX_TOKEN_RE = re.compile(r"\w+|[^\w\s]+")
+
+# Words too common to tell two questions (or topics) apart
+STOPWORDS = frozenset({"a", "an", "the", "is", "are", "do", "does", "me", "please", "tell", "about", "of"})
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name=DEFAULT_ENCODING):
+    """Return a tiktoken encoding, or None if tiktoken (or its BPE file) is unavailable"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # Not installed, or offline and the BPE file is not cached yet
+        return None
+
+
+def estimate_tokens(text):
+    """Approximate token count without a tokenizer (about 4 chars per token)"""
+    if not text:
+        return 0
+    pieces = _APPROX_TOKEN_RE.findall(text)
+    long_extra = sum(len(p) // 8 for p in pieces if len(p) > 8)
+    return len(pieces) + long_extra
+
+
+def count_tokens(text, encoding=DEFAULT_ENCODING):
+    """Count tokens in text using tiktoken, falling back to an estimate"""
+    enc = get_encoding(encoding)
+    if enc is None:
+        return estimate_tokens(text)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text, max_tokens, encoding=DEFAULT_ENCODING):
+    """Cut text down to at most max_tokens, preferring a sentence boundary"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, encoding) <= max_tokens:
+        return text
+
+    enc = get_encoding(encoding)
+    if enc is not None:
+        cut = enc.decode(enc.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:max_tokens * 4]
+        while cut and estimate_tokens(cut) > max_tokens:
+            cut = cut[:int(len(cut) * 0.9)]
+
+    # Drop the trailing partial sentence if there is a full one to keep
+    boundary = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if boundary > 0:
+        cut = cut[:boundary + 1]
+    return cut.strip()
@@ -0,0 +1,306 @@
+"""
+tracing.py
+Per-stage latency tracing for chains and the RAG pipeline
+
+A StageTracer is a LangChain callback handler: pass it in a chain's config
+(``chain.invoke(inputs, config={"callbacks": tracer.callbacks})``) and every
+runnable in the chain - prompt, LLM, parser, lambdas - gets its wall time,
+token counts and retries recorded. Code that is not a runnable can time its
+own steps with ``with tracer.stage("retrieve"):``.
+
+When tracing is off, use NULL_TRACER: its stage() returns a shared no-op
+context manager and its callbacks list is empty, so the cost is one
+attribute lookup per step.
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Histogram bucket upper bounds in seconds (Prometheus style)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_STAGE_KINDS = {
+    "prompts": "prompt",
+    "output_parsers": "parser",
+    "output_parser": "parser",
+    "llms": "llm",
+    "chat_models": "llm",
+    "runnables": "chain",
+    "schema": "chain",
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate a quantile from the buckets (upper bound of the matching bucket)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+
+class StageStats:
+    """Aggregated numbers for one stage name"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+def _stage_name(serialized, kwargs, default):
+    """Readable stage name like 'llm:FakeLLM' or 'prompt:PromptTemplate'"""
+    name = kwargs.get("name")
+    ids = (serialized or {}).get("id") or []
+    if not name:
+        name = ids[-1] if ids else default
+    kind = default
+    for part in ids[:-1]:
+        if part in _STAGE_KINDS:
+            kind = _STAGE_KINDS[part]
+    return f"{kind}:{name}"
+
+
+class NullTracer:
+    """Tracer that records nothing"""
+
+    enabled = False
+    callbacks = []
+    _noop = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._noop
+
+    def config(self, **extra):
+        return extra
+
+
+NULL_TRACER = NullTracer()
+
+
+class StageTracer(BaseCallbackHandler):
+    """
+    Record wall time, tokens and retries per stage and aggregate into histograms.
+
+    With keep_events, the last max_events individual events are also kept
+    for export_jsonl(); older ones are dropped so a long-running process
+    cannot grow the list without bound.
+    """
+
+    enabled = True
+
+    def __init__(self, keep_events=True, max_events=10000):
+        self.stats = {}
+        self.max_events = max_events
+        self.events = deque(maxlen=max_events)
+        self.keep_events = keep_events
+        self._starts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def callbacks(self):
+        return [self]
+
+    def config(self, **extra):
+        """Runnable config that attaches this tracer"""
+        return dict(extra, callbacks=[self])
+
+    # -- recording ---------------------------------------------------------
+
+    def _begin(self, run_id, name, parent_run_id):
+        self._starts[run_id] = (name, time.perf_counter(), parent_run_id)
+
+    def _finish(self, run_id, error=None, prompt_tokens=0, completion_tokens=0):
+        started = self._starts.pop(run_id, None)
+        if started is None:
+            return
+        name, start, parent_run_id = started
+        self.record(name, time.perf_counter() - start, error=error,
+                    prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                    run_id=run_id, parent_run_id=parent_run_id)
+
+    def record(self, name, seconds, error=None, prompt_tokens=0, completion_tokens=0,
+               run_id=None, parent_run_id=None):
+        """Add one timed stage execution"""
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = StageStats()
+            stats.latency.observe(seconds)
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            if error is not None:
+                stats.errors += 1
+            if self.keep_events:
+                self.events.append({
+                    "ts": time.time(),
+                    "stage": name,
+                    "duration_ms": round(seconds * 1000, 3),
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "error": repr(error) if error is not None else None,
+                    "run_id": str(run_id) if run_id else None,
+                    "parent_run_id": str(parent_run_id) if parent_run_id else None,
+                })
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block of code as a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.record(name, time.perf_counter() - start, error=e)
+            raise
+        self.record(name, time.perf_counter() - start)
+
+    # -- LangChain callbacks -------------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._begin(run_id, _stage_name(serialized, kwargs, "chain"), parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=error)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._begin(run_id, _stage_name(serialized, kwargs, "llm"), parent_run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._begin(run_id, _stage_name(serialized, kwargs, "llm"), parent_run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage", {})
+        self._finish(run_id, prompt_tokens=usage.get("prompt_tokens", 0),
+                     completion_tokens=usage.get("completion_tokens", 0))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=error)
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        started = self._starts.get(run_id)
+        if started:
+            with self._lock:
+                self.stats.setdefault(started[0], StageStats()).retries += 1
+
+    # -- reporting -----------------------------------------------------------
+
+    def summary(self):
+        """{stage: {count, mean_ms, p50_ms, p95_ms, max_ms, tokens, errors, retries}}"""
+        with self._lock:
+            return {
+                name: {
+                    "count": s.latency.count,
+                    "mean_ms": 1000 * s.latency.sum / s.latency.count if s.latency.count else 0.0,
+                    "p50_ms": 1000 * s.latency.quantile(0.5),
+                    "p95_ms": 1000 * s.latency.quantile(0.95),
+                    "max_ms": 1000 * s.latency.max,
+                    "prompt_tokens": s.prompt_tokens,
+                    "completion_tokens": s.completion_tokens,
+                    "errors": s.errors,
+                    "retries": s.retries,
+                }
+                for name, s in self.stats.items()
+            }
+
+    def print_summary(self):
+        """Print a per-stage latency table"""
+        print(f"\n⏱️  {'Stage':<34}{'count':>7}{'mean ms':>10}{'p95 ms':>10}{'tokens':>9}{'err':>5}")
+        for name, s in sorted(self.summary().items(), key=lambda kv: -kv[1]["mean_ms"] * kv[1]["count"]):
+            tokens = s["prompt_tokens"] + s["completion_tokens"]
+            print(f"   {name:<34}{s['count']:>7}{s['mean_ms']:>10.1f}{s['p95_ms']:>10.1f}"
+                  f"{tokens:>9}{s['errors']:>5}")
+
+    def export_jsonl(self, path):
+        """Append the recorded events to a JSONL file and clear them"""
+        with self._lock:
+            events, self.events = self.events, deque(maxlen=self.max_events)
+        with open(path, "a") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+        return len(events)
+
+    def export_prometheus(self, path, metric="langchain_stage_seconds"):
+        """Write the histograms in Prometheus text exposition format"""
+        with open(path, "w") as f:
+            f.write(self.prometheus_text(metric))
+
+    def prometheus_text(self, metric="langchain_stage_seconds"):
+        """
+        Histograms and counters in Prometheus text exposition format.
+
+        Counters share the metric's prefix: langchain_stage_seconds gives
+        langchain_stage_errors_total and so on.
+        """
+        prefix = metric[:-len("_seconds")] if metric.endswith("_seconds") else metric
+        lines = [f"# HELP {metric} Wall time per chain stage",
+                 f"# TYPE {metric} histogram"]
+        with self._lock:
+            items = sorted(self.stats.items())
+            for name, s in items:
+                label = name.replace('"', "'")
+                cumulative = 0
+                for bound, n in zip(s.latency.buckets + (float("inf"),), s.latency.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{label}"}} {s.latency.sum}')
+                lines.append(f'{metric}_count{{stage="{label}"}} {s.latency.count}')
+            for counter in ("prompt_tokens", "completion_tokens", "errors", "retries"):
+                lines.append(f"# TYPE {prefix}_{counter}_total counter")
+                for name, s in items:
+                    label = name.replace('"', "'")
+                    lines.append(f'{prefix}_{counter}_total{{stage="{label}"}} {getattr(s, counter)}')
+        return "\n".join(lines) + "\n"
+
+
+def tracer_from_env():
+    """StageTracer when TRACE_STAGES=1, otherwise NULL_TRACER"""
+    if os.getenv("TRACE_STAGES", "").lower() in ("1", "true", "yes"):
+        return StageTracer()
+    return NULL_TRACER
+
+
+def export_from_env(tracer):
+    """Export to TRACE_JSONL / TRACE_PROM paths if they are set"""
+    if not tracer.enabled:
+        return
+    jsonl_path = os.getenv("TRACE_JSONL")
+    if jsonl_path:
+        tracer.export_jsonl(jsonl_path)
+        print(f"📝 Trace events appended to {jsonl_path}")
+    prom_path = os.getenv("TRACE_PROM")
+    if prom_path:
+        tracer.export_prometheus(prom_path)
+        print(f"📈 Stage histograms written to {prom_path}")
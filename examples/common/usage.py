@@ -0,0 +1,229 @@
+"""
+usage.py
+Token usage and cost accounting with optional per-run budgets
+
+Attach a UsageAccountant to chain calls with a label, e.g.
+``chain.invoke(inputs, config=accountant.config("review"))``. Every LLM call
+is counted from the provider's usage fields when present, or estimated with
+tiktoken, and aggregated per label.
+
+With a budget, each call reserves its prompt plus its max_tokens before it
+starts and settles to the real count when it ends, so concurrent calls
+cannot overrun the budget between them. A call whose worst case does not
+fit is aborted with TokenBudgetExceeded; an LLM wrapped with
+accountant.limit(llm) degrades instead, asking for a shorter completion.
+"""
+
+import os
+import threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .tokens import count_tokens
+
+# USD per 1K tokens: (prompt, completion)
+PRICES_PER_1K = {
+    "gpt-3.5-turbo-instruct": (0.0015, 0.002),
+    "babbage-002": (0.0004, 0.0004),
+    "davinci-002": (0.002, 0.002),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "fake-instruct": (0.0, 0.0),
+}
+DEFAULT_MODEL = "gpt-3.5-turbo-instruct"
+# Completion reservation when the model does not say (OpenAI's default max_tokens)
+DEFAULT_MAX_TOKENS = 256
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """Raised before an LLM call that would go over the run's token budget"""
+
+
+class LabelUsage:
+    """Usage totals for one chain/template label"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_calls = 0
+        self.cost = 0.0
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+
+class UsageAccountant(BaseCallbackHandler):
+    """Count tokens and cost per label and enforce an optional total token budget"""
+
+    # Let TokenBudgetExceeded propagate out of the chain call
+    raise_error = True
+
+    def __init__(self, max_total_tokens=None, prices=None):
+        self.max_total_tokens = max_total_tokens
+        self.prices = prices or PRICES_PER_1K
+        self.usage = {}
+        self._pending = {}
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Accountant with the budget from TOKEN_BUDGET (unset = unlimited)"""
+        budget = os.getenv("TOKEN_BUDGET")
+        return cls(max_total_tokens=int(budget) if budget else None)
+
+    def config(self, label, **extra):
+        """Runnable config that attributes calls to label"""
+        metadata = dict(extra.pop("metadata", {}), usage_label=label)
+        return dict(extra, callbacks=[self], metadata=metadata)
+
+    # -- budget --------------------------------------------------------------
+
+    @property
+    def total_tokens(self):
+        with self._lock:
+            return sum(u.total_tokens for u in self.usage.values())
+
+    def remaining(self):
+        """Tokens left in the budget after in-flight reservations (None if unlimited)"""
+        with self._lock:
+            return self._remaining()
+
+    def _remaining(self):
+        if self.max_total_tokens is None:
+            return None
+        used = sum(u.total_tokens for u in self.usage.values())
+        return max(0, self.max_total_tokens - used - self._reserved)
+
+    def max_tokens_for(self, default, prompt_tokens=0):
+        """Completion size to request so a prompt_tokens prompt still fits in the budget"""
+        remaining = self.remaining()
+        return default if remaining is None else min(default, remaining - prompt_tokens)
+
+    def limit(self, llm, max_tokens=DEFAULT_MAX_TOKENS, min_tokens=16):
+        """
+        llm as a runnable that asks for shorter completions as the budget runs out.
+
+        Each call requests max_tokens_for(max_tokens, prompt) tokens; when
+        fewer than min_tokens would be left it raises TokenBudgetExceeded.
+        Only use it where a cut-off answer is acceptable (free text, not JSON).
+        """
+        from langchain_core.runnables import RunnableLambda
+
+        def capped(prompt, config):
+            text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+            cap = self.max_tokens_for(max_tokens, count_tokens(text))
+            if cap < min_tokens:
+                raise TokenBudgetExceeded(
+                    f"only {max(cap, 0)} completion tokens left in the budget of {self.max_total_tokens}")
+            metadata = dict(config.get("metadata") or {}, usage_max_tokens=cap)
+            return dict(config, metadata=metadata), cap
+
+        def call(prompt, config):
+            config, cap = capped(prompt, config)
+            return llm.invoke(prompt, config=config, max_tokens=cap)
+
+        async def acall(prompt, config):
+            config, cap = capped(prompt, config)
+            return await llm.ainvoke(prompt, config=config, max_tokens=cap)
+
+        return RunnableLambda(call, afunc=acall, name="budget_limit")
+
+    # -- LangChain callbacks -------------------------------------------------
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        label = metadata.get("usage_label", "unlabelled")
+        model = params.get("model_name", DEFAULT_MODEL)
+        estimated_prompt = sum(count_tokens(p) for p in prompts)
+        # limit() passes the completion size it asked for; -1 means "as much as fits"
+        max_tokens = metadata.get("usage_max_tokens") or params.get("max_tokens")
+        if not max_tokens or max_tokens < 0:
+            max_tokens = DEFAULT_MAX_TOKENS
+
+        with self._lock:
+            reserved = 0
+            if self.max_total_tokens is not None:
+                reserved = estimated_prompt + max_tokens * len(prompts)
+                remaining = self._remaining()
+                if reserved > remaining:
+                    raise TokenBudgetExceeded(
+                        f"'{label}' needs up to ~{reserved} tokens ({estimated_prompt} prompt) but only "
+                        f"{remaining} of {self.max_total_tokens} remain")
+                self._reserved += reserved
+            self._pending[run_id] = (label, model, prompts, estimated_prompt, reserved)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        label, model, prompts, estimated_prompt, reserved = pending
+
+        llm_output = response.llm_output or {}
+        usage = llm_output.get("token_usage") or {}
+        model = llm_output.get("model_name", model)
+        estimated = not usage
+        if estimated:
+            prompt_tokens = estimated_prompt
+            completion_tokens = sum(count_tokens(g.text)
+                                    for generations in response.generations for g in generations)
+        else:
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+
+        prompt_price, completion_price = self.prices.get(model, self.prices[DEFAULT_MODEL])
+        with self._lock:
+            # Settle: swap the reservation for the real count
+            self._reserved -= reserved
+            stats = self.usage.setdefault(label, LabelUsage())
+            stats.calls += 1
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.estimated_calls += estimated
+            stats.cost += (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+            if pending is not None:
+                self._reserved -= pending[-1]
+
+    # -- reporting -----------------------------------------------------------
+
+    def summary(self):
+        """{label: {calls, prompt_tokens, completion_tokens, avg_prompt_tokens, cost}}"""
+        with self._lock:
+            return {
+                label: {
+                    "calls": u.calls,
+                    "prompt_tokens": u.prompt_tokens,
+                    "completion_tokens": u.completion_tokens,
+                    "total_tokens": u.total_tokens,
+                    "avg_prompt_tokens": u.prompt_tokens / u.calls if u.calls else 0.0,
+                    "estimated_calls": u.estimated_calls,
+                    "cost_usd": u.cost,
+                }
+                for label, u in self.usage.items()
+            }
+
+    def print_summary(self):
+        """Print usage per label, most expensive first"""
+        summary = self.summary()
+        grand_total = sum(s["total_tokens"] for s in summary.values()) or 1
+
+        print(f"\n💰 {'Label':<22}{'calls':>6}{'prompt':>9}{'compl.':>9}{'avg in':>9}{'share':>8}{'cost $':>10}")
+        for label, s in sorted(summary.items(), key=lambda kv: -kv[1]["total_tokens"]):
+            print(f"   {label:<22}{s['calls']:>6}{s['prompt_tokens']:>9}{s['completion_tokens']:>9}"
+                  f"{s['avg_prompt_tokens']:>9.0f}{s['total_tokens'] / grand_total:>8.0%}{s['cost_usd']:>10.4f}")
+
+        total_cost = sum(s["cost_usd"] for s in summary.values())
+        print(f"   Total: {sum(s['total_tokens'] for s in summary.values())} tokens, ${total_cost:.4f}")
+        if self.max_total_tokens is not None:
+            print(f"   Budget: {self.remaining()} of {self.max_total_tokens} tokens left")
+        if any(s["estimated_calls"] for s in summary.values()):
+            print("   (some counts are tiktoken estimates - the provider returned no usage)")
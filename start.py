@@ -2,12 +2,21 @@
 """
 Getting Started Script for LangChain Learning
 Run this to test your setup and see a quick demo
+
+    python start.py                      # check setup and run the demo
+    python start.py --profile-import     # slowest imports of the demo's LangChain stack
+    python start.py --profile-import examples/01-basics/03_chains.py
 """
 
+import argparse
 import os
+import subprocess
 import sys
 from dotenv import load_dotenv
 
+# Imported by the quick demo; profiled by default with --profile-import
+DEMO_IMPORT = "langchain_openai"
+
 def check_setup():
     """Check if everything is set up correctly"""
     print("🔧 Checking LangChain Setup...")
@@ -39,18 +48,19 @@ def check_setup():
         print("❌ OPENAI_API_KEY not set in .env file")
         return False
     
-    # Check imports
+    # Check packages without importing them (importing langchain_openai takes about a second)
+    import importlib.metadata
+    import importlib.util
+    
     try:
-        import langchain
-        print(f"✅ LangChain installed: version {langchain.__version__}")
-    except ImportError:
+        print(f"✅ LangChain installed: version {importlib.metadata.version('langchain')}")
+    except importlib.metadata.PackageNotFoundError:
         print("❌ LangChain not installed - run: pip install -r requirements.txt")
         return False
     
-    try:
-        from langchain_openai import OpenAI
+    if importlib.util.find_spec("langchain_openai"):
         print("✅ OpenAI integration available")
-    except ImportError:
+    else:
         print("❌ OpenAI integration not available")
         return False
     
@@ -110,8 +120,75 @@ def show_next_steps():
     print("   🌐 Visit: https://python.langchain.com/")
     print("   💬 Join: https://discord.gg/langchain")
 
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into (module, depth, self_us, cumulative_us) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2][1:].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2  # nested imports are indented 2 spaces
+        rows.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+    return rows
+
+def profile_imports(target=DEMO_IMPORT, top=15):
+    """
+    Import a module or example script in a fresh interpreter under
+    -X importtime and print the slowest imports
+    
+    Scripts are loaded with a run_name other than "__main__", so only their
+    module-level code (imports, classes, constants) runs.
+    """
+    if target.endswith(".py"):
+        path = os.path.abspath(target)
+        code = f"import runpy; runpy.run_path({path!r}, run_name='__profile__')"
+    else:
+        code = f"import {target}"
+    
+    print(f"⏱️  Import profile: {target}")
+    print("=" * 40)
+    
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = parse_importtime(proc.stderr)
+    if proc.returncode != 0 or not rows:
+        print(f"❌ Import failed:\n{proc.stderr[-2000:]}")
+        return False
+    
+    # The outermost import's cumulative time is the total import cost
+    total_us = sum(cumulative for _, depth, _, cumulative in rows if depth == 0)
+    print(f"📦 {len(rows)} modules imported in {total_us / 1000:.0f} ms")
+    
+    # Top-level packages by their summed self time
+    packages = {}
+    for name, _, self_us, _ in rows:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    
+    print(f"\n🐢 Top packages (self time):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {self_us / 1000:8.1f} ms  {package}")
+    
+    print(f"\n🐢 Top modules (cumulative time):")
+    for name, _, _, cumulative in sorted(rows, key=lambda row: -row[3])[:top]:
+        print(f"   {cumulative / 1000:8.1f} ms  {name}")
+    return True
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Check your setup and run a quick LangChain demo")
+    parser.add_argument("--profile-import", nargs="?", const=DEMO_IMPORT, metavar="MODULE_OR_SCRIPT",
+                        help=f"report the slowest imports of a module or script (default: {DEMO_IMPORT})")
+    parser.add_argument("--top", type=int, default=15, help="rows to show with --profile-import")
+    args = parser.parse_args()
+    
+    if args.profile_import:
+        profile_imports(args.profile_import, top=args.top)
+        return
+    
     print("🎉 Welcome to LangChain Learning!")
     print("=" * 40)
     
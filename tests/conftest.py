@@ -0,0 +1,11 @@
+"""
+conftest.py
+Make benchmarks/ (harness, stub_server) and examples/common importable from the tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, os.path.join(ROOT, "examples"))
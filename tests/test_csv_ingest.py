@@ -0,0 +1,44 @@
+"""
+test_csv_ingest.py
+CsvIngestor: header checks and reported line numbers
+"""
+
+import pytest
+
+from common.csv_ingest import CsvIngestor, CsvMapping
+from common.loader import load_example
+
+
+@pytest.fixture
+def store():
+    return load_example("03-advanced/02_rag_system.py").SimpleVectorStore()
+
+
+def ingestor():
+    return CsvIngestor(CsvMapping(content_columns=["name"], metadata={"price": "float"}), batch_size=2)
+
+
+def test_header_is_checked_without_data_rows(tmp_path, store):
+    path = tmp_path / "header_only.csv"
+    path.write_text("sku,title\n")
+    with pytest.raises(ValueError, match="no column"):
+        ingestor().ingest(store, str(path))
+
+
+def test_errors_report_file_lines_across_multiline_fields(tmp_path, store):
+    path = tmp_path / "items.csv"
+    path.write_text('name,price\n"Widget\nwith a newline",1.5\nGadget,abc\n')
+    job = ingestor()
+    stats = job.ingest(store, str(path))
+
+    assert stats["documents"] == 1
+    assert job.errors == [(4, "column 'price': could not convert string to float: 'abc'")]
+
+
+def test_batches_are_added_quietly(tmp_path, store, capsys):
+    path = tmp_path / "many.csv"
+    path.write_text("name,price\n" + "".join(f"item {i},{i}\n" for i in range(10)))
+    ingestor().ingest(store, str(path))
+
+    assert len(store.documents) == 10
+    assert "Added" not in capsys.readouterr().out
@@ -0,0 +1,33 @@
+"""
+test_harness.py
+compare_results: which direction counts as a regression
+"""
+
+from harness import compare_results
+
+
+def test_faster_ingest_is_not_a_regression():
+    baseline = {"workers=4": {"docs_per_s": 1000.0, "mb_per_s": 10.0, "wall_s": 2.0}}
+    current = {"workers=4": {"docs_per_s": 1500.0, "mb_per_s": 15.0, "wall_s": 1.4}}
+    assert compare_results(current, baseline) == []
+
+
+def test_slower_rates_are_regressions():
+    baseline = {"mixed/fast_json": {"parses_per_s": 1000.0, "rows_per_s": 500.0}}
+    current = {"mixed/fast_json": {"parses_per_s": 500.0, "rows_per_s": 250.0}}
+    regressed = {metric for _, metric, _, _, _ in compare_results(current, baseline)}
+    assert regressed == {"parses_per_s", "rows_per_s"}
+
+
+def test_lower_is_better_metrics_and_tolerance():
+    baseline = {"s": {"p95_ms": 100.0, "memory_mb": 50.0, "recall_at_k": 0.8}}
+    current = {"s": {"p95_ms": 105.0, "memory_mb": 80.0, "recall_at_k": 0.6}}
+    regressed = {metric for _, metric, _, _, _ in compare_results(current, baseline, tolerance=0.1)}
+    assert regressed == {"memory_mb", "recall_at_k"}
+
+
+def test_fewer_parsed_completions_is_a_regression():
+    baseline = {"mixed/fast_json": {"parsed": 5000, "failed": 0}}
+    current = {"mixed/fast_json": {"parsed": 4000, "failed": 1000}}
+    regressed = {metric for _, metric, _, _, _ in compare_results(current, baseline)}
+    assert regressed == {"parsed"}
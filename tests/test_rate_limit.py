@@ -0,0 +1,54 @@
+"""
+test_rate_limit.py
+LLMScheduler against the local 429-injecting stub server
+"""
+
+import pytest
+
+from common.rate_limit import LLMScheduler, TokenBucket, is_rate_limit_error
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_rate_limit_errors_are_recognised():
+    assert is_rate_limit_error(FakeHTTPError("Too Many Requests", status_code=429))
+    assert is_rate_limit_error(type("RateLimitError", (Exception,), {})("slow down"))
+    assert is_rate_limit_error(RuntimeError("Rate limit reached for requests"))
+
+
+def test_numbers_in_messages_are_not_rate_limits():
+    assert not is_rate_limit_error(ValueError("expected 4290 tokens, got 429"))
+    assert not is_rate_limit_error(FakeHTTPError("Bad gateway", status_code=502))
+
+
+def test_token_bucket_rejects_zero_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_scheduled_run_survives_stub_429s():
+    pytest.importorskip("langchain_openai")
+    from langchain_openai import OpenAI
+    from stub_server import start_server
+
+    # A quarter of the requests get a 429 from the stub
+    server, state = start_server(rpm=10000, error_rate=0.25, latency_ms=5, seed=1)
+    try:
+        llm = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+                     api_key="stub", max_retries=0, max_tokens=16)
+        scheduler = LLMScheduler(max_concurrency=8, max_retries=10, base_delay=0.05,
+                                 max_delay=0.5, seed=0)
+        outputs = scheduler.map(llm.invoke, [f"Say hello number {i}" for i in range(40)])
+    finally:
+        server.shutdown()
+
+    failures = [o for o in outputs if isinstance(o, Exception)]
+    assert not failures, failures[:3]
+    assert state.rejected > 0, "the stub should have injected some 429s"
+    stats = scheduler.stats()
+    assert stats["failures"] == 0
+    assert stats["rate_limited"] == state.rejected
@@ -0,0 +1,48 @@
+"""
+test_rerank.py
+Reranker: the early cut-off and the IDF scorer
+"""
+
+from common.index import KeywordIndex
+from common.rerank import Reranker, idf_scorer
+
+
+def doc(i, content="text"):
+    return {"id": i, "title": f"doc {i}", "content": content}
+
+
+def test_cut_off_within_a_batch():
+    scored = []
+
+    def scorer(query, docs):
+        scored.extend(d["id"] for d in docs)
+        return [1.0] * len(docs)
+
+    # 2 strong candidates, then 8 that cannot beat them even with the full bonus
+    candidates = [(doc(0), 10), (doc(1), 9)] + [(doc(i), 5) for i in range(2, 10)]
+    reranker = Reranker(scorer=scorer, max_bonus=2.0, batch_size=8)
+    top = reranker.rerank("query", candidates, k=2)
+
+    assert [d["id"] for d, _ in top] == [0, 1]
+    assert scored == [0, 1]
+    assert reranker.stats()["skipped"] == 8
+
+
+def test_cut_off_keeps_candidates_that_can_still_win():
+    candidates = [(doc(0), 3), (doc(1), 2), (doc(2), 2)]
+    reranker = Reranker(scorer=lambda query, docs: [float(d["id"] > 0) for d in docs], max_bonus=2.0)
+    top = reranker.rerank("query", candidates, k=1)
+
+    assert top[0][0]["id"] == 1
+    assert reranker.stats()["skipped"] == 0
+
+
+def test_idf_scorer_prefers_rare_words():
+    docs = [doc(0, "common rare"), doc(1, "common"), doc(2, "common"), doc(3, "common")]
+    index = KeywordIndex()
+    for d in docs:
+        index.add(d["title"], d["content"])
+
+    scores = idf_scorer(index)("common rare", docs[:2])
+    assert scores[0] == 1.0
+    assert scores[1] < 0.5
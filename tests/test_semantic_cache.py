@@ -0,0 +1,41 @@
+"""
+test_semantic_cache.py
+SemanticCache: rephrasings hit, near-miss questions do not
+"""
+
+import pytest
+
+from common.semantic_cache import SemanticCache
+
+
+# The default threshold, and a loose one where only the word check stands in the way
+@pytest.fixture(params=[0.9, 0.5])
+def cache(request):
+    cache = SemanticCache(threshold=request.param)
+    cache.store("What is LangChain?", "framework answer")
+    return cache
+
+
+def test_rephrased_question_hits(cache):
+    value, similarity = cache.lookup("what's langchain")
+    assert value == "framework answer"
+    assert similarity >= cache.threshold
+
+
+@pytest.mark.parametrize("question", [
+    "What is not LangChain?",         # negation
+    "What are LangChain agents?",     # extra topic word
+    "What is LangChain memory?",
+])
+def test_near_miss_questions_do_not_hit(cache, question):
+    value, _ = cache.lookup(question)
+    assert value is None
+    assert cache.stats()["hits"] == 0
+
+
+def test_cached_negation_does_not_answer_the_plain_question():
+    cache = SemanticCache(threshold=0.5)
+    cache.store("What is not LangChain?", "negated answer")
+    value, _ = cache.lookup("What is LangChain?")
+    assert value is None
+    assert cache.stats()["near_misses"] == 1
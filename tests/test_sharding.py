@@ -0,0 +1,18 @@
+"""
+test_sharding.py
+ShardedVectorStore worker processes: errors come back instead of hanging
+"""
+
+import pytest
+
+from common.sharding import ShardedVectorStore
+
+
+def test_unknown_op_raises_instead_of_hanging():
+    with ShardedVectorStore(num_shards=2, processes=True) as store:
+        with pytest.raises(RuntimeError, match="unknown op"):
+            store._request(0, ("compact",))
+        # The pipe is still usable afterwards
+        store.add_documents([{"title": "a", "content": "alpha"}, {"title": "b", "content": "beta"}],
+                            quiet=True)
+        assert [doc["title"] for doc in store.similarity_search("beta")] == ["b"]